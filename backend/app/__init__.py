@@ -7,6 +7,7 @@ from .resources.task.translate_service import TranslateEngine
 from .script.init_db import safe_init_mysql
 from .script.insert_init_db import insert_initial_data, set_auto_increment, insert_initial_settings
 from .utils.response import APIResponse
+from .utils import metrics
 
 
 def create_app(config_class=None):
@@ -40,6 +41,7 @@ def create_app(config_class=None):
     # 初始化数据库
     with app.app_context():
         db.create_all()
+        metrics.instrument_engine(db.engine)
         # 在这里调用 TranslateEngine
         # engine = TranslateEngine(task_id=1, app=app)
         # engine.execute()
@@ -51,4 +53,18 @@ def create_app(config_class=None):
     set_auto_increment(app)
     insert_initial_settings(app)
 
-    return app
\ No newline at end of file
+    return app
+
+
+def start_background_jobs(app):
+    """
+    启动本进程的后台线程：存储占用定时对账、历史任务归档、PDF 模型预热
+    在实际处理请求的进程中调用：gunicorn 每个 worker fork 后（gunicorn.conf.py 的 post_fork）、
+    MCP 服务与开发服务器启动时。不在 create_app 中启动：gunicorn --preload 时 create_app 在 master 中执行，
+    线程不会随 fork 进入 worker（预热中持有的锁还会被复制进 worker 且永远不会释放），迁移脚本等也不需要这些线程
+    """
+    from .utils import storage_reconcile, translate_archive
+    from .translate import pdf_models
+    storage_reconcile.start(app)
+    translate_archive.start(app)
+    pdf_models.start(app)
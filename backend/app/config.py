@@ -1,4 +1,5 @@
 import os
+import json
 from datetime import timedelta
 from pathlib import Path
 from dotenv import load_dotenv
@@ -38,8 +39,26 @@ class Config:
     # UPLOAD_FOLDER = '/uploads'  # 建议使用绝对路径
     MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', 50)) * 1024 * 1024  # 50MB
     MAX_USER_STORAGE = int(os.getenv('MAX_USER_STORAGE', 100 ))* 1024 * 1024  # 默认100MB
+    # 分片上传：分片大小（MB）与未完成会话保留时长（小时）
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 5)) * 1024 * 1024
+    UPLOAD_SESSION_TTL = int(os.getenv('UPLOAD_SESSION_TTL', 24))
+    # MCP 文件传输：分片大小（KB）与单条消息内 Base64 传输的上限（MB），超出需分片传输
+    MCP_CHUNK_SIZE = int(os.getenv('MCP_CHUNK_SIZE', 1024)) * 1024
+    MCP_INLINE_MAX_SIZE = int(os.getenv('MCP_INLINE_MAX_SIZE', 10)) * 1024 * 1024
+    # MCP 按 URL 翻译时下载文件的缓存保留时长（小时），同一 URL 未变化时不重复下载
+    MCP_URL_CACHE_TTL = int(os.getenv('MCP_URL_CACHE_TTL', 72))
+    # MCP 密钥鉴权缓存时长（秒，0 关闭）与 last_used_at 批量写入间隔（秒）
+    MCP_AUTH_CACHE_TTL = int(os.getenv('MCP_AUTH_CACHE_TTL', 60))
+    MCP_LAST_USED_FLUSH_INTERVAL = int(os.getenv('MCP_LAST_USED_FLUSH_INTERVAL', 60))
+    # MCP 工具执行池：fast 为轻量查询，heavy 为文件传输/启动翻译等；QUEUE 为排队上限，超出返回繁忙
+    MCP_FAST_WORKERS = int(os.getenv('MCP_FAST_WORKERS', 8))
+    MCP_FAST_QUEUE = int(os.getenv('MCP_FAST_QUEUE', 64))
+    MCP_HEAVY_WORKERS = int(os.getenv('MCP_HEAVY_WORKERS', 4))
+    MCP_HEAVY_QUEUE = int(os.getenv('MCP_HEAVY_QUEUE', 16))
     # 翻译结果存储配置
     STORAGE_FOLDER = '/app/storage'  # 翻译结果存储路径
+    # 结果下载交给 nginx 发送：填 nginx 中 internal location 的前缀（如 /protected-storage/），留空由 Flask 发送
+    DOWNLOAD_ACCEL_REDIRECT = os.getenv('DOWNLOAD_ACCEL_REDIRECT', '')
     STATIC_FOLDER = '/public/static'  # 设置静态文件路径
 
     # 系统版本配置
@@ -50,6 +69,33 @@ class Config:
     API_URL = 'https://api.example.com'
     TRANSLATE_MODELS = ['gpt-3.5', 'gpt-4']
 
+    # LLM请求超时配置（秒）
+    LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', 10))
+    LLM_READ_TIMEOUT = float(os.getenv('LLM_READ_TIMEOUT', 120))
+    # 按接口域名覆盖超时，如 {"api.openai.com": {"connect": 5, "read": 60}, "baidu": {"read": 30}}
+    LLM_ENDPOINT_TIMEOUTS = json.loads(os.getenv('LLM_ENDPOINT_TIMEOUTS') or '{}')
+    # 单个翻译任务的总时限（秒），0 表示不限制
+    TASK_DEADLINE = int(os.getenv('TASK_DEADLINE', 0))
+
+    # 百度翻译：每个 app_id 的QPS上限（标准版为1，本机所有 worker 与 MCP 服务合计），是否启用多段打包请求
+    BAIDU_QPS = float(os.getenv('BAIDU_QPS', 1))
+    BAIDU_BATCH = os.getenv('BAIDU_BATCH', 'true').lower() == 'true'
+    # 相同文件翻译结果复用范围：off 关闭 / customer 仅复用本人结果 / global 跨用户复用
+    RESULT_REUSE_SCOPE = os.getenv('RESULT_REUSE_SCOPE', 'customer').lower()
+    # /metrics 抓取令牌（Authorization: Bearer）；为空时只接受来源地址在 METRICS_ALLOW_CIDRS（逗号分隔）内的请求
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+    METRICS_ALLOW_CIDRS = os.getenv('METRICS_ALLOW_CIDRS', '127.0.0.1/32,::1/128')
+    # 存储占用对账间隔（小时，0 关闭），按 translate 表修正 storage_usage 与用户已用空间
+    STORAGE_RECONCILE_INTERVAL = float(os.getenv('STORAGE_RECONCILE_INTERVAL', 24))
+    # 任务列表游标分页时总数的缓存时间（秒，0 不缓存）
+    LIST_TOTAL_CACHE_TTL = int(os.getenv('LIST_TOTAL_CACHE_TTL', 30))
+    # 已完成/失败/已删除的任务创建超过多少天后移到归档表（默认 0 关闭），每批移动条数
+    TRANSLATE_ARCHIVE_DAYS = int(os.getenv('TRANSLATE_ARCHIVE_DAYS', 0))
+    TRANSLATE_ARCHIVE_BATCH = int(os.getenv('TRANSLATE_ARCHIVE_BATCH', 1000))
+    # PDF 布局/表格模型每个进程保留的空闲实例数（0 不复用），启动时是否在后台预加载布局模型
+    PDF_MODEL_POOL_SIZE = int(os.getenv('PDF_MODEL_POOL_SIZE', 2))
+    PDF_MODEL_WARMUP = os.getenv('PDF_MODEL_WARMUP', 'true').lower() == 'true'
+
     # 时区
     TIMEZONE = 'Asia/Shanghai'#'UTC' #'Asia/Shanghai'
     @property
@@ -90,8 +136,8 @@ class ProductionConfig(Config):
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_pre_ping': True,
         'pool_recycle': 300,
-        'pool_size': 20,
-        'max_overflow': 30,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 30)),
         'pool_timeout': 10
     }
 
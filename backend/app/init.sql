@@ -318,7 +318,13 @@ ALTER TABLE `setting`
 -- 表的索引 `translate`
 --
 ALTER TABLE `translate`
-  ADD PRIMARY KEY (`id`);
+  ADD PRIMARY KEY (`id`),
+  ADD KEY `idx_translate_uuid` (`uuid`(64)),
+  ADD KEY `idx_translate_customer_list` (`customer_id`,`deleted_flag`(1),`created_at`),
+  ADD KEY `idx_translate_status` (`status`(16),`deleted_flag`(1)),
+  ADD KEY `idx_translate_md5` (`md5`(32)),
+  ADD KEY `idx_translate_created` (`created_at`),
+  ADD FULLTEXT KEY `ft_translate_filename` (`origin_filename`) WITH PARSER ngram;
 
 --
 -- 表的索引 `mcp_api_key`
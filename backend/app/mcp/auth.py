@@ -1,5 +1,9 @@
+import os
+import time
+import atexit
 import logging
 import asyncio
+import threading
 from datetime import datetime
 from typing import Optional
 
@@ -9,6 +13,16 @@ logger = logging.getLogger(__name__)
 
 _flask_app = None
 
+# 鉴权缓存：(key_hash, scope) -> (密钥信息, 过期时间)
+# MCP 服务与 Web 服务是不同进程，密钥变更时通过 storage/.mcp_key_version 的修改时间通知失效
+_cache_lock = threading.Lock()
+_token_cache = {}
+_cache_version = None
+
+# 待写入的 last_used_at：key_id -> (使用时间, key_hash)，由后台线程批量写入
+_pending_last_used = {}
+_flusher = None
+
 
 def set_flask_app_for_auth(app):
     global _flask_app
@@ -25,6 +39,134 @@ def _get_flask_app():
         return None
 
 
+def _version_file(app) -> str:
+    return os.path.join(os.path.dirname(app.root_path), 'storage', '.mcp_key_version')
+
+
+def invalidate_mcp_key_cache():
+    """
+    密钥吊销、删除、重新生成或修改配置后调用
+    清空本进程缓存，并更新失效标记文件让其他进程（MCP 服务）下次鉴权时清空缓存
+    """
+    with _cache_lock:
+        _token_cache.clear()
+    app = _get_flask_app()
+    if app is None:
+        return
+    try:
+        path = _version_file(app)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(str(time.time()))
+    except OSError as e:
+        logger.warning(f"MCP密钥缓存失效标记写入失败: {e}")
+
+
+def _check_cache_version(app):
+    """失效标记文件变化时清空缓存（每次鉴权一次 stat）"""
+    global _cache_version
+    try:
+        version = os.stat(_version_file(app)).st_mtime_ns
+    except OSError:
+        version = None
+    if version != _cache_version:
+        with _cache_lock:
+            _token_cache.clear()
+            _cache_version = version
+
+
+def _touch(key_id: int, key_hash: str):
+    """记录密钥使用时间，不立即写库"""
+    global _flusher
+    with _cache_lock:
+        _pending_last_used[key_id] = (datetime.utcnow(), key_hash)
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name='mcp-last-used-flusher', daemon=True)
+            _flusher.start()
+            atexit.register(flush_last_used)
+
+
+def flush_last_used():
+    """把累积的 last_used_at 一次性写入数据库"""
+    app = _get_flask_app()
+    with _cache_lock:
+        pending = dict(_pending_last_used)
+        _pending_last_used.clear()
+    if not pending or app is None:
+        return
+
+    with app.app_context():
+        from app.models.mcp_api_key import McpApiKey
+        from app.extensions import db
+        try:
+            for key_id, (used_at, key_hash) in pending.items():
+                # 带上 key_hash 条件：密钥已重新生成时不覆盖新密钥的 last_used_at
+                McpApiKey.query.filter_by(id=key_id, key_hash=key_hash).update(
+                    {'last_used_at': used_at}, synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"MCP密钥使用时间写入失败: {e}")
+            with _cache_lock:
+                for key_id, value in pending.items():
+                    _pending_last_used.setdefault(key_id, value)
+        finally:
+            db.session.remove()
+
+
+def _flush_loop():
+    app = _get_flask_app()
+    interval = app.config.get('MCP_LAST_USED_FLUSH_INTERVAL', 60) if app else 60
+    while True:
+        time.sleep(interval)
+        flush_last_used()
+
+
+def _lookup_key(token: str, scope: str) -> Optional[dict]:
+    """
+    校验密钥（需在应用上下文中调用），命中缓存时不访问数据库
+    :return: {'key_id', 'customer_id', 'scope', 'config'}，无效时返回 None
+    """
+    from app.models.mcp_api_key import McpApiKey
+    from app.utils import metrics
+
+    app = _get_flask_app()
+    ttl = app.config.get('MCP_AUTH_CACHE_TTL', 60)
+    key_hash = McpApiKey.hash_key(token)
+    cache_key = (key_hash, scope)
+
+    if ttl > 0:
+        _check_cache_version(app)
+        with _cache_lock:
+            cached = _token_cache.get(cache_key)
+        hit = cached is not None and cached[1] > time.monotonic()
+        metrics.cache_lookup('mcp_auth', hit)
+        if hit:
+            _touch(cached[0]['key_id'], key_hash)
+            return cached[0]
+
+    mcp_key = McpApiKey.query.filter_by(
+        key_hash=key_hash,
+        status='active',
+        deleted_flag='N',
+        scope=scope,
+    ).first()
+    if not mcp_key:
+        return None
+
+    info = {
+        'key_id': mcp_key.id,
+        'customer_id': mcp_key.customer_id,
+        'scope': mcp_key.scope,
+        'config': mcp_key.get_config(),
+    }
+    if ttl > 0:
+        with _cache_lock:
+            _token_cache[cache_key] = (info, time.monotonic() + ttl)
+    _touch(mcp_key.id, key_hash)
+    return info
+
+
 def _verify_token_sync(token: str, scope: str) -> Optional[dict]:
     app = _get_flask_app()
     if app is None:
@@ -33,26 +175,12 @@ def _verify_token_sync(token: str, scope: str) -> Optional[dict]:
 
     with app.app_context():
         try:
-            from app.models.mcp_api_key import McpApiKey
-            from app.extensions import db
-
-            key_hash = McpApiKey.hash_key(token)
-            mcp_key = McpApiKey.query.filter_by(
-                key_hash=key_hash,
-                status='active',
-                deleted_flag='N',
-                scope=scope,
-            ).first()
-
-            if not mcp_key:
+            info = _lookup_key(token, scope)
+            if not info:
                 logger.warning(f"MCP鉴权失败: token无效 scope={scope}")
                 return None
 
-            mcp_key.last_used_at = datetime.utcnow()
-            db.session.commit()
-
-            config = mcp_key.get_config()
-            customer_id = str(mcp_key.customer_id)
+            customer_id = str(info['customer_id'])
 
             return {
                 'token': token,
@@ -61,9 +189,9 @@ def _verify_token_sync(token: str, scope: str) -> Optional[dict]:
                 'expires_at': None,
                 'claims': {
                     'customer_id': customer_id,
-                    'mcp_key_id': str(mcp_key.id),
+                    'mcp_key_id': str(info['key_id']),
                     'scope': scope,
-                    'config': config,
+                    'config': info['config'],
                 }
             }
         except Exception as e:
@@ -100,28 +228,15 @@ class McpApiKeyAuthProvider(AuthProvider):
 
 def verify_api_key(raw_key: str, scope: str = 'user') -> Optional[dict]:
     try:
-        from app.models.mcp_api_key import McpApiKey
-        from app.extensions import db
-
-        key_hash = McpApiKey.hash_key(raw_key)
-        mcp_key = McpApiKey.query.filter_by(
-            key_hash=key_hash,
-            status='active',
-            deleted_flag='N',
-            scope=scope,
-        ).first()
-
-        if not mcp_key:
+        info = _lookup_key(raw_key, scope)
+        if not info:
             return None
 
-        mcp_key.last_used_at = datetime.utcnow()
-        db.session.commit()
-
         return {
-            'customer_id': mcp_key.customer_id,
-            'mcp_key_id': mcp_key.id,
-            'scope': mcp_key.scope,
-            'config': mcp_key.get_config(),
+            'customer_id': info['customer_id'],
+            'mcp_key_id': info['key_id'],
+            'scope': info['scope'],
+            'config': info['config'],
         }
     except Exception as e:
         logger.error(f"MCP鉴权异常: {e}")
@@ -0,0 +1,111 @@
+"""
+MCP 工具执行池
+
+按工具类别分池执行，避免大文件传输、启动翻译等重操作占满线程后拖慢所有客户端的状态轮询：
+- fast：状态查询、列表、账户信息等轻量数据库查询
+- heavy：文件上传/下载、启动翻译、存储统计等 I/O 密集操作
+
+每个池的线程数与排队上限独立配置（MCP_FAST_WORKERS/MCP_FAST_QUEUE、MCP_HEAVY_WORKERS/MCP_HEAVY_QUEUE），
+排队已满时直接返回繁忙错误，由客户端稍后重试。
+工作线程启动时推入一个 Flask 应用上下文并一直复用，每次调用结束后释放数据库会话。
+"""
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+HEAVY_TOOLS = {
+    'translate_file',
+    'upload_chunk',
+    'upload_finalize',
+    'download_translate',
+    'download_init',
+    'download_chunk',
+    'get_storage_info',
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _init_worker(app):
+    """工作线程初始化：推入应用上下文，线程存活期间复用"""
+    app.app_context().push()
+
+
+class ToolPool:
+    def __init__(self, name, app, workers, queue_size):
+        self.name = name
+        self.limit = workers + queue_size
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix=f"mcp-{name}",
+            initializer=_init_worker,
+            initargs=(app,),
+        )
+
+    def _acquire(self):
+        with self.lock:
+            if self.pending >= self.limit:
+                return False
+            self.pending += 1
+        metrics.MCP_TOOL_PENDING.labels(self.name).inc()
+        return True
+
+    def _release(self):
+        with self.lock:
+            self.pending -= 1
+        metrics.MCP_TOOL_PENDING.labels(self.name).dec()
+
+    async def run(self, tool, func, *args, **kwargs):
+        if not self._acquire():
+            metrics.MCP_TOOL_REJECTED.labels(tool, self.name).inc()
+            logger.warning(f"MCP 执行池 {self.name} 已满，拒绝 {tool}")
+            return {'error': '服务繁忙，请稍后重试', 'busy': True}
+
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, _call, func, args, kwargs)
+        except Exception as e:
+            logger.error(f"MCP tool {tool} 执行失败: {e}", exc_info=True)
+            return {'error': str(e)}
+        finally:
+            self._release()
+            metrics.MCP_TOOL_SECONDS.labels(tool, self.name).observe(time.perf_counter() - started)
+
+
+def _call(func, args, kwargs):
+    from app.extensions import db
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # 应用上下文不随调用结束而销毁，需手动归还数据库连接
+        db.session.remove()
+
+
+def get_pool(app, tool):
+    name = 'heavy' if tool in HEAVY_TOOLS else 'fast'
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                prefix = f"MCP_{name.upper()}"
+                pool = ToolPool(name, app,
+                                workers=app.config.get(f"{prefix}_WORKERS", 8),
+                                queue_size=app.config.get(f"{prefix}_QUEUE", 32))
+                _pools[name] = pool
+    return pool
+
+
+async def run_tool(app, tool, func, *args, **kwargs):
+    """在工具所属的执行池中运行同步函数"""
+    return await get_pool(app, tool).run(tool, func, *args, **kwargs)
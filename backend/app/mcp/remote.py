@@ -1,8 +1,7 @@
-import os
 import logging
-import asyncio
 from typing import Optional
 from contextlib import contextmanager
+from flask import has_app_context
 from fastmcp import FastMCP
 from fastmcp.dependencies import CurrentAccessToken
 from fastmcp.server.auth import AccessToken
@@ -34,6 +33,10 @@ def flask_app_context():
     app = get_flask_app()
     if app is None:
         raise RuntimeError("Flask app 不可用")
+    # 执行池的工作线程已推入应用上下文，直接复用
+    if has_app_context():
+        yield app
+        return
     with app.app_context():
         yield app
 
@@ -45,13 +48,10 @@ def _run_sync(func):
     return wrapper
 
 
-async def _run_in_thread(func, *args):
-    try:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, func, *args)
-    except Exception as e:
-        logger.error(f"MCP tool 执行失败: {e}", exc_info=True)
-        return {'error': str(e)}
+async def _run_in_thread(func, tool, *args):
+    """按工具名分配到 fast/heavy 执行池（见 app/mcp/executor.py）"""
+    from app.mcp.executor import run_tool
+    return await run_tool(get_flask_app(), tool, func, *args)
 
 
 user_mcp = FastMCP(
@@ -75,15 +75,17 @@ async def translate_file(
     origin_lang: str = "",
     translate_type: str = "",
     comparison_id: Optional[int] = None,
+    upload_id: Optional[str] = None,
     token: AccessToken = CurrentAccessToken(),
 ) -> dict:
     """
     翻译文档文件。
 
-    传文件方式（三选一）：
-    - file_content: 文件Base64编码（推荐，适用于Claude Desktop等MCP客户端）
+    传文件方式（四选一）：
+    - file_content: 文件Base64编码（适用于小文件，超过上限时需分片上传）
+    - upload_id: 分片上传（upload_init/upload_chunk/upload_finalize）完成后的上传ID，适用于大文件
     - file_url: 文件下载URL（需公网可访问）
-    - 两者都不传时，file_name 视为服务器本地绝对路径
+    - 都不传时，file_name 视为服务器本地绝对路径
 
     api_url/api_key/model/prompt_id/threads 等配置由你的MCP密钥自动提供，无需传入。
 
@@ -95,6 +97,7 @@ async def translate_file(
         origin_lang: 源语言（不填则自动检测）
         translate_type: 翻译类型 - trans_all_only_inherit(继承原版面,默认), trans_all_both_inherit(双语继承版面), trans_text_only(仅译文), trans_text_only_new(仅译文新排版)
         comparison_id: 术语库ID（可通过list_comparisons获取）
+        upload_id: 分片上传ID（upload_finalize 成功后使用）
     """
     from app.mcp.tools import translate_file as do_translate
 
@@ -110,9 +113,93 @@ async def translate_file(
         return do_translate(config, customer_id, app,
                             file_content, file_url, file_name,
                             target_lang, origin_lang, translate_type,
-                            comparison_id)
+                            comparison_id, upload_id)
+
+    return await _run_in_thread(_do, 'translate_file')
+
+
+@user_mcp.tool
+async def upload_init(
+    file_name: str,
+    file_size: int,
+    token: AccessToken = CurrentAccessToken(),
+) -> dict:
+    """
+    开始分片上传大文件，返回 upload_id 和 chunk_size。
+    之后按 offset 调用 upload_chunk 上传各分片，再调用 upload_finalize 校验，最后 translate_file(upload_id=...)。
+
+    Args:
+        file_name: 原始文件名（含扩展名）
+        file_size: 文件字节数
+    """
+    from app.mcp.tools import upload_init as do_init
+
+    if not token:
+        return {'error': '鉴权失败'}
+
+    customer_id = int(token.claims['customer_id'])
+
+    @_run_sync
+    def _do():
+        return do_init(customer_id, get_flask_app(), file_name, file_size)
+
+    return await _run_in_thread(_do, 'upload_init')
+
+
+@user_mcp.tool
+async def upload_chunk(
+    upload_id: str,
+    offset: int,
+    content: str,
+    token: AccessToken = CurrentAccessToken(),
+) -> dict:
+    """
+    上传一个分片。分片可乱序、可重传（同一 offset 重复写入会覆盖）。
+
+    Args:
+        upload_id: upload_init 返回的上传ID
+        offset: 分片在文件中的起始字节位置
+        content: 分片内容的Base64编码（解码后不超过 chunk_size）
+    """
+    from app.mcp.tools import upload_chunk as do_chunk
+
+    if not token:
+        return {'error': '鉴权失败'}
+
+    customer_id = int(token.claims['customer_id'])
+
+    @_run_sync
+    def _do():
+        return do_chunk(customer_id, get_flask_app(), upload_id, offset, content)
+
+    return await _run_in_thread(_do, 'upload_chunk')
+
+
+@user_mcp.tool
+async def upload_finalize(
+    upload_id: str,
+    md5: str,
+    token: AccessToken = CurrentAccessToken(),
+) -> dict:
+    """
+    完成分片上传，按整个文件的 MD5 校验。校验通过后用 translate_file(upload_id=...) 开始翻译。
+
+    Args:
+        upload_id: 上传ID
+        md5: 整个文件的MD5（十六进制）
+    """
+    from app.mcp.tools import upload_finalize as do_finalize
+
+    if not token:
+        return {'error': '鉴权失败'}
+
+    customer_id = int(token.claims['customer_id'])
+
+    @_run_sync
+    def _do():
+        return do_finalize(customer_id, get_flask_app(), upload_id, md5)
 
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'upload_finalize')
 
 
 @user_mcp.tool
@@ -139,7 +226,7 @@ async def query_translate_status(
     def _do():
         return do_query(customer_id, task_id, uuid)
 
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'query_translate_status')
 
 
 @user_mcp.tool
@@ -147,6 +234,7 @@ async def list_translates(
     page: int = 1,
     limit: int = 20,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
     token: AccessToken = CurrentAccessToken(),
 ) -> dict:
     """
@@ -156,6 +244,7 @@ async def list_translates(
         page: 页码，默认1
         limit: 每页数量，默认20
         status: 按状态过滤（none/process/done/failed）
+        cursor: 上一次返回的 next_cursor，填写后按游标翻页（忽略 page，total 为缓存的近似值）
     """
     from app.mcp.tools import list_translates as do_list
 
@@ -166,9 +255,9 @@ async def list_translates(
 
     @_run_sync
     def _do():
-        return do_list(customer_id, page, limit, status)
+        return do_list(customer_id, page, limit, status, cursor=cursor)
 
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'list_translates')
 
 
 @user_mcp.tool
@@ -177,7 +266,7 @@ async def download_translate(
     token: AccessToken = CurrentAccessToken(),
 ) -> dict:
     """
-    下载翻译完成的文件，返回Base64编码的文件内容。
+    下载翻译完成的文件，返回Base64编码的文件内容。大文件请使用 download_init/download_chunk 分片下载。
 
     Args:
         task_id: 翻译任务ID
@@ -193,7 +282,61 @@ async def download_translate(
     def _do():
         return do_download(customer_id, task_id)
 
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'download_translate')
+
+
+@user_mcp.tool
+async def download_init(
+    task_id: int,
+    token: AccessToken = CurrentAccessToken(),
+) -> dict:
+    """
+    开始分片下载翻译结果，返回文件名、大小、MD5 和 chunk_size。
+
+    Args:
+        task_id: 翻译任务ID
+    """
+    from app.mcp.tools import download_init as do_init
+
+    if not token:
+        return {'error': '鉴权失败'}
+
+    customer_id = int(token.claims['customer_id'])
+
+    @_run_sync
+    def _do():
+        return do_init(customer_id, get_flask_app(), task_id)
+
+    return await _run_in_thread(_do, 'download_init')
+
+
+@user_mcp.tool
+async def download_chunk(
+    task_id: int,
+    offset: int,
+    length: int = 0,
+    token: AccessToken = CurrentAccessToken(),
+) -> dict:
+    """
+    下载一个分片，返回Base64编码内容，eof 为 true 表示已到文件末尾。
+
+    Args:
+        task_id: 翻译任务ID
+        offset: 起始字节位置
+        length: 读取字节数，默认且最大为 chunk_size
+    """
+    from app.mcp.tools import download_chunk as do_chunk
+
+    if not token:
+        return {'error': '鉴权失败'}
+
+    customer_id = int(token.claims['customer_id'])
+
+    @_run_sync
+    def _do():
+        return do_chunk(customer_id, get_flask_app(), task_id, offset, length)
+
+    return await _run_in_thread(_do, 'download_chunk')
 
 
 @user_mcp.tool
@@ -218,7 +361,7 @@ async def delete_translate(
     def _do():
         return do_delete(customer_id, task_id)
 
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'delete_translate')
 
 
 @user_mcp.tool
@@ -237,7 +380,7 @@ async def list_comparisons(
     def _do():
         return do_list(customer_id)
 
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'list_comparisons')
 
 
 @user_mcp.tool
@@ -256,7 +399,7 @@ async def list_prompts(
     def _do():
         return do_list(customer_id)
 
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'list_prompts')
 
 
 @user_mcp.tool
@@ -275,7 +418,7 @@ async def get_account_info(
     def _do():
         return do_get(customer_id)
 
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'get_account_info')
 
 
 @user_mcp.tool
@@ -300,23 +443,22 @@ admin_mcp = FastMCP(
 async def get_statistics(
     token: AccessToken = CurrentAccessToken(),
 ) -> dict:
-    """获取翻译统计信息：总数、完成数、处理中、失败数。"""
-    from app.models.translate import Translate
+    """获取翻译统计信息：总数、完成数、处理中、失败数、token 用量。"""
+    from app.models.task_counter import TaskCounter
+    from app.models.translate_usage import TranslateUsage
 
     @_run_sync
     def _do():
-        total = Translate.query.count()
-        done_count = Translate.query.filter_by(status='done').count()
-        processing_count = Translate.query.filter_by(status='process').count()
-        failed_count = Translate.query.filter_by(status='failed').count()
+        counts = TaskCounter.summary()
         return {
-            'total': total,
-            'done_count': done_count,
-            'processing_count': processing_count,
-            'failed_count': failed_count,
+            'total': counts['total'],
+            'done_count': counts['done'],
+            'processing_count': counts['process'],
+            'failed_count': counts['failed'],
+            'usage': TranslateUsage.totals(),
         }
 
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'get_statistics')
 
 
 @admin_mcp.tool
@@ -355,7 +497,7 @@ async def list_customers(
 
         return {'data': data, 'total': pagination.total}
 
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'list_customers')
 
 
 @admin_mcp.tool
@@ -394,7 +536,7 @@ async def update_customer(
         db.session.commit()
         return {'message': '更新成功'}
 
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'update_customer')
 
 
 @admin_mcp.tool
@@ -403,6 +545,7 @@ async def admin_list_translates(
     limit: int = 20,
     status: Optional[str] = None,
     keyword: Optional[str] = None,
+    cursor: Optional[str] = None,
     token: AccessToken = CurrentAccessToken(),
 ) -> dict:
     """
@@ -413,40 +556,49 @@ async def admin_list_translates(
         limit: 每页数量
         status: 按状态过滤
         keyword: 按文件名搜索
+        cursor: 上一次返回的 next_cursor，填写后按游标翻页（忽略 page，total 为缓存的近似值）
     """
-    from app.models.translate import Translate
+    from app.models.translate import Translate, TranslateArchive
     from app.models.customer import Customer
+    from app.utils.pagination import paginate
+    from app.utils.search import filename_condition
 
-    @_run_sync
-    def _do():
-        query = Translate.query.filter_by(deleted_flag='N')
+    def build_query(model):
+        query = model.query.filter_by(deleted_flag='N') \
+            .outerjoin(Customer, model.customer_id == Customer.id).add_columns(Customer.email)
         if status and status in ('none', 'process', 'done', 'failed'):
-            query = query.filter_by(status=status)
+            query = query.filter(model.status == status)
         if keyword:
-            query = query.filter(Translate.origin_filename.ilike(f"%{keyword}%"))
+            query = query.filter(filename_condition(keyword, model))
+        return query
 
-        pagination = query.order_by(Translate.created_at.desc()).paginate(
-            page=page, per_page=limit, error_out=False
-        )
+    @_run_sync
+    def _do():
+        try:
+            result = paginate(build_query(Translate), Translate, page, limit, cursor=cursor,
+                              total_key=('remote_admin_translate', status, keyword),
+                              archive_query=build_query(TranslateArchive))
+        except ValueError as e:
+            return {'error': str(e)}
 
         status_map = {'none': '未开始', 'process': '进行中', 'done': '已完成', 'failed': '失败'}
         data = []
-        for t in pagination.items:
-            customer = Customer.query.get(t.customer_id)
+        for t, customer_email in result['items']:
             data.append({
                 'task_id': t.id,
                 'file_name': t.origin_filename,
                 'status': t.status,
                 'status_name': status_map.get(t.status, '未知'),
                 'progress': float(t.process),
-                'customer_email': customer.email if customer else '未知',
+                'customer_email': customer_email or '未知',
                 'target_lang': t.lang,
                 'model': t.model,
             })
 
-        return {'data': data, 'total': pagination.total}
+        return {'data': data, 'total': result['total'],
+                'next_cursor': result['next_cursor'], 'has_more': result['has_more']}
 
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'admin_list_translates')
 
 
 @admin_mcp.tool
@@ -461,16 +613,19 @@ async def admin_restart_translate(
         task_id: 翻译任务ID
     """
     from app.extensions import db
-    from app.models.translate import Translate
+    from app.models.translate import find_translate
+    from app.utils.translate_archive import restore
 
     @_run_sync
     def _do():
-        record = Translate.query.get(task_id)
+        record = find_translate(id=task_id)
         if not record:
             return {'error': '翻译记录不存在'}
         if record.status not in ('failed', 'done'):
             return {'error': f'当前状态 {record.status} 无法重启'}
 
+        # 已归档的任务先移回任务表
+        record = restore(task_id)
         record.status = 'none'
         record.start_at = None
         record.end_at = None
@@ -478,7 +633,7 @@ async def admin_restart_translate(
         db.session.commit()
         return {'message': '任务已重启'}
 
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'admin_restart_translate')
 
 
 @admin_mcp.tool
@@ -493,18 +648,20 @@ async def admin_delete_translate(
         task_id: 翻译任务ID
     """
     from app.extensions import db
-    from app.models.translate import Translate
+    from app.models.translate import find_translate
+    from app.models.storage_usage import StorageUsage
 
     @_run_sync
     def _do():
-        record = Translate.query.get(task_id)
+        record = find_translate(id=task_id)
         if not record:
             return {'error': '翻译记录不存在'}
+        StorageUsage.release(record)
         db.session.delete(record)
         db.session.commit()
         return {'message': '记录删除成功'}
 
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'admin_delete_translate')
 
 
 @admin_mcp.tool
@@ -512,21 +669,14 @@ async def get_system_settings(
     token: AccessToken = CurrentAccessToken(),
 ) -> dict:
     """获取系统设置：API配置、默认模型、线程数等。"""
-    from app.models.setting import Setting
+    from app.utils import settings_cache
 
     @_run_sync
     def _do():
-        settings = Setting.query.filter(
-            Setting.group.in_(['api_setting', 'other_setting']),
-            Setting.deleted_flag == 'N'
-        ).all()
+        # 读取进程内配置缓存
+        return {**settings_cache.group('api_setting'), **settings_cache.group('other_setting')}
 
-        result = {}
-        for s in settings:
-            result[s.alias] = s.value
-        return result
-
-    return await _run_in_thread(_do)
+    return await _run_in_thread(_do, 'get_system_settings')
 
 
 @admin_mcp.tool
@@ -534,37 +684,14 @@ async def get_storage_info(
     token: AccessToken = CurrentAccessToken(),
 ) -> dict:
     """获取系统存储空间使用详情。"""
+    from app.mcp.tools import get_storage_info as do_info
 
     @_run_sync
     def _do():
-        app = get_flask_app()
-        base_dir = os.path.dirname(app.root_path)
-        storage_path = os.path.join(base_dir, 'storage')
-
-        if not os.path.exists(storage_path):
-            return {'error': 'storage目录不存在'}
-
-        result = {}
-        for category in os.listdir(storage_path):
-            category_path = os.path.join(storage_path, category)
-            if not os.path.isdir(category_path):
-                continue
-            total_size = 0
-            file_count = 0
-            for root, _, files in os.walk(category_path):
-                for f in files:
-                    try:
-                        total_size += os.path.getsize(os.path.join(root, f))
-                        file_count += 1
-                    except OSError:
-                        continue
-            result[category] = {
-                'size_mb': round(total_size / (1024 * 1024), 2),
-                'file_count': file_count,
-            }
-        return result
-
-    return await _run_in_thread(_do)
+        # 读取存储占用统计，不遍历存储目录
+        return do_info()
+
+    return await _run_in_thread(_do, 'get_storage_info')
 
 
 def create_mcp_apps():
@@ -1,11 +1,21 @@
 import os
+import json
+import time
 import uuid
+import shutil
 import base64
+import hashlib
 import logging
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
 ALLOWED_EXTENSIONS = {'docx', 'xlsx', 'pptx', 'pdf', 'txt', 'md', 'csv', 'xls', 'doc', 'html', 'htm'}
@@ -29,42 +39,302 @@ def _save_upload_file(content_bytes: bytes, filename: str, app) -> str:
     return os.path.abspath(save_path)
 
 
+def _inline_max_size(app) -> int:
+    """单条消息内 Base64 传输的文件大小上限（字节），更大的文件需分片传输"""
+    return app.config.get('MCP_INLINE_MAX_SIZE', 10 * 1024 * 1024)
+
+
+# ==================== 分片传输 ====================
+# 上传：upload_init -> upload_chunk(offset) * N -> upload_finalize(md5) -> translate_file(upload_id)
+# 下载：download_init -> download_chunk(offset) * N，按 md5 校验
+
+def _transfer_dir(app) -> Path:
+    path = Path(app.root_path).parent.absolute() / "storage" / "uploads" / ".mcp_chunks"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _load_transfer(app, customer_id: int, upload_id: str) -> Optional[dict]:
+    """读取上传会话，不存在或不属于当前用户时返回 None"""
+    if not upload_id or not upload_id.isalnum():
+        return None
+    meta_path = _transfer_dir(app) / upload_id / "meta.json"
+    if not meta_path.exists():
+        return None
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    if int(meta['customer_id']) != int(customer_id):
+        return None
+    return meta
+
+
+def _save_transfer(app, upload_id: str, meta: dict):
+    with open(_transfer_dir(app) / upload_id / "meta.json", 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+
+def _cleanup_transfers(app):
+    """删除过期未使用的上传会话"""
+    expire_before = time.time() - app.config.get('UPLOAD_SESSION_TTL', 24) * 3600
+    for path in _transfer_dir(app).iterdir():
+        if path.is_dir() and path.stat().st_mtime < expire_before:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def upload_init(customer_id: int, app, file_name: str, file_size: int) -> dict:
+    from app.models.customer import Customer
+
+    if not _check_file_extension(file_name):
+        return {'error': f'不支持的文件格式，仅支持: {", ".join(sorted(ALLOWED_EXTENSIONS))}'}
+    if file_size <= 0:
+        return {'error': '文件大小无效'}
+    max_size = app.config.get('MAX_FILE_SIZE', 50 * 1024 * 1024)
+    if file_size > max_size:
+        return {'error': f'文件大小超过{max_size // (1024 * 1024)}MB'}
+    customer = Customer.query.get(customer_id)
+    if not customer:
+        return {'error': '用户不存在'}
+    if customer.storage + file_size > customer.total_storage:
+        return {'error': '用户存储空间不足'}
+
+    _cleanup_transfers(app)
+    upload_id = uuid.uuid4().hex
+    session_dir = _transfer_dir(app) / upload_id
+    session_dir.mkdir()
+    # 预分配文件，各分片按 offset 写入，可乱序、可重传
+    with open(session_dir / "data", 'wb') as f:
+        f.truncate(file_size)
+    _save_transfer(app, upload_id, {
+        'customer_id': customer_id,
+        'file_name': os.path.basename(file_name),
+        'file_size': file_size,
+        'received': 0,
+        'md5': None,
+        'created_at': time.time(),
+    })
+    return {
+        'upload_id': upload_id,
+        'chunk_size': app.config.get('MCP_CHUNK_SIZE', 1024 * 1024),
+        'file_size': file_size,
+    }
+
+
+def upload_chunk(customer_id: int, app, upload_id: str, offset: int, content: str) -> dict:
+    meta = _load_transfer(app, customer_id, upload_id)
+    if not meta:
+        return {'error': '上传会话不存在或已过期'}
+    if meta['md5']:
+        return {'error': '上传已完成'}
+
+    data = base64.b64decode(content)
+    if len(data) > app.config.get('MCP_CHUNK_SIZE', 1024 * 1024):
+        return {'error': '分片过大'}
+    if offset < 0 or offset + len(data) > meta['file_size']:
+        return {'error': '分片超出文件范围'}
+
+    with open(_transfer_dir(app) / upload_id / "data", 'r+b') as f:
+        f.seek(offset)
+        f.write(data)
+    # 仅用于展示进度，顺序上传时等于已写入的字节数
+    meta['received'] = max(meta['received'], offset + len(data))
+    _save_transfer(app, upload_id, meta)
+    return {'upload_id': upload_id, 'offset': offset, 'size': len(data), 'received': meta['received']}
+
+
+def upload_finalize(customer_id: int, app, upload_id: str, md5: str) -> dict:
+    from app.utils.file_utils import FileManager
+
+    meta = _load_transfer(app, customer_id, upload_id)
+    if not meta:
+        return {'error': '上传会话不存在或已过期'}
+
+    actual = FileManager.calculate_md5(str(_transfer_dir(app) / upload_id / "data"))
+    if actual != (md5 or '').lower():
+        return {'error': '文件校验失败，请重新上传缺失或出错的分片', 'md5': actual}
+
+    meta['md5'] = actual
+    _save_transfer(app, upload_id, meta)
+    return {'upload_id': upload_id, 'file_name': meta['file_name'], 'file_size': meta['file_size'],
+            'md5': actual, 'message': '上传完成，调用 translate_file(upload_id=...) 开始翻译'}
+
+
+def _consume_upload(app, customer_id: int, upload_id: str) -> tuple:
+    """把已完成校验的分片上传移动到上传目录，返回 (路径, 文件名, 大小, md5)"""
+    meta = _load_transfer(app, customer_id, upload_id)
+    if not meta:
+        raise ValueError('上传会话不存在或已过期')
+    if not meta['md5']:
+        raise ValueError('上传尚未完成，请先调用 upload_finalize')
+
+    date_str = datetime.now().strftime('%Y-%m-%d')
+    upload_dir = Path(app.root_path).parent.absolute() / "storage" / "uploads" / date_str
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    save_path = str(upload_dir / meta['file_name'])
+    os.replace(_transfer_dir(app) / upload_id / "data", save_path)
+    shutil.rmtree(_transfer_dir(app) / upload_id, ignore_errors=True)
+    return os.path.abspath(save_path), meta['file_name'], meta['file_size'], meta['md5']
+
+
 def _resolve_file_input(file_content: Optional[str], file_url: Optional[str],
-                         file_name: str, app) -> tuple:
+                         file_name: str, app, max_size: int = None) -> tuple:
     if file_content:
+        # Base64 每 4 个字符对应 3 个字节，解码前先按长度拦截过大的文件
+        if len(file_content) * 3 // 4 > _inline_max_size(app):
+            raise ValueError(f'文件超过{_inline_max_size(app) // (1024 * 1024)}MB，请使用分片上传（upload_init）')
         content_bytes = base64.b64decode(file_content)
         if not file_name:
             file_name = f"mcp_upload_{uuid.uuid4().hex[:8]}.docx"
         save_path = _save_upload_file(content_bytes, file_name, app)
-        return save_path, file_name, len(content_bytes)
+        return save_path, file_name, len(content_bytes), hashlib.md5(content_bytes).hexdigest()
 
     elif file_url:
-        import requests
-        resp = requests.get(file_url, timeout=120, stream=True)
-        resp.raise_for_status()
-        content_bytes = resp.content
+        if max_size is None:
+            max_size = app.config.get('MAX_FILE_SIZE', 50 * 1024 * 1024)
         if not file_name:
             from urllib.parse import urlparse, unquote
             file_name = unquote(urlparse(file_url).path.split('/')[-1])
             if not file_name or '.' not in file_name:
                 file_name = f"mcp_download_{uuid.uuid4().hex[:8]}.docx"
-        save_path = _save_upload_file(content_bytes, file_name, app)
-        return save_path, file_name, len(content_bytes)
+        # 下载与链接到上传目录都在锁内完成，链接的文件与返回的大小、MD5 一致
+        with _url_cache_lock(app, file_url) as cache_dir:
+            cache_path, file_size, file_md5 = _fetch_url(file_url, app, max_size, cache_dir)
+            save_path = _link_upload_file(cache_path, os.path.basename(file_name), app)
+        return save_path, file_name, file_size, file_md5
 
     else:
         if not file_name or not os.path.exists(file_name):
             raise ValueError(f"文件不存在: {file_name}")
         file_size = os.path.getsize(file_name)
-        return file_name, os.path.basename(file_name), file_size
+        return file_name, os.path.basename(file_name), file_size, None
+
+
+# ==================== URL 下载缓存 ====================
+# storage/uploads/.url_cache/<sha256(url)>/{data,meta.json}
+# 同一 URL 再次翻译时带 If-None-Match/If-Modified-Since 请求，304 直接复用本地文件
+
+def _url_cache_dir(app, file_url: str) -> Path:
+    key = hashlib.sha256(file_url.encode('utf-8')).hexdigest()
+    path = Path(app.root_path).parent.absolute() / "storage" / "uploads" / ".url_cache" / key
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@contextmanager
+def _url_cache_lock(app, file_url: str):
+    """
+    对同一 URL 的缓存目录加文件锁（跨进程），返回缓存目录
+    同一 URL 的下载串行执行，后到的请求以条件请求复用刚写入的缓存
+    """
+    _cleanup_url_cache(app)
+    cache_dir = _url_cache_dir(app, file_url)
+    with open(cache_dir / ".lock", 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield cache_dir
+
+
+def _fetch_url(file_url: str, app, max_size: int, cache_dir: Path) -> tuple:
+    """
+    流式下载 URL 到缓存目录，边下载边限制大小（需在 _url_cache_lock 内调用）
+    :param max_size: 允许的最大字节数（取 MAX_FILE_SIZE 与用户剩余空间的较小值）
+    :return: (缓存文件路径, 文件大小, MD5)
+    """
+    import requests
+    from app.utils.file_utils import FileManager
+
+    data_path = cache_dir / "data"
+    meta_path = cache_dir / "meta.json"
+    meta = {}
+    if data_path.exists() and meta_path.exists():
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    with requests.get(file_url, headers=headers, timeout=(10, 120), stream=True) as resp:
+        if resp.status_code == 304 and meta:
+            if meta['size'] > max_size:
+                raise ValueError(_size_error(app, max_size))
+            logger.info(f"URL 未变化，复用缓存: {file_url}")
+            os.utime(cache_dir)  # 记录最近使用时间，供过期清理
+            return str(data_path), meta['size'], meta['md5']
+        resp.raise_for_status()
+
+        # 有 Content-Length 时提前拒绝，否则在写入过程中按实际字节数中止
+        length = resp.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > max_size:
+            raise ValueError(_size_error(app, max_size))
+        resp.raw.decode_content = True
+        try:
+            file_size, file_md5 = FileManager.save_stream(resp.raw, str(data_path), max_size=max_size)
+        except ValueError:
+            raise ValueError(_size_error(app, max_size))
+
+        meta = {
+            'url': file_url,
+            'etag': resp.headers.get('ETag'),
+            'last_modified': resp.headers.get('Last-Modified'),
+            'size': file_size,
+            'md5': file_md5,
+            'fetched_at': time.time(),
+        }
+    # 元数据同样先写临时文件再原子替换，读取方不会读到写了一半的 meta.json
+    tmp_path = cache_dir / f".meta.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+    return str(data_path), file_size, file_md5
+
+
+def _cleanup_url_cache(app):
+    """删除超过 MCP_URL_CACHE_TTL 小时未使用的 URL 缓存"""
+    cache_root = Path(app.root_path).parent.absolute() / "storage" / "uploads" / ".url_cache"
+    if not cache_root.exists():
+        return
+    expire_before = time.time() - app.config.get('MCP_URL_CACHE_TTL', 72) * 3600
+    for path in cache_root.iterdir():
+        if path.is_dir() and path.stat().st_mtime < expire_before:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _size_error(app, max_size: int) -> str:
+    if max_size < app.config.get('MAX_FILE_SIZE', 50 * 1024 * 1024):
+        return '用户存储空间不足'
+    return f'文件大小超过{max_size // (1024 * 1024)}MB'
+
+
+def _link_upload_file(source_path: str, filename: str, app) -> str:
+    """把缓存文件放到上传目录（同一文件系统用硬链接，不额外占用磁盘）"""
+    date_str = datetime.now().strftime('%Y-%m-%d')
+    upload_dir = Path(app.root_path).parent.absolute() / "storage" / "uploads" / date_str
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    save_path = str(upload_dir / filename)
+    if os.path.exists(save_path):
+        os.remove(save_path)
+    try:
+        os.link(source_path, save_path)
+    except OSError:
+        shutil.copyfile(source_path, save_path)
+    return os.path.abspath(save_path)
 
 
 def translate_file(config: dict, customer_id: int, app,
                    file_content: str = None, file_url: str = None,
                    file_name: str = "", target_lang: str = "",
                    origin_lang: str = "", translate_type: str = "",
-                   comparison_id: int = None) -> dict:
+                   comparison_id: int = None, upload_id: str = None) -> dict:
     from app.extensions import db
     from app.models.customer import Customer
+    from app.models.storage_usage import StorageUsage
     from app.models.translate import Translate
     from app.models.comparison import Comparison
     from app.models.prompt import Prompt
@@ -95,10 +365,18 @@ def translate_file(config: dict, customer_id: int, app,
     if not effective_prompt:
         effective_prompt = '你是一个文档翻译助手，请将以下文本、单词或短语直接翻译成{target_lang}，不返回原文本。如果文本中包含{target_lang}文本、特殊名词（比如邮箱、品牌名、单位名词如mm、px、℃等）、无法翻译等特殊情况，请直接返回原文而无需解释原因。遇到无法翻译的文本直接返回原内容。保留多余空格。'
 
+    file_md5 = None
     try:
-        save_path, resolved_name, file_size = _resolve_file_input(
-            file_content, file_url, file_name, app
-        )
+        if upload_id:
+            save_path, resolved_name, file_size, file_md5 = _consume_upload(app, customer_id, upload_id)
+        else:
+            # URL 下载时按 MAX_FILE_SIZE 和用户剩余空间限制大小
+            customer = Customer.query.get(customer_id)
+            remaining = customer.total_storage - customer.storage if customer else 0
+            max_size = max(min(app.config.get('MAX_FILE_SIZE', 50 * 1024 * 1024), remaining), 0)
+            save_path, resolved_name, file_size, file_md5 = _resolve_file_input(
+                file_content, file_url, file_name, app, max_size
+            )
     except Exception as e:
         return {'error': f'文件处理失败: {str(e)}'}
 
@@ -132,6 +410,7 @@ def translate_file(config: dict, customer_id: int, app,
             status='none',
             origin_filesize=file_size,
             size=file_size,
+            md5=file_md5,
             created_at=datetime.utcnow(),
             server='openai',
             model=mcp_config.get('model', ''),
@@ -149,12 +428,25 @@ def translate_file(config: dict, customer_id: int, app,
             doc2x_secret_key=mcp_config.get('doc2x_secret_key', ''),
         )
 
-        customer.storage += file_size
+        if not StorageUsage.reserve(customer_id, file_size):
+            db.session.rollback()
+            return {'error': '用户存储空间不足'}
         db.session.add(translate_record)
         db.session.commit()
 
-        TranslateEngine(translate_record.id).execute()
-
+        engine = TranslateEngine(translate_record.id)
+        engine.execute()
+
+        if engine.reused_from:
+            return {
+                'task_id': translate_record.id,
+                'uuid': file_uuid,
+                'file_name': resolved_name,
+                'target_lang': lang,
+                'status': 'done',
+                'reused_from': engine.reused_from,
+                'message': '已复用相同文件的翻译结果'
+            }
         return {
             'task_id': translate_record.id,
             'uuid': file_uuid,
@@ -172,18 +464,17 @@ def translate_file(config: dict, customer_id: int, app,
 
 def query_translate_status(customer_id: int, task_id: int = None,
                             uuid: str = None) -> dict:
-    from app.models.translate import Translate
-
-    query = Translate.query.filter_by(customer_id=customer_id, deleted_flag='N')
+    from app.models.translate import find_translate
 
+    filters = {'customer_id': customer_id, 'deleted_flag': 'N'}
     if task_id:
-        query = query.filter_by(id=task_id)
+        filters['id'] = task_id
     elif uuid:
-        query = query.filter_by(uuid=uuid)
+        filters['uuid'] = uuid
     else:
         return {'error': '请提供 task_id 或 uuid'}
 
-    record = query.first()
+    record = find_translate(**filters)
     if not record:
         return {'error': '翻译记录不存在'}
 
@@ -209,22 +500,30 @@ def query_translate_status(customer_id: int, task_id: int = None,
 
 
 def list_translates(customer_id: int, page: int = 1, limit: int = 20,
-                     status: str = None, keyword: str = None) -> dict:
-    from app.models.translate import Translate
+                     status: str = None, keyword: str = None, cursor: str = None) -> dict:
+    from app.models.translate import Translate, TranslateArchive
+    from app.utils.pagination import paginate
+
+    def build_query(model):
+        query = model.query.filter_by(customer_id=customer_id, deleted_flag='N')
+        if status and status in ('none', 'process', 'done', 'failed'):
+            query = query.filter_by(status=status)
+        if keyword:
+            query = query.filter(
+                model.origin_filename.like(f'%{keyword}%')
+            )
+        return query
 
-    query = Translate.query.filter_by(customer_id=customer_id, deleted_flag='N')
-    if status and status in ('none', 'process', 'done', 'failed'):
-        query = query.filter_by(status=status)
-    if keyword:
-        query = query.filter(
-            Translate.origin_filename.like(f'%{keyword}%')
-        )
-    query = query.order_by(Translate.created_at.desc())
-    pagination = query.paginate(page=page, per_page=limit, error_out=False)
+    try:
+        result = paginate(build_query(Translate), Translate, page, limit, cursor=cursor,
+                          total_key=('translate', customer_id, status, keyword),
+                          archive_query=build_query(TranslateArchive))
+    except ValueError as e:
+        return {'error': str(e)}
 
     status_map = {'none': '未开始', 'process': '进行中', 'done': '已完成', 'failed': '失败'}
     data = []
-    for t in pagination.items:
+    for t in result['items']:
         data.append({
             'task_id': t.id,
             'uuid': t.uuid,
@@ -237,17 +536,19 @@ def list_translates(customer_id: int, page: int = 1, limit: int = 20,
 
     return {
         'data': data,
-        'total': pagination.total,
-        'page': page,
+        'total': result['total'],
+        'page': result['page'],
+        'next_cursor': result['next_cursor'],
+        'has_more': result['has_more'],
     }
 
 
 def download_translate(customer_id: int, task_id: int) -> dict:
-    from app.models.translate import Translate
+    from app.models.translate import find_translate
 
-    record = Translate.query.filter_by(
+    record = find_translate(
         id=task_id, customer_id=customer_id, deleted_flag='N'
-    ).first()
+    )
     if not record:
         return {'error': '翻译记录不存在'}
     if record.status != 'done':
@@ -255,6 +556,13 @@ def download_translate(customer_id: int, task_id: int) -> dict:
     if not record.target_filepath or not os.path.exists(record.target_filepath):
         return {'error': '翻译文件不存在'}
 
+    from flask import current_app
+    file_size = os.path.getsize(record.target_filepath)
+    if file_size > _inline_max_size(current_app):
+        return {'error': f'文件超过{_inline_max_size(current_app) // (1024 * 1024)}MB，'
+                         f'请使用分片下载（download_init/download_chunk）',
+                'file_size': file_size}
+
     import base64 as b64
     with open(record.target_filepath, 'rb') as f:
         file_b64 = b64.b64encode(f.read()).decode()
@@ -267,43 +575,98 @@ def download_translate(customer_id: int, task_id: int) -> dict:
     }
 
 
+def _get_download_record(customer_id: int, task_id: int):
+    from app.models.translate import find_translate
+
+    record = find_translate(
+        id=task_id, customer_id=customer_id, deleted_flag='N'
+    )
+    if not record:
+        return None, {'error': '翻译记录不存在'}
+    if record.status != 'done':
+        return None, {'error': f'翻译尚未完成，当前状态: {record.status}'}
+    if not record.target_filepath or not os.path.exists(record.target_filepath):
+        return None, {'error': '翻译文件不存在'}
+    return record, None
+
+
+def download_init(customer_id: int, app, task_id: int) -> dict:
+    from app.utils.file_utils import FileManager
+
+    record, error = _get_download_record(customer_id, task_id)
+    if error:
+        return error
+    return {
+        'task_id': record.id,
+        'file_name': os.path.basename(record.target_filepath),
+        'file_size': os.path.getsize(record.target_filepath),
+        'md5': FileManager.calculate_md5(record.target_filepath),
+        'chunk_size': app.config.get('MCP_CHUNK_SIZE', 1024 * 1024),
+    }
+
+
+def download_chunk(customer_id: int, app, task_id: int, offset: int, length: int = 0) -> dict:
+    record, error = _get_download_record(customer_id, task_id)
+    if error:
+        return error
+
+    chunk_size = app.config.get('MCP_CHUNK_SIZE', 1024 * 1024)
+    length = min(length or chunk_size, chunk_size)
+    file_size = os.path.getsize(record.target_filepath)
+    if offset < 0 or offset > file_size:
+        return {'error': '偏移超出文件范围'}
+
+    with open(record.target_filepath, 'rb') as f:
+        f.seek(offset)
+        data = f.read(length)
+    return {
+        'task_id': record.id,
+        'offset': offset,
+        'size': len(data),
+        'content_base64': base64.b64encode(data).decode(),
+        'eof': offset + len(data) >= file_size,
+    }
+
+
 def delete_translate(customer_id: int, task_id: int) -> dict:
     from app.extensions import db
-    from app.models.translate import Translate
-    from app.models.customer import Customer
+    from app.models.translate import find_translate
+    from app.models.storage_usage import StorageUsage
 
-    record = Translate.query.filter_by(
+    record = find_translate(
         id=task_id, customer_id=customer_id
-    ).first()
+    )
     if not record:
         return {'error': '翻译记录不存在'}
 
+    StorageUsage.release(record)
     record.deleted_flag = 'Y'
-    customer = Customer.query.get(customer_id)
-    if customer:
-        customer.storage = max(0, customer.storage - record.size)
     db.session.commit()
     return {'message': '删除成功'}
 
 
 def restart_translate(customer_id: int, task_id: int) -> dict:
     from app.extensions import db
-    from app.models.translate import Translate
+    from app.models.translate import find_translate
     from app.resources.task.translate_service import TranslateEngine
+    from app.utils.translate_archive import restore
 
-    record = Translate.query.filter_by(
+    record = find_translate(
         id=task_id, customer_id=customer_id, deleted_flag='N'
-    ).first()
+    )
     if not record:
         return {'error': '翻译记录不存在'}
     if record.status not in ('failed', 'none'):
         return {'error': f'当前状态为 {record.status}，仅失败或未开始的任务可重启'}
 
+    # 已归档的任务先移回任务表
+    record = restore(record.id)
     record.status = 'none'
     record.failed_reason = None
     db.session.commit()
 
-    TranslateEngine(record.id).execute()
+    # 重启时不复用已有结果，强制重新翻译
+    TranslateEngine(record.id, reuse=False).execute()
 
     return {
         'task_id': record.id,
@@ -381,26 +744,23 @@ def get_supported_formats() -> dict:
 
 
 def get_statistics() -> dict:
-    from app.extensions import db
     from app.models.customer import Customer
-    from app.models.translate import Translate
+    from app.models.storage_usage import StorageUsage
+    from app.models.task_counter import TaskCounter
+    from app.models.translate_usage import TranslateUsage
 
     total_users = Customer.query.filter_by(deleted_flag='N').count()
-    total_translates = Translate.query.filter_by(deleted_flag='N').count()
-    process_translates = Translate.query.filter_by(status='process', deleted_flag='N').count()
-    done_translates = Translate.query.filter_by(status='done', deleted_flag='N').count()
-    failed_translates = Translate.query.filter_by(status='failed', deleted_flag='N').count()
-    total_storage = db.session.query(
-        db.func.sum(Customer.storage)
-    ).filter_by(deleted_flag='N').scalar() or 0
+    counts = TaskCounter.summary()
+    total_storage = sum(item['bytes'] for item in StorageUsage.summary().values())
 
     return {
         'total_users': total_users,
-        'total_translates': total_translates,
-        'process_translates': process_translates,
-        'done_translates': done_translates,
-        'failed_translates': failed_translates,
+        'total_translates': counts['total'],
+        'process_translates': counts['process'],
+        'done_translates': counts['done'],
+        'failed_translates': counts['failed'],
         'total_storage_mb': round(total_storage / (1024 * 1024), 2),
+        'usage': TranslateUsage.totals(),
     }
 
 
@@ -470,26 +830,35 @@ def update_customer(customer_id: int, level: str = '',
 
 
 def admin_list_translates(page: int = 1, limit: int = 20,
-                           status: str = '', keyword: str = '') -> dict:
+                           status: str = '', keyword: str = '', cursor: str = None) -> dict:
     from app.extensions import db
-    from app.models.translate import Translate
-
-    query = Translate.query.filter_by(deleted_flag='N')
-    if status and status in ('none', 'process', 'done', 'failed'):
-        query = query.filter_by(status=status)
-    if keyword:
-        query = query.filter(
-            db.or_(
-                Translate.origin_filename.like(f'%{keyword}%'),
-                Translate.translate_no.like(f'%{keyword}%'),
+    from app.models.translate import Translate, TranslateArchive
+    from app.utils.pagination import paginate
+    from app.utils.search import filename_condition
+
+    def build_query(model):
+        query = model.query.filter_by(deleted_flag='N')
+        if status and status in ('none', 'process', 'done', 'failed'):
+            query = query.filter_by(status=status)
+        if keyword:
+            query = query.filter(
+                db.or_(
+                    filename_condition(keyword, model),
+                    model.translate_no.like(f'%{keyword}%'),
+                )
             )
-        )
-    query = query.order_by(Translate.created_at.desc())
-    pagination = query.paginate(page=page, per_page=limit, error_out=False)
+        return query
+
+    try:
+        result = paginate(build_query(Translate), Translate, page, limit, cursor=cursor,
+                          total_key=('mcp_admin_translate', status, keyword),
+                          archive_query=build_query(TranslateArchive))
+    except ValueError as e:
+        return {'error': str(e)}
 
     status_map = {'none': '未开始', 'process': '进行中', 'done': '已完成', 'failed': '失败'}
     data = []
-    for t in pagination.items:
+    for t in result['items']:
         data.append({
             'task_id': t.id,
             'translate_no': t.translate_no,
@@ -505,25 +874,31 @@ def admin_list_translates(page: int = 1, limit: int = 20,
 
     return {
         'data': data,
-        'total': pagination.total,
-        'page': page,
+        'total': result['total'],
+        'page': result['page'],
+        'next_cursor': result['next_cursor'],
+        'has_more': result['has_more'],
     }
 
 
 def admin_restart_translate(task_id: int) -> dict:
     from app.extensions import db
-    from app.models.translate import Translate
+    from app.models.translate import find_translate
     from app.resources.task.translate_service import TranslateEngine
+    from app.utils.translate_archive import restore
 
-    record = Translate.query.filter_by(id=task_id, deleted_flag='N').first()
+    record = find_translate(id=task_id, deleted_flag='N')
     if not record:
         return {'error': '翻译记录不存在'}
 
+    # 已归档的任务先移回任务表
+    record = restore(record.id)
     record.status = 'none'
     record.failed_reason = None
     db.session.commit()
 
-    TranslateEngine(record.id).execute()
+    # 重启时不复用已有结果，强制重新翻译
+    TranslateEngine(record.id, reuse=False).execute()
 
     return {
         'task_id': record.id,
@@ -534,57 +909,52 @@ def admin_restart_translate(task_id: int) -> dict:
 
 def admin_delete_translate(task_id: int) -> dict:
     from app.extensions import db
-    from app.models.translate import Translate
-    from app.models.customer import Customer
+    from app.models.translate import find_translate
+    from app.models.storage_usage import StorageUsage
 
-    record = Translate.query.filter_by(id=task_id).first()
+    record = find_translate(id=task_id)
     if not record:
         return {'error': '翻译记录不存在'}
 
+    StorageUsage.release(record)
     record.deleted_flag = 'Y'
-    if record.customer_id:
-        customer = Customer.query.get(record.customer_id)
-        if customer:
-            customer.storage = max(0, customer.storage - record.size)
     db.session.commit()
     return {'message': '删除成功'}
 
 
 def get_system_settings() -> dict:
-    from app.extensions import db
-    from app.models.setting import Setting
+    from app.utils import settings_cache
 
-    settings = Setting.query.filter_by(deleted_flag='N').all()
     data = {}
-    for s in settings:
-        if s.group:
-            if s.group not in data:
-                data[s.group] = {}
-            data[s.group][s.alias] = s.value
+    for group, values in settings_cache.grouped().items():
+        if group:
+            data[group] = values
         else:
-            data[s.alias] = s.value
+            data.update(values)
 
     return {'data': data}
 
 
 def get_storage_info() -> dict:
-    from app.extensions import db
-    from app.models.customer import Customer
-    from app.models.translate import Translate
+    from app.models.storage_usage import StorageUsage
     from pathlib import Path
 
-    total_users_storage = db.session.query(
-        db.func.sum(Customer.storage)
-    ).filter_by(deleted_flag='N').scalar() or 0
-
-    total_translates = Translate.query.filter_by(deleted_flag='N').count()
+    # 读取存储占用统计（全站汇总行），不遍历存储目录
+    usage = StorageUsage.summary()
+    total_bytes = sum(item['bytes'] for item in usage.values())
 
     base_dir = Path(__file__).parent.parent.parent / "storage"
     storage_exists = base_dir.exists()
 
     return {
-        'total_user_storage_mb': round(total_users_storage / (1024 * 1024), 2),
-        'total_translates': total_translates,
+        'total_user_storage_mb': round(total_bytes / (1024 * 1024), 2),
+        'total_translates': usage[StorageUsage.UPLOADS]['file_count'],
+        'categories': {
+            category: {
+                'size_mb': round(item['bytes'] / (1024 * 1024), 2),
+                'file_count': item['file_count'],
+            } for category, item in usage.items()
+        },
         'storage_dir': str(base_dir),
         'storage_exists': storage_exists,
     }
@@ -5,4 +5,10 @@ from .setting import Setting
 
 from .send_code import  SendCode
 from .mcp_api_key import McpApiKey
-__all__ = ['User', 'Customer', 'Setting','SendCode','McpApiKey']
\ No newline at end of file
+from .translate_usage import TranslateUsage
+from .translate_stage import TranslateStage
+from .translate_result import TranslateResult
+from .storage_usage import StorageUsage
+from .task_counter import TaskCounter
+__all__ = ['User', 'Customer', 'Setting','SendCode','McpApiKey','TranslateUsage','TranslateStage','TranslateResult','StorageUsage',
+           'TaskCounter']
\ No newline at end of file
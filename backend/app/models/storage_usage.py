@@ -0,0 +1,126 @@
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+
+
+class StorageUsage(db.Model):
+    """
+    存储占用统计（按 用户+分类 一行，customer_id=0 为全站汇总）
+    上传、写出译文、删除时在同一事务内按增量更新，读取为单行查询；
+    与 translate 表的偏差由定时对账修正（见 app/utils/storage_reconcile.py）
+    """
+    __tablename__ = 'storage_usage'
+    __table_args__ = (
+        db.UniqueConstraint('customer_id', 'category', name='uk_storage_usage_customer_category'),
+    )
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    customer_id = db.Column(db.Integer, nullable=False, default=0)  # 用户ID，0 为全站汇总
+    category = db.Column(db.String(32), nullable=False)  # 分类：uploads 原文 / translate 译文
+    bytes = db.Column(db.BigInteger, nullable=False, default=0)  # 占用字节
+    file_count = db.Column(db.Integer, nullable=False, default=0)  # 文件数
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    UPLOADS = 'uploads'
+    TRANSLATE = 'translate'
+    CATEGORIES = (UPLOADS, TRANSLATE)
+    TOTAL_ID = 0
+
+    @classmethod
+    def _add(cls, customer_id, category, delta_bytes, delta_files):
+        """单行增量更新，行不存在时插入（并发插入冲突时改为更新）"""
+        values = {
+            cls.bytes: cls.bytes + delta_bytes,
+            cls.file_count: cls.file_count + delta_files,
+            cls.updated_at: datetime.utcnow(),
+        }
+        query = cls.query.filter_by(customer_id=customer_id, category=category)
+        if query.update(values, synchronize_session=False):
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.add(cls(customer_id=customer_id, category=category,
+                                   bytes=delta_bytes, file_count=delta_files))
+        except IntegrityError:
+            query.update(values, synchronize_session=False)
+
+    @classmethod
+    def adjust(cls, customer_id, category, delta_bytes, delta_files=0, update_customer=True):
+        """
+        按增量更新用户与全站的分类占用，默认同时更新 customer.storage（由调用方提交事务）
+        """
+        from .customer import Customer
+
+        delta_bytes, delta_files = int(delta_bytes or 0), int(delta_files or 0)
+        if not customer_id or (not delta_bytes and not delta_files):
+            return
+        if update_customer and delta_bytes:
+            new_value = db.func.coalesce(Customer.storage, 0) + delta_bytes
+            Customer.query.filter_by(id=customer_id).update(
+                {Customer.storage: db.case((new_value < 0, 0), else_=new_value)},
+                synchronize_session=False)
+        cls._add(customer_id, category, delta_bytes, delta_files)
+        cls._add(cls.TOTAL_ID, category, delta_bytes, delta_files)
+
+    @classmethod
+    def adjust_total(cls, category, delta_bytes, delta_files=0):
+        """只修正全站汇总行（对账用）"""
+        cls._add(cls.TOTAL_ID, category, int(delta_bytes), int(delta_files))
+
+    @classmethod
+    def reserve(cls, customer_id, size):
+        """
+        原子校验配额并计入一个上传文件（由调用方提交事务）
+        :return: 空间不足时返回 False，不做任何修改
+        """
+        from .customer import Customer
+
+        size = int(size or 0)
+        new_value = db.func.coalesce(Customer.storage, 0) + size
+        updated = Customer.query.filter(
+            Customer.id == customer_id,
+            new_value <= Customer.total_storage
+        ).update({Customer.storage: new_value}, synchronize_session=False)
+        if not updated:
+            return False
+        cls.adjust(customer_id, cls.UPLOADS, size, 1, update_customer=False)
+        return True
+
+    @classmethod
+    def record_result(cls, customer_id, old_size, new_size):
+        """译文写出或覆盖（重新翻译）时按大小差值计入"""
+        old_size, new_size = int(old_size or 0), int(new_size or 0)
+        cls.adjust(customer_id, cls.TRANSLATE, new_size - old_size,
+                   (1 if new_size else 0) - (1 if old_size else 0))
+
+    @classmethod
+    def release(cls, record):
+        """删除（含软删除）一条未删除的翻译记录时扣减其原文与译文占用"""
+        if record.deleted_flag != 'N':
+            return
+        cls.adjust(record.customer_id, cls.UPLOADS, -(record.origin_filesize or 0), -1)
+        cls.record_result(record.customer_id, record.target_filesize, 0)
+
+    @classmethod
+    def release_query(cls, query):
+        """批量删除前按用户汇总扣减（query 为待删除的 Translate/TranslateArchive 查询）"""
+        model = query.column_descriptions[0]['entity']
+        rows = query.filter(model.deleted_flag == 'N').with_entities(
+            model.customer_id,
+            db.func.coalesce(db.func.sum(model.origin_filesize), 0),
+            db.func.count(model.id),
+            db.func.coalesce(db.func.sum(model.target_filesize), 0),
+            db.func.sum(db.case((model.target_filesize > 0, 1), else_=0)),
+        ).group_by(model.customer_id).order_by(None).all()
+        for customer_id, origin_bytes, origin_files, target_bytes, target_files in rows:
+            cls.adjust(customer_id, cls.UPLOADS, -int(origin_bytes), -int(origin_files))
+            cls.adjust(customer_id, cls.TRANSLATE, -int(target_bytes), -int(target_files or 0))
+
+    @classmethod
+    def summary(cls, customer_id=TOTAL_ID):
+        """各分类占用：{分类: {'bytes', 'file_count'}}"""
+        data = {category: {'bytes': 0, 'file_count': 0} for category in cls.CATEGORIES}
+        for row in cls.query.filter_by(customer_id=customer_id).all():
+            data[row.category] = {'bytes': int(row.bytes), 'file_count': int(row.file_count)}
+        return data
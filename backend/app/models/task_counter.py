@@ -0,0 +1,174 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import db
+from .translate import Translate, TranslateArchive, TranslateMixin
+
+
+class TaskCounter(db.Model):
+    """
+    翻译任务计数（按 用户+创建日期+状态 一行）
+    customer_id=0 为全站汇总，day=ALL_DAYS 为不分日期的合计，统计读取只需查几行；
+    已删除（软删除）的任务计入 deleted，不计入其原状态。
+    统计 translate 与归档表 translate_archive 的合计，归档移动任务不影响计数。
+    ORM 新增、修改状态、软删除、删除任务时在同一事务内按增量更新（见 _after_flush），
+    翻译进程的原生 SQL 通过 app/translate/db.update_status 更新，批量删除前调用 release_query；
+    偏差由 python -m app.script.rebuild_task_counters 重建
+    """
+    __tablename__ = 'task_counter'
+    __table_args__ = (
+        db.UniqueConstraint('customer_id', 'day', 'status', name='uk_task_counter'),
+    )
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    customer_id = db.Column(db.Integer, nullable=False, default=0)  # 用户ID，0 为全站汇总
+    day = db.Column(db.Date, nullable=False)  # 任务创建日期，ALL_DAYS 为合计
+    status = db.Column(db.String(16), nullable=False)  # none/process/done/failed/deleted
+    task_count = db.Column(db.Integer, nullable=False, default=0)  # 任务数
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    STATUSES = ('none', 'process', 'done', 'failed')
+    DELETED = 'deleted'
+    BUCKETS = STATUSES + (DELETED,)
+    TOTAL_ID = 0
+    ALL_DAYS = date(1970, 1, 1)
+
+    @classmethod
+    def bucket(cls, status, deleted_flag):
+        """任务计入的分类"""
+        return cls.DELETED if deleted_flag == 'Y' else (status or 'none')
+
+    @classmethod
+    def keys(cls, customer_id, day):
+        """一个任务影响的计数行：(用户/全站) x (当天/合计)"""
+        customers = sorted({cls.TOTAL_ID, customer_id or cls.TOTAL_ID})
+        days = [cls.ALL_DAYS] + ([day] if day else [])
+        return [(customer, d) for customer in customers for d in days]
+
+    @classmethod
+    def add_task(cls, changes, customer_id, created_at, bucket, delta):
+        """把一个任务的增减累加到 changes：{(customer_id, day, status): 增量}"""
+        day = created_at.date() if isinstance(created_at, datetime) else created_at
+        for customer, d in cls.keys(customer_id, day):
+            changes[(customer, d, bucket)] += delta
+
+    @classmethod
+    def apply(cls, connection, changes):
+        """按增量更新计数行（行不存在时插入），在调用方的事务内执行"""
+        table = cls.__table__
+        now = datetime.utcnow()
+        # 按 (用户, 日期, 状态) 排序，全站汇总行总是最先加锁
+        for (customer_id, day, status), delta in sorted(changes.items()):
+            if not delta:
+                continue
+            values = {'customer_id': customer_id, 'day': day, 'status': status,
+                      'task_count': delta, 'updated_at': now}
+            dialect = connection.dialect.name
+            if dialect == 'mysql':
+                stmt = mysql_insert(table).values(**values)
+                stmt = stmt.on_duplicate_key_update(task_count=table.c.task_count + stmt.inserted.task_count,
+                                                    updated_at=stmt.inserted.updated_at)
+            elif dialect == 'sqlite':
+                stmt = sqlite_insert(table).values(**values)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['customer_id', 'day', 'status'],
+                    set_={'task_count': table.c.task_count + stmt.excluded.task_count,
+                          'updated_at': stmt.excluded.updated_at})
+            else:
+                updated = connection.execute(
+                    table.update().where(table.c.customer_id == customer_id, table.c.day == day,
+                                         table.c.status == status)
+                    .values(task_count=table.c.task_count + delta, updated_at=now))
+                if updated.rowcount:
+                    continue
+                stmt = table.insert().values(**values)
+            connection.execute(stmt)
+
+    @classmethod
+    def tally(cls, query):
+        """按 用户+日期+分类 汇总 query（Translate/TranslateArchive 查询）中的任务：{(customer_id, day, status): 任务数}"""
+        model = query.column_descriptions[0]['entity']
+        bucket = db.case((model.deleted_flag == 'Y', cls.DELETED),
+                         else_=db.func.coalesce(model.status, 'none'))
+        day = db.func.date(model.created_at)
+        rows = query.with_entities(model.customer_id, day, bucket, db.func.count(model.id)) \
+            .group_by(model.customer_id, day, bucket).order_by(None).all()
+        changes = Counter()
+        for customer_id, d, status, number in rows:
+            # DATE() 在 SQLite 上返回字符串
+            cls.add_task(changes, customer_id, date.fromisoformat(d) if isinstance(d, str) else d,
+                         status, int(number))
+        return changes
+
+    @classmethod
+    def release_query(cls, query):
+        """批量删除前扣减待删除任务的计数（query 为待删除的 Translate/TranslateArchive 查询，由调用方提交事务）"""
+        changes = Counter({key: -number for key, number in cls.tally(query).items()})
+        cls.apply(db.session.connection(), changes)
+
+    @classmethod
+    def summary(cls, customer_id=TOTAL_ID):
+        """各状态任务数：{状态: 数量}，total 为未删除任务总数"""
+        data = {bucket: 0 for bucket in cls.BUCKETS}
+        for row in cls.query.filter_by(customer_id=customer_id, day=cls.ALL_DAYS).all():
+            data[row.status] = int(row.task_count)
+        data['total'] = sum(data[status] for status in cls.STATUSES)
+        return data
+
+    @classmethod
+    def daily(cls, customer_id=TOTAL_ID, days=30):
+        """最近若干天每天创建的任务按状态计数：[{'day', 状态: 数量...}]，按日期倒序"""
+        rows = cls.query.filter(
+            cls.customer_id == customer_id,
+            cls.day > cls.ALL_DAYS,
+            cls.day >= date.today() - timedelta(days=days)
+        ).all()
+        result = {}
+        for row in rows:
+            item = result.setdefault(row.day, {'day': str(row.day), **{bucket: 0 for bucket in cls.BUCKETS}})
+            item[row.status] = int(row.task_count)
+        return [result[d] for d in sorted(result, reverse=True)]
+
+
+def _old_value(state, key):
+    history = state.attrs[key].history
+    return history.deleted[0] if history.deleted else getattr(state.obj(), key)
+
+
+@event.listens_for(Session, 'after_flush')
+def _after_flush(session, flush_context):
+    """ORM 新增/修改/删除任务时同步计数（与业务修改在同一事务内）"""
+    changes = Counter()
+    for obj in session.new:
+        if isinstance(obj, TranslateMixin):
+            TaskCounter.add_task(changes, obj.customer_id, obj.created_at or datetime.utcnow(),
+                                 TaskCounter.bucket(obj.status, obj.deleted_flag), 1)
+    for obj in session.dirty:
+        if isinstance(obj, TranslateMixin):
+            state = inspect(obj)
+            old = TaskCounter.bucket(_old_value(state, 'status'), _old_value(state, 'deleted_flag'))
+            new = TaskCounter.bucket(obj.status, obj.deleted_flag)
+            if old != new:
+                TaskCounter.add_task(changes, obj.customer_id, obj.created_at, old, -1)
+                TaskCounter.add_task(changes, obj.customer_id, obj.created_at, new, 1)
+    for obj in session.deleted:
+        if isinstance(obj, TranslateMixin):
+            state = inspect(obj)
+            old = TaskCounter.bucket(_old_value(state, 'status'), _old_value(state, 'deleted_flag'))
+            TaskCounter.add_task(changes, obj.customer_id, obj.created_at, old, -1)
+    if changes:
+        TaskCounter.apply(session.connection(), changes)
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+# 修改前先加载原值，保证 after_flush 中能取到修改前的状态
+for _attribute in (Translate.status, Translate.deleted_flag,
+                   TranslateArchive.status, TranslateArchive.deleted_flag):
+    event.listen(_attribute, 'set', _keep_old_value, active_history=True)
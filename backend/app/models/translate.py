@@ -1,10 +1,12 @@
 from datetime import datetime
+
+from flask import abort
+
 from app import db
 
 
-class Translate(db.Model):
-    """ 文件翻译任务表 """
-    __tablename__ = 'translate'
+class TranslateMixin:
+    """ 翻译任务字段（任务表 translate 与归档表 translate_archive 共用） """
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     translate_no = db.Column(db.String(32))
     uuid = db.Column(db.String(64))
@@ -56,3 +58,39 @@ class Translate(db.Model):
             'word_count': self.word_count,
             'server': self.server,
         }
+
+
+class Translate(TranslateMixin, db.Model):
+    """ 文件翻译任务表 """
+    __tablename__ = 'translate'
+    # 热点查询索引（已有数据库由 app/script/migrate_indexes.py 补建）
+    __table_args__ = (
+        db.Index('idx_translate_uuid', 'uuid'),  # 进度轮询、启动翻译按 uuid 查询
+        db.Index('idx_translate_customer_list', 'customer_id', 'deleted_flag', 'created_at'),  # 用户任务列表
+        db.Index('idx_translate_status', 'status', 'deleted_flag'),  # 按状态统计
+        db.Index('idx_translate_md5', 'md5'),
+        db.Index('idx_translate_created', 'created_at'),  # 管理后台任务列表
+    )
+
+
+class TranslateArchive(TranslateMixin, db.Model):
+    """ 已归档的翻译任务（保留原任务ID，见 app/utils/translate_archive.py） """
+    __tablename__ = 'translate_archive'
+    __table_args__ = (
+        db.Index('idx_translate_archive_uuid', 'uuid'),
+        db.Index('idx_translate_archive_customer_list', 'customer_id', 'deleted_flag', 'created_at'),
+        db.Index('idx_translate_archive_created', 'created_at'),
+    )
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)  # 归档时间
+
+
+def find_translate(**filters):
+    """按条件查找一条任务，任务表中没有时再查归档表"""
+    return Translate.query.filter_by(**filters).first() or TranslateArchive.query.filter_by(**filters).first()
+
+
+def find_translate_or_404(**filters):
+    record = find_translate(**filters)
+    if record is None:
+        abort(404)
+    return record
@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from app import db
+
+
+class TranslateResult(db.Model):
+    """ 翻译结果复用索引（每个成功任务一行） """
+    __tablename__ = 'translate_result'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    translate_id = db.Column(db.Integer, nullable=False, unique=True)  # 任务ID
+    customer_id = db.Column(db.Integer, default=0, index=True)  # 用户ID
+    reuse_key = db.Column(db.String(64), nullable=False, index=True)  # 原文md5+语言+服务+模型+提示词+术语库版本+类型 的摘要
+    reused_from = db.Column(db.Integer)  # 复用的来源任务ID，为空表示实际翻译
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
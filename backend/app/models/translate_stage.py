@@ -0,0 +1,43 @@
+import json
+from datetime import datetime
+
+from app import db
+
+
+class TranslateStage(db.Model):
+    """ 翻译任务阶段耗时表（每个任务一行） """
+    __tablename__ = 'translate_stage'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    translate_id = db.Column(db.Integer, nullable=False, unique=True)  # 任务ID
+    profile = db.Column(db.Boolean, default=False)  # 下次执行时是否开启性能分析
+    stages = db.Column(db.Text)  # 各阶段耗时（秒），JSON {阶段: 秒}
+    total_seconds = db.Column(db.Float, default=0)  # 总耗时（秒）
+    profile_dir = db.Column(db.String(255))  # 性能分析产物目录
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def is_profiling(cls, translate_id):
+        """任务是否被标记为性能分析"""
+        record = cls.query.filter_by(translate_id=translate_id).first()
+        return bool(record and record.profile)
+
+    @classmethod
+    def set_profiling(cls, translate_id, enabled=True):
+        """标记/取消任务的性能分析（需调用方提交事务）"""
+        record = cls.query.filter_by(translate_id=translate_id).first()
+        if record is None:
+            record = cls(translate_id=translate_id)
+            db.session.add(record)
+        record.profile = enabled
+        return record
+
+    def to_dict(self):
+        return {
+            'translate_id': self.translate_id,
+            'profile': bool(self.profile),
+            'stages': json.loads(self.stages) if self.stages else {},
+            'total_seconds': self.total_seconds or 0,
+            'profile_dir': self.profile_dir,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
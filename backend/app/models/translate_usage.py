@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+from app import db
+
+
+class TranslateUsage(db.Model):
+    """ 翻译用量表（每个任务按模型汇总一行） """
+    __tablename__ = 'translate_usage'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    translate_id = db.Column(db.Integer, nullable=False, index=True)  # 任务ID
+    customer_id = db.Column(db.Integer, default=0, index=True)  # 用户ID
+    server = db.Column(db.String(32), default='openai')  # 翻译服务
+    model = db.Column(db.String(64), default='')  # 模型
+    request_count = db.Column(db.Integer, default=0)  # 成功请求数
+    failed_requests = db.Column(db.Integer, default=0)  # 失败请求数
+    prompt_tokens = db.Column(db.BigInteger, default=0)  # 输入token
+    completion_tokens = db.Column(db.BigInteger, default=0)  # 输出token
+    cached_tokens = db.Column(db.BigInteger, default=0)  # 命中缓存的输入token
+    latency_ms = db.Column(db.BigInteger, default=0)  # 请求累计耗时（毫秒）
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    SUM_COLUMNS = ('request_count', 'failed_requests', 'prompt_tokens',
+                   'completion_tokens', 'cached_tokens', 'latency_ms')
+
+    @classmethod
+    def _sum_columns(cls):
+        return [db.func.coalesce(db.func.sum(getattr(cls, name)), 0).label(name)
+                for name in cls.SUM_COLUMNS]
+
+    @staticmethod
+    def _row_to_dict(row, keys):
+        data = {key: getattr(row, key) for key in keys}
+        for name in TranslateUsage.SUM_COLUMNS:
+            data[name] = int(getattr(row, name) or 0)
+        data['total_tokens'] = data['prompt_tokens'] + data['completion_tokens']
+        return data
+
+    @classmethod
+    def totals(cls, customer_id=None, translate_id=None):
+        """汇总用量"""
+        query = db.session.query(*cls._sum_columns())
+        if customer_id is not None:
+            query = query.filter(cls.customer_id == customer_id)
+        if translate_id is not None:
+            query = query.filter(cls.translate_id == translate_id)
+        return cls._row_to_dict(query.one(), ())
+
+    @classmethod
+    def rollup(cls, customer_id=None, days=30, by_customer=False):
+        """按 日期/模型（/用户）汇总用量"""
+        day = db.func.date(cls.created_at).label('day')
+        group_columns = [day, cls.server, cls.model]
+        keys = ['day', 'server', 'model']
+        if by_customer:
+            group_columns.append(cls.customer_id)
+            keys.append('customer_id')
+
+        query = db.session.query(*group_columns, *cls._sum_columns()).filter(
+            cls.created_at >= datetime.utcnow() - timedelta(days=days)
+        )
+        if customer_id is not None:
+            query = query.filter(cls.customer_id == customer_id)
+        rows = query.group_by(*group_columns).order_by(day.desc()).all()
+
+        result = []
+        for row in rows:
+            data = cls._row_to_dict(row, keys)
+            data['day'] = str(data['day'])
+            result.append(data)
+        return result
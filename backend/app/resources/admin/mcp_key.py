@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models.mcp_api_key import McpApiKey
 from app.models.customer import Customer
+from app.mcp.auth import invalidate_mcp_key_cache
 from app.utils.response import APIResponse
 
 
@@ -127,6 +128,7 @@ class AdminMcpKeyDetailResource(Resource):
             mcp_key.status = data['status']
 
         db.session.commit()
+        invalidate_mcp_key_cache()
         result = mcp_key.to_dict(include_config=True)
         customer = Customer.query.get(mcp_key.customer_id)
         result['customer_email'] = customer.email if customer else ''
@@ -141,6 +143,7 @@ class AdminMcpKeyDetailResource(Resource):
             return APIResponse.error('密钥不存在', 404)
         mcp_key.deleted_flag = 'Y'
         db.session.commit()
+        invalidate_mcp_key_cache()
         return APIResponse.success(message='密钥已删除')
 
 
@@ -158,6 +161,7 @@ class AdminMcpKeyRegenerateResource(Resource):
         mcp_key.key_prefix = new_prefix
         mcp_key.last_used_at = None
         db.session.commit()
+        invalidate_mcp_key_cache()
 
         return APIResponse.success({
             'id': mcp_key.id,
@@ -2,11 +2,13 @@
 import os
 import shutil
 from flask import request, current_app
+from flask_jwt_extended import jwt_required
 from flask_restful import Resource
 
 from app import db
-from app.models import Setting
+from app.models import Setting, StorageUsage
 from app.utils.response import APIResponse
+from app.utils.settings_cache import invalidate_settings_cache
 from app.utils.validators import validate_id_list
 
 
@@ -31,6 +33,7 @@ class AdminSettingNoticeResource(Resource):
         setting.serialized = True
         db.session.add(setting)
         db.session.commit()
+        invalidate_settings_cache()
         return APIResponse.success(message='通知设置已更新')
 
 
@@ -61,6 +64,7 @@ class AdminSettingApiResource(Resource):
             setting.value = value
             db.session.add(setting)
         db.session.commit()
+        invalidate_settings_cache()
         return APIResponse.success(message='API配置已更新')
 
 
@@ -91,6 +95,7 @@ class AdminEditSettingOtherResource(Resource):
             setting.value = value
             db.session.add(setting)
         db.session.commit()
+        invalidate_settings_cache()
         return APIResponse.success(message='其他设置已更新')
 
 
@@ -114,6 +119,7 @@ class AdminSettingSiteResource(Resource):
         setting.value = version
         db.session.add(setting)
         db.session.commit()
+        invalidate_settings_cache()
         return APIResponse.success(message='站点版本已更新')
 
 
@@ -234,3 +240,28 @@ class SystemStorageResource(Resource):
                     break
             except OSError:
                 break
+
+
+# 存储占用统计（读取 storage_usage 汇总行，不遍历存储目录）
+class SystemStorageUsageResource(Resource):
+    @jwt_required()
+    def get(self):
+        """全站各分类占用，传 customer_id 时返回该用户的分类占用"""
+        customer_id = request.args.get('customer_id', StorageUsage.TOTAL_ID, type=int)
+        usage = StorageUsage.summary(customer_id)
+        return APIResponse.success(data={
+            'categories': usage,
+            'total_bytes': sum(item['bytes'] for item in usage.values()),
+            'total_files': sum(item['file_count'] for item in usage.values()),
+        })
+
+    @jwt_required()
+    def post(self):
+        """立即执行一次对账"""
+        from app.utils.storage_reconcile import reconcile
+        try:
+            return APIResponse.success(data=reconcile(), message='对账完成')
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"存储占用对账失败: {str(e)}")
+            return APIResponse.error("存储占用对账失败")
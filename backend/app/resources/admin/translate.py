@@ -1,15 +1,20 @@
 # resources/admin/to_translate.py
 import os
-import zipfile
 from datetime import datetime
-from io import BytesIO
-from flask import request, make_response, send_file
+from flask import request
 from flask_jwt_extended import jwt_required
 from flask_restful import Resource, reqparse
 from app import db
-from app.models import Customer
-from app.models.translate import Translate
+from app.models import Customer, StorageUsage, TaskCounter
+from app.models.translate import Translate, TranslateArchive, find_translate_or_404
+from app.models.translate_usage import TranslateUsage
+from app.models.translate_stage import TranslateStage
 from app.utils.response import APIResponse
+from app.utils.pagination import paginate
+from app.utils.search import customer_email_condition, filename_condition
+from app.utils.file_utils import FileManager
+from app.utils.translate_archive import restore
+from app.utils.zip_stream import ZipStream
 from app.utils.validators import (
     validate_id_list
 )
@@ -26,30 +31,39 @@ class AdminTranslateListResource(Resource):
         parser.add_argument('limit', type=int, default=100, location='args')  # 每页数量，默认为 100
         parser.add_argument('status', type=str, location='args')  # 状态，可选
         parser.add_argument('keyword', type=str, location='args')  # 搜索关键字，可选
+        parser.add_argument('cursor', type=str, location='args')  # 游标分页：上一页返回的 next_cursor，可选
         args = parser.parse_args()
 
-        # 构建查询条件
-        query = Translate.query.filter_by()
-
         # 检查状态过滤条件
         if args['status']:
             valid_statuses = {'none', 'process', 'done', 'failed'}
             if args['status'] not in valid_statuses:
                 return APIResponse.error(f"Invalid status value: {args['status']}"), 400
-            query = query.filter_by(status=args['status'])
-        # 检查关键字过滤条件
-        if args['keyword']:
-            # 模糊匹配 origin_filename 或 customer_email
-            query = query.join(Customer, Translate.customer_id == Customer.id).filter(
-                (Translate.origin_filename.ilike(f"%{args['keyword']}%")) |
-                (Customer.email.ilike(f"%{args['keyword']}%"))
-            )
-        # 执行分页查询
-        pagination = query.paginate(page=args['page'], per_page=args['limit'], error_out=False)
+
+        # 构建查询条件（任务表与归档表相同；关联查出用户邮箱与编号，避免逐条查询用户）
+        def build_query(model):
+            query = model.query.outerjoin(Customer, model.customer_id == Customer.id) \
+                .add_columns(Customer.email, Customer.customer_no)
+            if args['status']:
+                query = query.filter(model.status == args['status'])
+            # 检查关键字过滤条件
+            if args['keyword']:
+                # 模糊匹配 origin_filename（MySQL 走全文索引）或 customer_email
+                query = query.filter(db.or_(filename_condition(args['keyword'], model),
+                                            customer_email_condition(args['keyword'], model)))
+            return query
+
+        # 执行分页查询（按创建时间倒序，合并归档表）
+        try:
+            result = paginate(build_query(Translate), Translate, args['page'], args['limit'], cursor=args['cursor'],
+                              total_key=('admin_translate', args['status'], args['keyword']),
+                              archive_query=build_query(TranslateArchive))
+        except ValueError as e:
+            return APIResponse.error(str(e), 400)
 
         # 处理每条记录
         data = []
-        for t in pagination.items:
+        for t, email, customer_no in result['items']:
             # 计算花费时间（基于 start_at 和 end_at）
             if t.start_at and t.end_at:
                 spend_time = t.end_at - t.start_at
@@ -59,10 +73,9 @@ class AdminTranslateListResource(Resource):
             else:
                 spend_time_str = "--"
 
-            # 获取用户邮箱（通过 Customer 模型关联查询）
-            customer = Customer.query.get(t.customer_id)
-            customer_email = customer.email if customer else "--"
-            customer_no = customer.customer_no if customer.customer_no else t.customer_id
+            # 用户邮箱与编号（已在查询中关联）
+            customer_email = email or "--"
+            customer_no = customer_no or t.customer_id
             # 格式化时间字段
             start_at_str = t.start_at.strftime('%Y-%m-%d %H:%M:%S') if t.start_at else "--"
             end_at_str = t.end_at.strftime('%Y-%m-%d %H:%M:%S') if t.end_at else "--"
@@ -87,8 +100,10 @@ class AdminTranslateListResource(Resource):
         # 返回响应数据
         return APIResponse.success({
             'data': data,
-            'total': pagination.total,
-            'current_page': pagination.page
+            'total': result['total'],
+            'current_page': result['page'],
+            'next_cursor': result['next_cursor'],
+            'has_more': result['has_more']
         })
 
 
@@ -107,33 +122,19 @@ class AdminTranslateDownloadBatchResource(Resource):
             if not isinstance(ids, list):
                 return {"message": "ids 必须是数组"}, 400
 
-            # 查询指定的翻译记录
-            records = Translate.query.filter(
-                Translate.id.in_(ids),  # 过滤指定 ID
-                Translate.deleted_flag == 'N'  # 只下载未删除的记录
-            ).all()
-
-            # 生成内存 ZIP 文件
-            zip_buffer = BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
-                for record in records:
-                    if record.target_filepath and os.path.exists(record.target_filepath):
-                        # 将文件添加到 ZIP 中
-                        zip_file.write(
-                            record.target_filepath,
-                            os.path.basename(record.target_filepath)
-                        )
-
-            # 重置缓冲区指针
-            zip_buffer.seek(0)
-
-            # 返回 ZIP 文件
-            return send_file(
-                zip_buffer,
-                mimetype='application/zip',
-                as_attachment=True,
-                download_name=f"translations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-            )
+            # 查询指定的翻译记录（含已归档的）
+            records = [record for model in (Translate, TranslateArchive) for record in model.query.filter(
+                model.id.in_(ids),  # 过滤指定 ID
+                model.deleted_flag == 'N'  # 只下载未删除的记录
+            ).all()]
+
+            # 流式生成 ZIP，边打包边发送
+            zip_stream = ZipStream()
+            for record in records:
+                if record.target_filepath and os.path.exists(record.target_filepath):
+                    zip_stream.add_file(record.target_filepath)
+
+            return zip_stream.response(f"translations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
         except Exception as e:
             return {"message": f"服务器错误: {str(e)}"}, 500
 
@@ -144,28 +145,17 @@ class AdminTranslateDownloadResource(Resource):
     def get(self, id):
         """通过 ID 下载单个翻译结果文件[^5]"""
         # 查询翻译记录
-        translate = Translate.query.filter_by(
+        translate = find_translate_or_404(
             id=id,
             # customer_id=get_jwt_identity()
-        ).first_or_404()
+        )
 
         # 确保文件存在
         if not translate.target_filepath or not os.path.exists(translate.target_filepath):
             return APIResponse.error('文件不存在', 404)
 
-        # 返回文件
-        response = make_response(send_file(
-            translate.target_filepath,
-            as_attachment=True,
-            download_name=os.path.basename(translate.target_filepath)
-        ))
-
-        # 禁用缓存
-        response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
-
-        return response
+        # 返回文件（支持 ETag 协商缓存、Range 续传，可交给 nginx 发送）
+        return FileManager.send_download(translate.target_filepath)
 
 
 # 删除单个翻译记录
@@ -174,7 +164,8 @@ class AdminTranslateDeteleResource(Resource):
     def delete(self, id):
         """删除单个翻译记录[^2]"""
         try:
-            record = Translate.query.get_or_404(id)
+            record = find_translate_or_404(id=id)
+            StorageUsage.release(record)
             db.session.delete(record)
             db.session.commit()
             return APIResponse.success(message='记录删除成功')
@@ -191,7 +182,11 @@ class AdminTranslateBatchDeleteResource(Resource):
             if len(ids) > 100:
                 return APIResponse.error('单次最多删除100条记录', 400)
 
-            Translate.query.filter(Translate.id.in_(ids)).delete()
+            for model in (Translate, TranslateArchive):
+                query = model.query.filter(model.id.in_(ids))
+                StorageUsage.release_query(query)
+                TaskCounter.release_query(query)
+                query.delete(synchronize_session=False)
             db.session.commit()
             return APIResponse.success(message=f'成功删除{len(ids)}条记录')
         except APIResponse as e:
@@ -205,10 +200,13 @@ class AdminTranslateRestartResource(Resource):
     def post(self, id):
         """重启翻译任务[^4]"""
         try:
-            record = Translate.query.get_or_404(id)
+            record = find_translate_or_404(id=id)
             if record.status not in ['failed', 'done']:
                 return APIResponse.error('当前状态无法重启', 400)
 
+            # 已归档的任务先移回任务表
+            record = restore(id)
+
             record.status = 'none'
             record.start_at = None
             record.end_at = None
@@ -220,20 +218,67 @@ class AdminTranslateRestartResource(Resource):
             return APIResponse.error('重启失败', 500)
 
 
+class AdminTranslateProfileResource(Resource):
+    @jwt_required()
+    def get(self, id):
+        """获取任务各阶段耗时及性能分析产物目录"""
+        find_translate_or_404(id=id)
+        record = TranslateStage.query.filter_by(translate_id=id).first()
+        if not record:
+            return APIResponse.success({'translate_id': id, 'profile': False, 'stages': {},
+                                        'total_seconds': 0, 'profile_dir': None})
+        return APIResponse.success(record.to_dict())
+
+    @jwt_required()
+    def post(self, id):
+        """标记任务在下次执行时开启性能分析（cProfile + tracemalloc）"""
+        parser = reqparse.RequestParser()
+        parser.add_argument('enabled', type=bool, default=True, location='json')
+        args = parser.parse_args()
+        find_translate_or_404(id=id)
+        try:
+            TranslateStage.set_profiling(id, args['enabled'])
+            db.session.commit()
+            message = '已开启性能分析，任务下次执行时生效' if args['enabled'] else '已取消性能分析'
+            return APIResponse.success(message=message)
+        except Exception as e:
+            db.session.rollback()
+            return APIResponse.error('设置性能分析失败', 500)
+
+
 class AdminTranslateStatisticsResource(Resource):
     def get(self):
         """获取翻译统计信息[^5]"""
         try:
-            total = Translate.query.count()
-            done_count = Translate.query.filter_by(status='done').count()
-            processing_count = Translate.query.filter_by(status='process').count()
-            failed_count = Translate.query.filter_by(status='failed').count()
+            days = request.args.get('days', 30, type=int)
+            counts = TaskCounter.summary()
 
             return APIResponse.success({
-                'total': total,
-                'done_count': done_count,
-                'processing_count': processing_count,
-                'failed_count': failed_count
+                'total': counts['total'],
+                'done_count': counts['done'],
+                'processing_count': counts['process'],
+                'failed_count': counts['failed'],
+                'daily': TaskCounter.daily(days=days),  # 按创建日期的各状态任务数
+                'usage': TranslateUsage.totals()
             })
         except Exception as e:
             return APIResponse.error('获取统计信息失败', 500)
+
+
+class AdminTranslateUsageResource(Resource):
+    @jwt_required()
+    def get(self):
+        """获取翻译用量汇总（按日期/模型/用户）"""
+        parser = reqparse.RequestParser()
+        parser.add_argument('days', type=int, default=30, location='args')
+        parser.add_argument('customer_id', type=int, location='args')
+        args = parser.parse_args()
+
+        try:
+            return APIResponse.success({
+                'total': TranslateUsage.totals(customer_id=args['customer_id']),
+                'daily': TranslateUsage.rollup(customer_id=args['customer_id'], days=args['days'],
+                                               by_customer=True)
+            })
+        except Exception as e:
+            return APIResponse.error('获取用量统计失败', 500)
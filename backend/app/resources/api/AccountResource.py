@@ -4,7 +4,7 @@ from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from app import db
-from app.models import Customer, SendCode
+from app.models import Customer, SendCode, StorageUsage
 from app.utils.security import hash_password, verify_password
 from app.utils.response import APIResponse
 from app.utils.mail_service import EmailService
@@ -124,7 +124,8 @@ class StorageInfoResource(Resource):
         return APIResponse.success({
             'used_storage': f"{used}",
             'total_storage': f"{total_storage}",
-            'percentage': f"{percentage:.2f}"
+            'percentage': f"{percentage:.2f}",
+            'categories': StorageUsage.summary(customer.id)  # 原文/译文分类占用
         })
 
 
@@ -1,5 +1,4 @@
 # resources/comparison.py
-import zipfile
 from io import BytesIO
 import pandas as pd
 import pytz
@@ -10,6 +9,7 @@ from app import db
 from app.models import Customer
 from app.models.comparison import Comparison, ComparisonFav
 from app.utils.response import APIResponse
+from app.utils.zip_stream import ZipStream
 from sqlalchemy import func
 from datetime import datetime
 
@@ -422,29 +422,21 @@ class ExportAllComparisonsResource(Resource):
         # 查询当前用户的所有术语表
         comparisons = Comparison.query.filter_by(customer_id=current_user_id).all()
 
-        # 创建 ZIP 文件
-        memory_file = BytesIO()
-        with zipfile.ZipFile(memory_file, 'w') as zf:
-            for comparison in comparisons:
-                # 解析术语内容
-                terms = [term.split(': ') for term in comparison.content.split(';')]  # 按 ': ' 分割
-                df = pd.DataFrame(terms, columns=['源术语', '目标术语'])
+        def build_excel(content):
+            # 解析术语内容
+            terms = [term.split(': ') for term in content.split(';')]  # 按 ': ' 分割
+            df = pd.DataFrame(terms, columns=['源术语', '目标术语'])
 
-                # 创建 Excel 文件
-                output = BytesIO()
-                with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                    df.to_excel(writer, index=False)
-                output.seek(0)
+            # 创建 Excel 文件
+            output = BytesIO()
+            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+                df.to_excel(writer, index=False)
+            return output.getvalue()
 
-                # 将 Excel 文件添加到 ZIP 中
-                zf.writestr(f"{comparison.title}.xlsx", output.getvalue())
+        # 流式生成 ZIP：每个术语表打包到该条目时才生成 Excel，同名术语表自动追加序号
+        zip_stream = ZipStream()
+        for comparison in comparisons:
+            zip_stream.add_bytes(f"{comparison.title}.xlsx",
+                                 lambda content=comparison.content: build_excel(content))
 
-        memory_file.seek(0)
-
-        # 返回 ZIP 文件下载响应
-        return send_file(
-            memory_file,
-            mimetype='application/zip',
-            as_attachment=True,
-            download_name=f'术语表_{datetime.now().strftime("%Y%m%d")}.zip'
-        )
+        return zip_stream.response(f'术语表_{datetime.now().strftime("%Y%m%d")}.zip')
@@ -6,8 +6,9 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from pathlib import Path
 
 from app import APIResponse, db
-from app.models import Customer
-from app.models.translate import Translate
+from app.models import Customer, StorageUsage
+from app.models.translate import find_translate_or_404
+from app.utils.translate_archive import restore
 from app.utils.doc2x import Doc2XService
 
 
@@ -27,11 +28,13 @@ class Doc2XTranslateStartResource(Resource):
         if customer.status == 'disabled':
             return APIResponse.error("用户状态异常", 403)
 
-        # 1. 验证翻译记录
-        translate = Translate.query.filter_by(
+        # 1. 验证翻译记录（已归档的任务先移回任务表）
+        translate = find_translate_or_404(
             id=data.get('translate_id'),
             customer_id=get_jwt_identity()
-        ).first_or_404()
+        )
+        translate = restore(translate.id)
+        db.session.commit()
 
         # if not Path(translate.origin_filepath).exists():
         #     return APIResponse.error("资源不存在", 404)
@@ -62,7 +65,6 @@ class Doc2XTranslateStartResource(Resource):
             translate.uuid = uid  # 更新为doc2x返回的UID
             translate.status = "process"
             translate.model = "doc2x"
-            customer.storage += int(data.get('size', 0))
             translate.size = data.get('size', 0)  # 更新文件大小
             db.session.commit()
 
@@ -91,10 +93,10 @@ class Doc2XTranslateStatusResource(Resource):
             return APIResponse.error("缺少translate_id参数", 400)
 
         # 1. 验证翻译记录
-        translate = Translate.query.filter_by(
+        translate = find_translate_or_404(
             id=translate_id,
             customer_id=get_jwt_identity()  # 用户隔离
-        ).first_or_404()
+        )
 
         if translate.model != "doc2x":
             return APIResponse.error("非doc2x翻译任务", 400)
@@ -146,7 +148,10 @@ class Doc2XTranslateStatusResource(Resource):
 
                     Doc2XService.download_file(download_url, save_path)
 
-                    # 更新记录
+                    # 更新记录，计入译文占用
+                    target_filesize = os.path.getsize(save_path)
+                    StorageUsage.record_result(translate.customer_id, translate.target_filesize, target_filesize)
+                    translate.target_filesize = target_filesize
                     translate.target_filepath = save_path
                     translate.status = "done"
                     translate.process = 100
@@ -1,11 +1,16 @@
 # resources/file.py
 import hashlib
+import json
+import shutil
+import time
 import uuid
 import os
 from app import db
 from app.models.customer import Customer
-from app.models.translate import Translate
+from app.models.storage_usage import StorageUsage
+from app.models.translate import Translate, find_translate, find_translate_or_404
 from app.utils.response import APIResponse
+from app.utils.file_utils import FileManager
 from pathlib import Path
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
@@ -31,45 +36,48 @@ class FileUploadResource(Resource):
             return APIResponse.error(
                 f"仅支持以下格式：{', '.join(current_app.config['ALLOWED_EXTENSIONS'])}", 400)
 
-        # 验证文件大小
-        if not self.validate_file_size(file.stream):
-            return APIResponse.error(
-                f"文件大小超过{current_app.config['MAX_FILE_SIZE'] // (1024 * 1024)}MB", 400)
-
         # 获取用户存储信息
         user_id = get_jwt_identity()
         customer = Customer.query.get(user_id)
-        file_size = request.content_length  # 使用实际内容长度
 
-        # 验证存储空间current_app.config['MAX_USER_STORAGE']
-        if customer.storage + file_size > customer.total_storage:
-            return APIResponse.error('用户存储空间不足', 403)
+        # 生成存储路径
+        save_dir = self.get_upload_dir()
+        filename = file.filename  # 直接使用原始文件名
+        save_path = os.path.join(save_dir, filename)
+
+        # 检查路径是否安全
+        if not self.is_safe_path(save_dir, save_path):
+            return APIResponse.error('文件名包含非法字符', 400)
 
         try:
-            # 生成存储路径
-            save_dir = self.get_upload_dir()
-            filename = file.filename  # 直接使用原始文件名
-            save_path = os.path.join(save_dir, filename)
+            # 流式保存：边写边计算 MD5 和实际大小，超过上限立即中止
+            file_size, file_md5 = FileManager.save_stream(
+                file.stream, save_path, max_size=current_app.config['MAX_FILE_SIZE'])
+        except ValueError as e:
+            return APIResponse.error(str(e), 400)
+        except Exception as e:
+            current_app.logger.error(f"文件上传失败：{str(e)}")
+            return APIResponse.error('文件上传失败', 500)
 
-            # 检查路径是否安全
-            if not self.is_safe_path(save_dir, save_path):
-                return APIResponse.error('文件名包含非法字符', 400)
+        return self.create_record(customer, filename, save_path, file_size, file_md5)
 
-            # 保存文件
-            file.save(save_path)
-            # 更新用户存储空间
-            customer.storage += file_size
-            db.session.commit()
+    @staticmethod
+    def create_record(customer, filename, save_path, file_size, file_md5):
+        """按实际文件大小校验存储空间并创建翻译记录（普通上传与分片上传共用）"""
+        try:
+            # 原子校验并计入存储空间（与记录在同一事务提交）
+            if not StorageUsage.reserve(customer.id, file_size):
+                db.session.rollback()
+                os.remove(save_path)
+                return APIResponse.error('用户存储空间不足', 403)
             # 生成 UUID
             file_uuid = str(uuid.uuid4())
-            # 计算文件的 MD5
-            file_md5 = self.calculate_md5(save_path)
 
             # 创建翻译记录
             translate_record = Translate(
                 translate_no=f"TRANS{datetime.now().strftime('%Y%m%d%H%M%S')}",
                 uuid=file_uuid,
-                customer_id=user_id,
+                customer_id=customer.id,
                 origin_filename=filename,
                 origin_filepath=os.path.abspath(save_path),  # 使用绝对路径
                 target_filepath='',  # 目标文件路径暂为空
@@ -87,7 +95,9 @@ class FileUploadResource(Resource):
                 'filename': filename,
                 'uuid': file_uuid,
                 'translate_id': translate_record.id,
-                'save_path': os.path.abspath(save_path)  # 返回绝对路径
+                'save_path': os.path.abspath(save_path),  # 返回绝对路径
+                'size': file_size,
+                'md5': file_md5
             })
 
         except Exception as e:
@@ -140,6 +150,243 @@ class FileUploadResource(Resource):
         return file_path.is_relative_to(base_dir)
 
 
+class ChunkUploadSession:
+    """
+    分片上传会话
+    会话信息和已收到的分片保存在 <UPLOAD_BASE_DIR>/uploads/.chunks/<upload_id>/ 下，
+    多个 worker 共享同一存储目录即可续传，无需额外的表
+    """
+    META_FILE = 'meta.json'
+
+    def __init__(self, upload_id, meta):
+        self.upload_id = upload_id
+        self.meta = meta
+
+    @staticmethod
+    def base_dir():
+        path = Path(current_app.config['UPLOAD_BASE_DIR']) / 'uploads' / '.chunks'
+        path.mkdir(parents=True, exist_ok=True)
+        return str(path)
+
+    @property
+    def dir(self):
+        return os.path.join(self.base_dir(), self.upload_id)
+
+    @property
+    def total_parts(self):
+        return max((self.meta['size'] + self.meta['chunk_size'] - 1) // self.meta['chunk_size'], 1)
+
+    def part_path(self, index):
+        return os.path.join(self.dir, f"{index:06d}.part")
+
+    def part_size(self, index):
+        """第 index 个分片应有的字节数（最后一片可能不足 chunk_size）"""
+        if index < self.total_parts - 1:
+            return self.meta['chunk_size']
+        return self.meta['size'] - self.meta['chunk_size'] * (self.total_parts - 1)
+
+    def received_parts(self):
+        return sorted(int(name.split('.')[0]) for name in os.listdir(self.dir) if name.endswith('.part'))
+
+    def to_dict(self):
+        return {
+            'upload_id': self.upload_id,
+            'filename': self.meta['filename'],
+            'size': self.meta['size'],
+            'chunk_size': self.meta['chunk_size'],
+            'total_parts': self.total_parts,
+            'received_parts': self.received_parts()
+        }
+
+    @classmethod
+    def create(cls, customer_id, filename, size, chunk_size):
+        upload_id = uuid.uuid4().hex
+        session = cls(upload_id, {
+            'customer_id': customer_id,
+            'filename': filename,
+            'size': size,
+            'chunk_size': chunk_size,
+            'created_at': time.time()
+        })
+        os.makedirs(session.dir)
+        with open(os.path.join(session.dir, cls.META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(session.meta, f)
+        return session
+
+    @classmethod
+    def load(cls, upload_id, customer_id):
+        """读取会话，不存在或不属于当前用户时返回 None"""
+        if not upload_id.isalnum():
+            return None
+        meta_path = os.path.join(cls.base_dir(), upload_id, cls.META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if str(meta['customer_id']) != str(customer_id):
+            return None
+        return cls(upload_id, meta)
+
+    @classmethod
+    def find_resumable(cls, customer_id, filename, size):
+        """查找同一用户、同名同大小的未完成会话（用于断点续传）"""
+        base_dir = cls.base_dir()
+        for upload_id in os.listdir(base_dir):
+            session = cls.load(upload_id, customer_id)
+            if session and session.meta['filename'] == filename and session.meta['size'] == size:
+                return session
+        return None
+
+    @classmethod
+    def cleanup_expired(cls):
+        """删除超过 UPLOAD_SESSION_TTL 小时未完成的会话"""
+        expire_before = time.time() - current_app.config['UPLOAD_SESSION_TTL'] * 3600
+        base_dir = cls.base_dir()
+        for upload_id in os.listdir(base_dir):
+            path = os.path.join(base_dir, upload_id)
+            if os.path.getmtime(path) < expire_before:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def discard(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+class ChunkUploadInitResource(Resource):
+    @jwt_required()
+    def post(self):
+        """
+        分片上传初始化
+        参数：filename、size（字节）；同名同大小的未完成会话直接返回，客户端按 received_parts 续传
+        """
+        data = request.form
+        filename = data.get('filename', '')
+        try:
+            size = int(data.get('size', 0))
+        except ValueError:
+            return APIResponse.error('文件大小无效', 400)
+
+        if not filename or size <= 0:
+            return APIResponse.error('缺少必要参数', 400)
+        if not FileUploadResource.allowed_file(filename):
+            return APIResponse.error(
+                f"仅支持以下格式：{', '.join(current_app.config['ALLOWED_EXTENSIONS'])}", 400)
+        if size > current_app.config['MAX_FILE_SIZE']:
+            return APIResponse.error(
+                f"文件大小超过{current_app.config['MAX_FILE_SIZE'] // (1024 * 1024)}MB", 400)
+
+        user_id = get_jwt_identity()
+        customer = Customer.query.get(user_id)
+        if customer.storage + size > customer.total_storage:
+            return APIResponse.error('用户存储空间不足', 403)
+
+        save_dir = FileUploadResource.get_upload_dir()
+        if not FileUploadResource.is_safe_path(save_dir, os.path.join(save_dir, filename)):
+            return APIResponse.error('文件名包含非法字符', 400)
+
+        try:
+            ChunkUploadSession.cleanup_expired()
+            session = ChunkUploadSession.find_resumable(user_id, filename, size) or \
+                ChunkUploadSession.create(user_id, filename, size, current_app.config['UPLOAD_CHUNK_SIZE'])
+            return APIResponse.success(session.to_dict())
+        except Exception as e:
+            current_app.logger.error(f"分片上传初始化失败：{str(e)}")
+            return APIResponse.error('分片上传初始化失败', 500)
+
+
+class ChunkUploadStatusResource(Resource):
+    @jwt_required()
+    def get(self, upload_id):
+        """查询会话及已收到的分片"""
+        session = ChunkUploadSession.load(upload_id, get_jwt_identity())
+        if not session:
+            return APIResponse.error('上传会话不存在或已过期', 404)
+        return APIResponse.success(session.to_dict())
+
+
+class ChunkUploadPartResource(Resource):
+    @jwt_required()
+    def put(self, upload_id, index):
+        """
+        上传单个分片，请求体为分片原始字节（或 multipart 的 file 字段）
+        同一分片重复上传会覆盖，失败后只需重传该分片
+        """
+        session = ChunkUploadSession.load(upload_id, get_jwt_identity())
+        if not session:
+            return APIResponse.error('上传会话不存在或已过期', 404)
+        if index < 0 or index >= session.total_parts:
+            return APIResponse.error('分片序号无效', 400)
+
+        stream = request.files['file'].stream if 'file' in request.files else request.stream
+        expected = session.part_size(index)
+        try:
+            size, _ = FileManager.save_stream(stream, session.part_path(index), max_size=expected)
+        except ValueError:
+            return APIResponse.error('分片大小不正确', 400)
+        if size != expected:
+            os.remove(session.part_path(index))
+            return APIResponse.error('分片大小不正确', 400)
+
+        return APIResponse.success({'index': index, 'received_parts': session.received_parts()})
+
+    post = put
+
+
+class ChunkUploadCompleteResource(Resource):
+    @jwt_required()
+    def post(self, upload_id):
+        """
+        合并分片并创建翻译记录
+        可选参数 md5：客户端计算的整文件 MD5，不一致时返回错误并保留分片
+        """
+        user_id = get_jwt_identity()
+        session = ChunkUploadSession.load(upload_id, user_id)
+        if not session:
+            return APIResponse.error('上传会话不存在或已过期', 404)
+
+        received = session.received_parts()
+        missing = sorted(set(range(session.total_parts)) - set(received))
+        if missing:
+            return APIResponse.error(f"缺少分片：{missing[:20]}", 400)
+
+        filename = session.meta['filename']
+        save_path = os.path.join(FileUploadResource.get_upload_dir(), filename)
+        try:
+            # 顺序读取各分片，合并写出的同时计算 MD5
+            parts = [open(session.part_path(i), 'rb') for i in range(session.total_parts)]
+            try:
+                file_size, file_md5 = FileManager.save_stream(_ChainedStream(parts), save_path)
+            finally:
+                for part in parts:
+                    part.close()
+        except Exception as e:
+            current_app.logger.error(f"分片合并失败：{str(e)}")
+            return APIResponse.error('分片合并失败', 500)
+
+        client_md5 = request.form.get('md5')
+        if file_size != session.meta['size'] or (client_md5 and client_md5.lower() != file_md5):
+            os.remove(save_path)
+            return APIResponse.error('文件校验失败，请重新上传', 400)
+
+        session.discard()
+        return FileUploadResource.create_record(
+            Customer.query.get(user_id), filename, save_path, file_size, file_md5)
+
+
+class _ChainedStream:
+    """把多个文件对象串成一个只读流"""
+
+    def __init__(self, files):
+        self.files = list(files)
+
+    def read(self, size=-1):
+        while self.files:
+            chunk = self.files[0].read(size)
+            if chunk:
+                return chunk
+            self.files.pop(0)
+        return b""
+
+
 class FileDeleteResource11(Resource):
     @jwt_required()
     def post(self):
@@ -150,11 +397,11 @@ class FileDeleteResource11(Resource):
 
         try:
             # 查询文件记录
-            translate = Translate.query.filter_by(
+            translate = find_translate_or_404(
                 uuid=data['uuid'],
                 customer_id=get_jwt_identity(),
                 deleted_flag='N'
-            ).first_or_404()
+            )
 
             # 获取文件完整路径
             base_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
@@ -165,10 +412,8 @@ class FileDeleteResource11(Resource):
             if os.path.exists(file_path):
                 os.remove(file_path)
 
-                # 更新用户存储空间
-                customer = Customer.query.get(get_jwt_identity())
-                customer.storage -= translate.origin_filesize
-
+            # 更新用户存储空间
+            StorageUsage.release(translate)
             # 删除数据库记录（或标记删除）
             db.session.delete(translate)  # 硬删除
             db.session.commit()
@@ -191,7 +436,7 @@ class FileDeleteResource(Resource):
 
         try:
             # 根据 UUID 查询翻译记录
-            translate_record = Translate.query.filter_by(uuid=data['uuid']).first()
+            translate_record = find_translate(uuid=data['uuid'])
             if not translate_record:
                 return APIResponse.error('文件记录不存在', 404)
 
@@ -201,12 +446,11 @@ class FileDeleteResource(Resource):
             # 删除物理文件
             if os.path.exists(file_path):
                 os.remove(file_path)
-                # 更新用户存储空间
-                customer = Customer.query.get(get_jwt_identity())
-                customer.storage -= translate_record.origin_filesize
             else:
                 current_app.logger.warning(f"文件不存在：{file_path}")
 
+            # 更新用户存储空间
+            StorageUsage.release(translate_record)
             # 删除数据库记录
             db.session.delete(translate_record)
             db.session.commit()
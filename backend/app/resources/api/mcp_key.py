@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from app.extensions import db
 from app.models.mcp_api_key import McpApiKey
+from app.mcp.auth import invalidate_mcp_key_cache
 from app.utils.response import APIResponse
 
 MAX_KEYS_PER_USER = 5
@@ -109,6 +110,7 @@ class McpKeyDetailResource(Resource):
             mcp_key.status = data['status']
 
         db.session.commit()
+        invalidate_mcp_key_cache()
         return APIResponse.success(mcp_key.to_dict(include_config=True))
 
     @jwt_required()
@@ -123,6 +125,7 @@ class McpKeyDetailResource(Resource):
             return APIResponse.error('密钥不存在', 404)
         mcp_key.deleted_flag = 'Y'
         db.session.commit()
+        invalidate_mcp_key_cache()
         return APIResponse.success(message='密钥已删除')
 
 
@@ -144,6 +147,7 @@ class McpKeyRegenerateResource(Resource):
         mcp_key.key_prefix = new_prefix
         mcp_key.last_used_at = None
         db.session.commit()
+        invalidate_mcp_key_cache()
 
         return APIResponse.success({
             'id': mcp_key.id,
@@ -1,18 +1,21 @@
 # resources/to_translate.py
-import json
 from pathlib import Path
-from flask import request, send_file, current_app, make_response
+from flask import request, current_app
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-from io import BytesIO
-import zipfile
 import os
-from app import db, Setting
-from app.models import Customer
-from app.models.translate import Translate
+from app import db
+from app.models import Customer, StorageUsage, TaskCounter
+from app.models.translate import Translate, TranslateArchive, find_translate, find_translate_or_404
+from app.models.translate_usage import TranslateUsage
 from app.resources.task.translate_service import TranslateEngine
 from app.utils.response import APIResponse
+from app.utils import settings_cache
+from app.utils.pagination import paginate
+from app.utils.translate_archive import restore
+from app.utils.file_utils import FileManager
+from app.utils.zip_stream import ZipStream
 from app.utils.check_utils import AIChecker
 
 # 定义翻译配置
@@ -107,19 +110,17 @@ class TranslateStartResource(Resource):
             translate_type = data.get('type[2]', 'trans_all_only_inherit')
 
             # 查询或创建翻译记录
-            translate = Translate.query.filter_by(uuid=data['uuid']).first()
+            translate = find_translate(uuid=data['uuid'])
             if not translate:
                 return APIResponse.error("未找到对应的翻译记录", 404)
+            # 已执行过的任务（失败后重试）不复用已有结果，强制重新翻译
+            reuse = translate.status == 'none' and not translate.start_at
+            # 已归档的任务（列表中重试）先移回任务表
+            translate = restore(translate.id)
+            db.session.commit()
 
-            # 从系统里面获取api_setting 分组的配置
-            api_settings = Setting.query.filter(
-                Setting.group == 'api_setting',  # 只查询 api_setting 分组
-                Setting.deleted_flag == 'N'
-            ).all()
-            # 转换成字典
-            translate_settings = {}
-            for setting in api_settings:
-                translate_settings[setting.alias] = setting.value
+            # 从系统里面获取api_setting 分组的配置（进程内缓存）
+            translate_settings = settings_cache.group('api_setting')
             # 更新翻译记录
             translate.server = data.get('server', 'openai')
             translate.origin_filename = data['file_name']
@@ -156,18 +157,18 @@ class TranslateStartResource(Resource):
             # 使用 UTC 时间并格式化
             # current_time = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f')
             # translate.created_at = current_time
-            # 保存到数据库
-            # 更新用户已用存储空间
-            customer.storage += int(translate.size)
+            # 保存到数据库（原文已在上传时计入存储空间，译文在写出后计入）
             db.session.commit()
             # with current_app.app_context():  # 确保在应用上下文中运行
             # 启动翻译引擎，传入 current_app
-            TranslateEngine(translate.id).execute()
+            engine = TranslateEngine(translate.id, reuse=reuse)
+            engine.execute()
 
             return APIResponse.success({
                 "task_id": translate.id,
                 "uuid": translate.uuid,
-                "target_path": target_abs_path
+                "target_path": target_abs_path,
+                "reused_from": engine.reused_from  # 非空表示直接复用了已有译文
             })
 
         except Exception as e:
@@ -185,32 +186,41 @@ class TranslateListResource(Resource):
         page = request.args.get('page', '1')
         limit = request.args.get('limit', '100')
         status_filter = request.args.get('status')
+        cursor = request.args.get('cursor')  # 游标分页：上一页返回的 next_cursor
         # 将字符串参数转换为整数
         try:
             page = int(page)
             limit = int(limit)
         except ValueError:
             return APIResponse.error("Invalid page or limit value"), 400
-        # 构建查询条件
-        query = Translate.query.filter_by(
-            customer_id=get_jwt_identity(),
-            deleted_flag='N'
-        )
-        # 排序
-        query = query.order_by(Translate.created_at.desc())
+        customer_id = get_jwt_identity()
         # 检查 status_filter 是否是合法值
         if status_filter:
             valid_statuses = {'none', 'process', 'done', 'failed'}
             if status_filter not in valid_statuses:
                 return APIResponse.error(f"Invalid status value: {status_filter}"), 400
-            query = query.filter_by(status=status_filter)
 
-        # 执行分页查询
-        pagination = query.paginate(page=page, per_page=limit, error_out=False)
+        # 构建查询条件（任务表与归档表相同）
+        def build_query(model):
+            query = model.query.filter_by(
+                customer_id=customer_id,
+                deleted_flag='N'
+            )
+            if status_filter:
+                query = query.filter_by(status=status_filter)
+            return query
+
+        # 执行分页查询（按创建时间倒序，合并归档表）
+        try:
+            result = paginate(build_query(Translate), Translate, page, limit, cursor=cursor,
+                              total_key=('translate', customer_id, status_filter),
+                              archive_query=build_query(TranslateArchive))
+        except ValueError as e:
+            return APIResponse.error(str(e), 400)
 
         # 处理每条记录
         data = []
-        for t in pagination.items:
+        for t in result['items']:
             # 计算花费时间（基于 created_at 和 end_at）
             # 修复时间计算（强制显示分秒格式）
             if t.start_at and t.end_at:
@@ -259,8 +269,10 @@ class TranslateListResource(Resource):
         # 返回响应数据
         return APIResponse.success({
             'data': data,
-            'total': pagination.total,
-            'current_page': pagination.page
+            'total': result['total'],
+            'current_page': result['page'],
+            'next_cursor': result['next_cursor'],
+            'has_more': result['has_more']
         })
 
     @staticmethod
@@ -303,33 +315,27 @@ class TranslateSettingResource(Resource):
         从数据库加载翻译配置[^2]
         :return: 翻译配置字典
         """
-        # 查询翻译相关的配置（api_setting 和 other_setting 分组）
-        settings = Setting.query.filter(
-            Setting.group.in_(['api_setting', 'other_setting']),
-            Setting.deleted_flag == 'N'
-        ).all()
+        # 读取翻译相关的配置（api_setting 和 other_setting 分组，进程内缓存，serialized 的值已反序列化）
+        settings = {**settings_cache.group('api_setting'), **settings_cache.group('other_setting')}
 
         # 转换为配置字典
         config = {}
-        for setting in settings:
-            # 如果 serialized 为 True，则反序列化 value
-            value = json.loads(setting.value) if setting.serialized else setting.value
-
+        for alias, value in settings.items():
             # 根据 alias 存储配置
-            if setting.alias == 'models':
+            if alias == 'models':
                 config['models'] = value.split(',') if isinstance(value, str) else value
-            elif setting.alias == 'default_model':
+            elif alias == 'default_model':
                 config['default_model'] = value
-            elif setting.alias == 'default_backup':
+            elif alias == 'default_backup':
                 config['default_backup'] = value
-            elif setting.alias == 'api_url':
+            elif alias == 'api_url':
                 config['api_url'] = value
-            elif setting.alias == 'api_key':
+            elif alias == 'api_key':
                 config['api_key'] = "sk-xxx"  # value
-            elif setting.alias == 'prompt':
+            elif alias == 'prompt':
                 config['prompt_template'] = value
-            elif setting.alias == 'threads':
-                config['max_threads'] = int(value) if value.isdigit() else 10  # 默认10线程
+            elif alias == 'threads':
+                config['max_threads'] = int(value) if str(value).isdigit() else 10  # 默认10线程
 
         # 设置默认值（如果数据库中没有相关配置）
         config.setdefault('models', ['gpt-3.5-turbo', 'gpt-4'])
@@ -348,10 +354,10 @@ class TranslateProcessResource(Resource):
     def post(self):
         """查询翻译进度"""
         uuid = request.form.get('uuid')
-        translate = Translate.query.filter_by(
+        translate = find_translate_or_404(
             uuid=uuid,
             customer_id=get_jwt_identity()
-        ).first_or_404()
+        )
 
         return APIResponse.success({
             'status': translate.status,
@@ -365,15 +371,14 @@ class TranslateDeleteResource(Resource):
         """软删除翻译记录[^4]"""
         # 查询翻译记录
         customer_id = get_jwt_identity()
-        translate = Translate.query.filter_by(
+        translate = find_translate_or_404(
             id=id,
             customer_id=customer_id
-        ).first_or_404()
-        customer = Customer.query.get(customer_id)
+        )
+        # 更新用户存储空间
+        StorageUsage.release(translate)
         # 更新 deleted_flag 为 'Y'
         translate.deleted_flag = 'Y'
-        # 更新用户存储空间
-        customer.storage -= translate.size
         db.session.commit()
 
         return APIResponse.success(message='删除成功!')
@@ -384,61 +389,36 @@ class TranslateDownloadResource(Resource):
     def get(self, id):
         """通过 ID 下载单个翻译结果文件[^5]"""
         # 查询翻译记录
-        translate = Translate.query.filter_by(
+        translate = find_translate_or_404(
             id=id,
             # customer_id=get_jwt_identity()
-        ).first_or_404()
+        )
 
         # 确保文件存在
         if not translate.target_filepath or not os.path.exists(translate.target_filepath):
             return APIResponse.error('文件不存在', 404)
 
-        # 返回文件
-        response = make_response(send_file(
-            translate.target_filepath,
-            as_attachment=True,
-            download_name=os.path.basename(translate.target_filepath)
-        ))
-
-        # 禁用缓存
-        response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
-
-        return response
+        # 返回文件（支持 ETag 协商缓存、Range 续传，可交给 nginx 发送）
+        return FileManager.send_download(translate.target_filepath)
 
 
 class TranslateDownloadAllResource(Resource):
     @jwt_required()
     def get(self):
         """批量下载所有翻译结果文件[^6]"""
-        # 查询当前用户的所有翻译记录
-        records = Translate.query.filter_by(
+        # 查询当前用户的所有翻译记录（含已归档的）
+        records = [record for model in (Translate, TranslateArchive) for record in model.query.filter_by(
             customer_id=get_jwt_identity(),
             deleted_flag='N'  # 只下载未删除的记录
-        ).all()
-
-        # 生成内存 ZIP 文件
-        zip_buffer = BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
-            for record in records:
-                if record.target_filepath and os.path.exists(record.target_filepath):
-                    # 将文件添加到 ZIP 中
-                    zip_file.write(
-                        record.target_filepath,
-                        os.path.basename(record.target_filepath)
-                    )
-
-        # 重置缓冲区指针
-        zip_buffer.seek(0)
-
-        # 返回 ZIP 文件
-        return send_file(
-            zip_buffer,
-            mimetype='application/zip',
-            as_attachment=True,
-            download_name=f"translations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-        )
+        ).all()]
+
+        # 流式生成 ZIP，边打包边发送
+        zip_stream = ZipStream()
+        for record in records:
+            if record.target_filepath and os.path.exists(record.target_filepath):
+                zip_stream.add_file(record.target_filepath)
+
+        return zip_stream.response(f"translations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
 
 
 class OpenAICheckResource(Resource):
@@ -490,24 +470,15 @@ class TranslateDeleteAllResource(Resource):
         """删除用户所有翻译记录并更新存储空间"""
         customer_id = get_jwt_identity()
 
-        # 先查询需要删除的记录及其总大小
-        records_to_delete = Translate.query.filter_by(
-            customer_id=customer_id,
-            deleted_flag='N'
-        ).all()
-
-        total_size = sum(record.size for record in records_to_delete)
-
-        # 执行批量删除
-        Translate.query.filter_by(
-            customer_id=customer_id,
-            deleted_flag='N'
-        ).delete()
-
-        # 更新用户存储空间
-        customer = Customer.query.get(customer_id)
-        if customer:
-            customer.storage = max(0, customer.storage - total_size)
+        for model in (Translate, TranslateArchive):
+            query = model.query.filter_by(
+                customer_id=customer_id,
+                deleted_flag='N'
+            )
+            # 按汇总大小扣减存储空间，再执行批量删除
+            StorageUsage.release_query(query)
+            TaskCounter.release_query(query)
+            query.delete(synchronize_session=False)
 
         db.session.commit()
         return APIResponse.success(message="全部文件删除成功!")
@@ -517,14 +488,22 @@ class TranslateFinishCountResource(Resource):
     @jwt_required()
     def get(self):
         """获取已完成翻译数量[^3]"""
-        count = Translate.query.filter_by(
-            customer_id=get_jwt_identity(),
-            status='done',
-            deleted_flag='N'
-        ).count()
+        count = TaskCounter.summary(get_jwt_identity())['done']
         return APIResponse.success({'total': count})
 
 
+class TranslateUsageResource(Resource):
+    @jwt_required()
+    def get(self):
+        """获取当前用户的翻译用量（token/请求数/耗时）"""
+        customer_id = get_jwt_identity()
+        days = request.args.get('days', 30, type=int)
+        return APIResponse.success({
+            'total': TranslateUsage.totals(customer_id=customer_id),
+            'daily': TranslateUsage.rollup(customer_id=customer_id, days=days)
+        })
+
+
 class Doc2xCheckResource(Resource):
     def post(self):
         """检查Doc2x接口[^7]"""
@@ -0,0 +1,58 @@
+import hmac
+import ipaddress
+
+from flask import current_app, make_response, request
+from flask_restful import Resource
+from prometheus_client.core import GaugeMetricFamily
+
+from app.extensions import db
+from app.models.translate import Translate
+from app.utils import metrics
+from app.utils.response import APIResponse
+
+
+class TranslateQueueCollector:
+    """按状态统计数据库中的翻译任务（队列深度），仅在抓取时查询"""
+
+    def collect(self):
+        gauge = GaugeMetricFamily(f'{metrics.PREFIX}_translate_tasks', '翻译任务数（按状态）',
+                                  labels=['status'])
+        rows = db.session.query(Translate.status, db.func.count(Translate.id)).filter(
+            Translate.deleted_flag == 'N',
+            Translate.status.in_(['none', 'process'])
+        ).group_by(Translate.status).all()
+        for status, count in rows:
+            gauge.add_metric([status], count)
+        yield gauge
+
+
+def _authorized():
+    """
+    配置了 METRICS_TOKEN 时要求 Authorization: Bearer <token>；
+    未配置时只接受来源地址（request.remote_addr，不看转发头）在 METRICS_ALLOW_CIDRS 内的请求，默认仅本机
+    """
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    try:
+        address = ipaddress.ip_address(request.remote_addr or '')
+    except ValueError:
+        return False
+    for cidr in current_app.config.get('METRICS_ALLOW_CIDRS', '').split(','):
+        try:
+            if cidr.strip() and address in ipaddress.ip_network(cidr.strip(), strict=False):
+                return True
+        except ValueError:
+            current_app.logger.warning(f"METRICS_ALLOW_CIDRS 中的网段无效: {cidr}")
+    return False
+
+
+class MetricsResource(Resource):
+    def get(self):
+        """Prometheus 指标"""
+        if not _authorized():
+            return APIResponse.error('无权访问', 403)
+        body, content_type = metrics.render([TranslateQueueCollector()])
+        response = make_response(body)
+        response.headers['Content-Type'] = content_type
+        return response
@@ -1,20 +1,38 @@
+import hashlib
 import logging
 import os
+import shutil
+import time
 from datetime import datetime
+from urllib.parse import urlparse
 from threading import Thread
 from flask import current_app
 from app.models.translate import Translate
 from app.extensions import db
 from .main import main_wrapper
+from ...utils import metrics
+from ...translate import profiler
+from ...models.translate_stage import TranslateStage
+from ...models.translate_result import TranslateResult
+from ...models.storage_usage import StorageUsage
+from ...utils.file_utils import FileManager
 from ...models.comparison import Comparison
 from ...models.prompt import Prompt
 import pytz
 
 
 class TranslateEngine:
-    def __init__(self, task_id):
+    def __init__(self, task_id, reuse=True):
+        """
+        :param reuse: 是否允许复用已有结果（重试/重启时为 False，强制重新翻译）
+        """
         self.task_id = task_id
+        self.reuse = reuse
+        self.kept_original = 0  # 翻译失败保留原文的文本块数（含任务时限耗尽）
         self.app = current_app._get_current_object()  # 获取真实app对象
+        self.reuse_key = None
+        self.reused_from = None  # 复用了哪个任务的结果（为空表示正常翻译）
+        self.accounted_size = 0  # 已计入存储占用的译文大小（重新翻译时为旧译文大小）
 
     def execute(self):
         """启动翻译任务入口"""
@@ -22,6 +40,9 @@ class TranslateEngine:
             # 在主线程上下文中准备任务
             with self.app.app_context():
                 task = self._prepare_task()
+                # 相同文件、相同翻译参数已有结果时直接复用
+                if self._try_reuse(task):
+                    return True
 
             # 启动线程时传递真实app对象和任务ID
             thr = Thread(
@@ -46,7 +67,8 @@ class TranslateEngine:
                     return
 
                 # 执行核心逻辑
-                success = self._execute_core(task)
+                with metrics.TASKS_RUNNING.track_inprogress():
+                    success = self._execute_core(task)
                 self._complete_task(success)
             except Exception as e:
                 app.logger.error(f"任务执行异常: {str(e)}", exc_info=True)
@@ -63,12 +85,18 @@ class TranslateEngine:
             # 构建符合要求的 trans 字典
             trans_config = self._build_trans_config(task)
 
-            # 调用 main_wrapper 执行翻译
-            return main_wrapper(task_id=task.id, config=trans_config,
-                                origin_path=task.origin_filepath)
+            # 调用 main_wrapper 执行翻译（各阶段耗时在结束后写入 translate_stage）
+            profiler.get_timer(trans_config)
+            try:
+                return main_wrapper(task_id=task.id, config=trans_config,
+                                    origin_path=task.origin_filepath)
+            finally:
+                self.kept_original = trans_config.get('kept_original', 0)
         except Exception as e:
             current_app.logger.error(f"翻译执行失败: {str(e)}", exc_info=True)
             return False
+        finally:
+            profiler.flush(task.id)
 
     def _prepare_task(self):
         """准备翻译任务"""
@@ -81,6 +109,7 @@ class TranslateEngine:
             raise FileNotFoundError(f"原始文件不存在: {task.origin_filepath}")
 
         # 更新任务状态
+        self.accounted_size = task.target_filesize or 0
         task.status = 'process'
         task.start_at = datetime.now(pytz.timezone(self.app.config['TIMEZONE']))  # 使用配置的时区
         db.session.commit()
@@ -90,6 +119,7 @@ class TranslateEngine:
         """构建符合文件处理器要求的 trans 字典"""
         config = {
             'id': task.id,  # 任务ID
+            'customer_id': task.customer_id,
             'target_lang': task.lang,
             'uuid': task.uuid,
             'target_path_dir': os.path.dirname(task.target_filepath),
@@ -112,12 +142,40 @@ class TranslateEngine:
             'prompt': self._get_final_prompt(task),
             'terms_dict': self._get_matched_terms(task) if task.comparison_id else None,
             'use_baidu_terms': self._should_use_baidu_terms(task),
-            'extension': os.path.splitext(task.origin_filepath)[1]
-
+            'baidu_qps': self.app.config['BAIDU_QPS'],
+            'baidu_batch': self.app.config['BAIDU_BATCH'],
+            'extension': os.path.splitext(task.origin_filepath)[1],
+            # 超时与任务时限
+            **self._get_timeouts(task),
+            'deadline': self._get_deadline(),
+            # 管理员标记的性能分析
+            'profile': TranslateStage.is_profiling(task.id)
         }
 
         return config
 
+    def _get_timeouts(self, task):
+        """
+        获取接口连接/读取超时
+        按接口域名（百度翻译为 baidu）匹配 LLM_ENDPOINT_TIMEOUTS，未配置时使用全局默认值
+        """
+        timeouts = {
+            'connect_timeout': self.app.config['LLM_CONNECT_TIMEOUT'],
+            'read_timeout': self.app.config['LLM_READ_TIMEOUT'],
+        }
+        endpoint = 'baidu' if task.server == 'baidu' else (urlparse(task.api_url or '').hostname or '')
+        override = self.app.config.get('LLM_ENDPOINT_TIMEOUTS', {}).get(endpoint) or {}
+        if override.get('connect'):
+            timeouts['connect_timeout'] = float(override['connect'])
+        if override.get('read'):
+            timeouts['read_timeout'] = float(override['read'])
+        return timeouts
+
+    def _get_deadline(self):
+        """计算任务截止时间（Unix时间戳），未配置时限时返回None"""
+        task_deadline = self.app.config.get('TASK_DEADLINE', 0)
+        return time.time() + task_deadline if task_deadline > 0 else None
+
     def _get_final_prompt(self, task):
         """
         获取最终的prompt
@@ -251,12 +309,128 @@ class TranslateEngine:
         try:
             task = db.session.query(Translate).get(self.task_id)
             if task:
+                # 处理器已通过 db.update_status 写入状态并更新计数，先刷新再写，避免按旧状态重复计数
+                db.session.refresh(task)
                 task.status = 'done' if success else 'failed'
                 task.end_at = datetime.now(pytz.timezone(self.app.config['TIMEZONE']))  # 使用配置的时区
                 task.process = 100.00 if success else 0.00
+                if success:
+                    self._account_result(task)
+                # 只登记全部文本块都译出的结果，部分保留原文的结果不供复用
+                if success and self.reuse_key and not self.kept_original:
+                    self._save_result(task)
+                else:
+                    TranslateResult.query.filter_by(translate_id=task.id).delete()
                 db.session.commit()
         except Exception as e:
             db.session.rollback()
             self.app.logger.error(f"状态更新失败: {str(e)}", exc_info=True)
 
+    def _reuse_key(self, task):
+        """
+        结果复用键：原文md5 + 目标语言/服务/模型/翻译类型 + 最终提示词 + 术语库及其内容版本
+        任一项不同都视为不同的翻译结果
+        """
+        if not task.md5 and os.path.exists(task.origin_filepath):
+            task.md5 = FileManager.calculate_md5(task.origin_filepath)
+        if not task.md5:
+            return None
 
+        comparison_version = ''
+        if task.comparison_id and task.server != 'baidu':
+            comparison = db.session.query(Comparison).get(task.comparison_id)
+            if comparison and comparison.content:
+                comparison_version = hashlib.md5(comparison.content.encode('utf-8')).hexdigest()
+
+        parts = [
+            task.md5,
+            os.path.splitext(task.origin_filepath)[1].lower(),
+            task.lang or '',
+            task.origin_lang or '',
+            task.server or '',
+            task.model or '',
+            task.type or '',
+            self._get_final_prompt(task),
+            str(task.comparison_id or ''),
+            comparison_version,
+        ]
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    def _try_reuse(self, task):
+        """
+        查找可复用的已完成结果，找到则复制到本任务目标路径并直接完成
+        :return: 是否已复用
+        """
+        try:
+            self.reuse_key = self._reuse_key(task)
+            db.session.commit()  # 保存补算的md5
+            scope = self.app.config['RESULT_REUSE_SCOPE']
+            if not self.reuse or not self.reuse_key or scope == 'off':
+                return False
+
+            query = db.session.query(Translate).join(
+                TranslateResult, TranslateResult.translate_id == Translate.id
+            ).filter(
+                TranslateResult.reuse_key == self.reuse_key,
+                Translate.id != task.id,
+                Translate.status == 'done',
+                Translate.deleted_flag == 'N'
+            )
+            if scope != 'global':
+                query = query.filter(Translate.customer_id == task.customer_id)
+
+            for source in query.order_by(Translate.id.desc()).limit(5):
+                if not source.target_filepath or not os.path.exists(source.target_filepath):
+                    continue
+                self._copy_result(source.target_filepath, task.target_filepath)
+
+                task.status = 'done'
+                task.process = 100.00
+                task.word_count = source.word_count
+                self._account_result(task)
+                task.end_at = datetime.now(pytz.timezone(self.app.config['TIMEZONE']))
+                self.reused_from = source.id
+                self._save_result(task)
+                db.session.commit()
+                logging.info(f"[任务{task.id}] 复用任务{source.id}的翻译结果")
+                return True
+        except Exception as e:
+            db.session.rollback()
+            logging.warning(f"[任务{task.id}] 结果复用失败，正常翻译: {e}")
+        return False
+
+    def _account_result(self, task):
+        """按实际译文大小更新 target_filesize 并计入存储占用（由调用方提交事务）"""
+        path = task.target_filepath
+        size = os.path.getsize(path) if path and os.path.exists(path) else 0
+        StorageUsage.record_result(task.customer_id, self.accounted_size, size)
+        task.target_filesize = size
+        self.accounted_size = size
+
+    @staticmethod
+    def _copy_result(source_path, target_path):
+        """
+        复制结果文件（同一路径直接使用）
+        不用硬链接：处理器原地写目标文件，共用 inode 时任一任务重新翻译都会覆盖另一任务的结果。
+        先写临时文件再替换，下载中的旧文件不会读到一半内容
+        """
+        if os.path.abspath(source_path) == os.path.abspath(target_path):
+            return
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        tmp_path = f"{target_path}.{os.getpid()}.tmp"
+        try:
+            shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, target_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _save_result(self, task):
+        """登记可复用结果（由调用方提交事务）"""
+        record = TranslateResult.query.filter_by(translate_id=task.id).first()
+        if record is None:
+            record = TranslateResult(translate_id=task.id)
+            db.session.add(record)
+        record.customer_id = task.customer_id
+        record.reuse_key = self.reuse_key
+        record.reused_from = self.reused_from
@@ -4,11 +4,11 @@ from app.resources.admin.customer import AdminCustomerListResource, AdminCreateC
     CustomerStatusResource
 from app.resources.admin.settings import AdminSettingNoticeResource, AdminSettingApiResource, \
     AdminSettingSiteResource, AdminInfoSettingOtherResource, \
-    AdminEditSettingOtherResource, SystemStorageResource
+    AdminEditSettingOtherResource, SystemStorageResource, SystemStorageUsageResource
 from app.resources.admin.translate import AdminTranslateListResource, \
     AdminTranslateBatchDeleteResource, AdminTranslateRestartResource, AdminTranslateDeteleResource, \
     AdminTranslateStatisticsResource, AdminTranslateDownloadResource, \
-    AdminTranslateDownloadBatchResource
+    AdminTranslateDownloadBatchResource, AdminTranslateUsageResource, AdminTranslateProfileResource
 from app.resources.admin.users import AdminUserListResource, AdminCreateUserResource, \
     AdminUserDetailResource, AdminUpdateUserResource, AdminDeleteUserResource
 from app.resources.api.AccountResource import ChangePasswordResource, EmailChangePasswordResource, \
@@ -22,7 +22,8 @@ from app.resources.api.comparison import MyComparisonListResource, SharedCompari
     ExportAllComparisonsResource
 from app.resources.api.customer import GuestIdResource, CustomerDetailResource
 from app.resources.api.doc2x import Doc2XTranslateStartResource, Doc2XTranslateStatusResource
-from app.resources.api.files import FileUploadResource, FileDeleteResource
+from app.resources.api.files import FileUploadResource, FileDeleteResource, \
+    ChunkUploadInitResource, ChunkUploadStatusResource, ChunkUploadPartResource, ChunkUploadCompleteResource
 from app.resources.api.prompt import MyPromptListResource, SharedPromptListResource, \
     EditPromptResource, SharePromptResource, CopyPromptResource, FavoritePromptResource, \
     CreatePromptResource, DeletePromptResource
@@ -32,10 +33,11 @@ from app.resources.api.translate import TranslateListResource, TranslateSettingR
     OpenAICheckResource, PDFCheckResource, TranslateTestResource, TranslateDeleteAllResource, \
     TranslateFinishCountResource,  \
      Doc2xCheckResource, TranslateStartResource, \
-    TranslateDownloadAllResource
+    TranslateDownloadAllResource, TranslateUsageResource
 from app.resources.api.mcp_key import McpKeyListResource, McpKeyCreateResource, McpKeyDetailResource, McpKeyRegenerateResource
 from app.resources.admin.mcp_key import AdminMcpKeyListResource, AdminMcpKeyCreateResource, AdminMcpKeyDetailResource, AdminMcpKeyRegenerateResource
 from app.resources.admin.prompt import AdminPromptListResource
+from app.resources.metrics import MetricsResource
 
 
 def register_routes(api):
@@ -53,6 +55,10 @@ def register_routes(api):
     api.add_resource(UserInfoResource, '/api/user-info')
 
     api.add_resource(FileUploadResource, '/api/upload')
+    api.add_resource(ChunkUploadInitResource, '/api/upload/chunk/init')
+    api.add_resource(ChunkUploadStatusResource, '/api/upload/chunk/<string:upload_id>')
+    api.add_resource(ChunkUploadPartResource, '/api/upload/chunk/<string:upload_id>/<int:index>')
+    api.add_resource(ChunkUploadCompleteResource, '/api/upload/chunk/<string:upload_id>/complete')
     api.add_resource(FileDeleteResource, '/api/delFile')
 
     api.add_resource(TranslateListResource, '/api/translates')
@@ -66,6 +72,7 @@ def register_routes(api):
     api.add_resource(TranslateTestResource, '/api/translate/test')
     api.add_resource(TranslateDeleteAllResource, '/api/translate/all')
     api.add_resource(TranslateFinishCountResource, '/api/translate/finish/count')
+    api.add_resource(TranslateUsageResource, '/api/translate/usage')
     api.add_resource(Doc2xCheckResource, '/api/check/doc2x')
     api.add_resource(TranslateStartResource, '/api/translate')  # 启动翻译
     # doc2x接口
@@ -128,7 +135,9 @@ def register_routes(api):
     api.add_resource(AdminTranslateDeteleResource, '/api/admin/translate/<int:id>')
     api.add_resource(AdminTranslateBatchDeleteResource, '/api/admin/translates/delete/batch')
     api.add_resource(AdminTranslateRestartResource, '/api/admin/translate/<int:id>/restart')
+    api.add_resource(AdminTranslateProfileResource, '/api/admin/translate/<int:id>/profile')
     api.add_resource(AdminTranslateStatisticsResource, '/api/admin/translate/statistics')
+    api.add_resource(AdminTranslateUsageResource, '/api/admin/translate/usage')
     api.add_resource(AdminTranslateDownloadResource, '/api/admin/translate/download/<int:id>')
     api.add_resource(AdminTranslateDownloadBatchResource,'/api/admin/translates/download/batch')
 
@@ -141,6 +150,7 @@ def register_routes(api):
 
     # 系统文件存储管理
     api.add_resource(SystemStorageResource, '/api/admin/system/storage')
+    api.add_resource(SystemStorageUsageResource, '/api/admin/system/storage/usage')
 
     # 管理员提示词列表
     api.add_resource(AdminPromptListResource, '/api/admin/prompts')
@@ -150,4 +160,7 @@ def register_routes(api):
     api.add_resource(AdminMcpKeyCreateResource, '/api/admin/mcp/key')
     api.add_resource(AdminMcpKeyDetailResource, '/api/admin/mcp/key/<string:id>')
     api.add_resource(AdminMcpKeyRegenerateResource, '/api/admin/mcp/key/<string:id>/regenerate')
+
+    # Prometheus 指标（需 METRICS_TOKEN，未配置时只接受 METRICS_ALLOW_CIDRS 内的来源地址；nginx 对 /api/metrics 返回 404）
+    api.add_resource(MetricsResource, '/metrics')
     print("✅ 路由配置完成")  # 添加调试输出
@@ -0,0 +1,32 @@
+"""
+归档历史翻译任务（后台线程每天自动执行，见 app/utils/translate_archive.py）
+
+用法（在 backend 目录下）：
+    python -m app.script.archive_translates                 # 按 TRANSLATE_ARCHIVE_DAYS 归档
+    python -m app.script.archive_translates --days 90
+    python -m app.script.archive_translates --dry-run       # 只统计可归档的任务数
+"""
+import argparse
+import logging
+
+
+def main():
+    parser = argparse.ArgumentParser(description='归档历史翻译任务')
+    parser.add_argument('--days', type=int, help='归档创建超过多少天的任务，默认 TRANSLATE_ARCHIVE_DAYS')
+    parser.add_argument('--batch-size', type=int, help='每批移动的任务数，默认 TRANSLATE_ARCHIVE_BATCH')
+    parser.add_argument('--dry-run', action='store_true', help='只统计可归档的任务数')
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.utils.translate_archive import archive
+    with create_app().app_context():
+        try:
+            result = archive(days=args.days, batch_size=args.batch_size, dry_run=args.dry_run)
+        except ValueError as e:
+            parser.error(str(e))
+    print(f"{'可归档' if args.dry_run else '已归档'} {result['archived']} 个任务（创建早于 {result['cutoff']:%Y-%m-%d}）")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,128 @@
+"""
+translate 表热点查询索引迁移
+
+init.sql 建出的 translate 表只有主键，进度轮询（uuid）、任务列表（customer_id+deleted_flag+created_at）、
+状态统计（status+deleted_flag）和 md5 查询都是全表扫描。本迁移为已有数据库补建索引：
+- MIGRATIONS 中每一项为一次迁移，按顺序执行未记录的迁移
+- 按名称检查，已存在的索引跳过，可重复执行
+- init.sql 中这些列是 TEXT 类型，MySQL 需按前缀建索引；create_all 建出的 VARCHAR/ENUM 列不加前缀
+- MySQL 使用在线 DDL（ALGORITHM=INPLACE, LOCK=NONE），建索引期间不阻塞读写，完成后 ANALYZE 更新统计信息
+- 文件名 ngram 全文索引（管理后台搜索，见 app/utils/search.py，任务表与归档表各一个）仅在 MySQL 上创建；
+  首个全文索引需要重建表，建索引期间只允许读（LOCK=SHARED）。容器启动时 migrate_startup.py 与 gunicorn 同时运行，
+  建索引期间任务表的写入（含任务状态、进度更新）会等待，大表首次升级建议在维护窗口先手动执行本脚本
+- 每项执行完成后写入 migrations 表
+
+用法（在 backend 目录下，启动时由 migrate_startup.py 自动执行）：
+    python -m app.script.migrate_indexes
+    python -m app.script.migrate_indexes --dry-run   # 只打印 DDL
+"""
+import argparse
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.types import Text
+
+logger = logging.getLogger(__name__)
+
+# 索引名 -> [(列名, TEXT 列的前缀长度)]
+TRANSLATE_INDEXES = {
+    'idx_translate_uuid': [('uuid', 64)],
+    'idx_translate_customer_list': [('customer_id', None), ('deleted_flag', 1), ('created_at', None)],
+    'idx_translate_status': [('status', 16), ('deleted_flag', 1)],
+    'idx_translate_md5': [('md5', 32)],
+    'idx_translate_created': [('created_at', None)],  # 管理后台按创建时间的游标分页
+}
+
+# 全文索引（仅 MySQL）：索引名 -> [(列名, None)]
+FULLTEXT_INDEXES = {
+    'ft_translate_filename': [('origin_filename', None)],
+    'ft_translate_archive_filename': [('origin_filename', None)],
+}
+
+# 迁移名（记录在 migrations 表）-> (表名, 该迁移创建的索引)，按顺序执行
+MIGRATIONS = {
+    'translate_hot_query_indexes': ('translate', ['idx_translate_uuid', 'idx_translate_customer_list',
+                                                  'idx_translate_status', 'idx_translate_md5']),
+    'translate_created_at_index': ('translate', ['idx_translate_created']),
+    'translate_filename_fulltext': ('translate', ['ft_translate_filename']),
+    'translate_archive_filename_fulltext': ('translate_archive', ['ft_translate_archive_filename']),
+}
+
+
+def index_ddl(engine, table, name, columns):
+    """生成建索引语句（MySQL 的 TEXT 列自动加前缀）"""
+    if name in FULLTEXT_INDEXES:
+        parts = ', '.join(f"`{column}`" for column, _ in columns)
+        return f"ALTER TABLE `{table}` ADD FULLTEXT INDEX `{name}` ({parts}) WITH PARSER ngram, " \
+               f"ALGORITHM=INPLACE, LOCK=SHARED"
+    if engine.dialect.name != 'mysql':
+        return f"CREATE INDEX {name} ON {table} ({', '.join(column for column, _ in columns)})"
+
+    column_types = {c['name']: c['type'] for c in inspect(engine).get_columns(table)}
+    parts = []
+    for column, prefix in columns:
+        if prefix and isinstance(column_types.get(column), Text):
+            parts.append(f"`{column}`({prefix})")
+        else:
+            parts.append(f"`{column}`")
+    return f"ALTER TABLE `{table}` ADD INDEX `{name}` ({', '.join(parts)}), ALGORITHM=INPLACE, LOCK=NONE"
+
+
+def ensure_indexes(engine, table='translate', indexes=None, dry_run=False):
+    """
+    补建缺失的索引
+    :return: 新建（dry_run 时为待建）的 [(索引名, DDL)]
+    """
+    indexes = indexes or TRANSLATE_INDEXES
+    existing = {index['name'] for index in inspect(engine).get_indexes(table)}
+    pending = [(name, index_ddl(engine, table, name, columns))
+               for name, columns in indexes.items()
+               if name not in existing and (name not in FULLTEXT_INDEXES or engine.dialect.name == 'mysql')]
+    if dry_run:
+        return pending
+
+    for name, ddl in pending:
+        logger.info(f"创建索引 {table}.{name}: {ddl}")
+        with engine.begin() as conn:
+            conn.execute(text(ddl))
+    if pending:
+        # 更新统计信息，否则优化器可能在 uuid+customer_id 查询上选错索引
+        with engine.begin() as conn:
+            conn.execute(text(f"ANALYZE TABLE `{table}`" if engine.dialect.name == 'mysql' else f"ANALYZE {table}"))
+    return pending
+
+
+def run(app, dry_run=False):
+    """在应用上下文中执行迁移，已记录在 migrations 表中的跳过"""
+    from app.extensions import db
+    from app.models.migration import Migration
+
+    created = []
+    with app.app_context():
+        done = {m.migration for m in Migration.query.filter(Migration.migration.in_(MIGRATIONS)).all()}
+        batch = (db.session.query(db.func.max(Migration.batch)).scalar() or 0) + 1
+        for name, (table, index_names) in MIGRATIONS.items():
+            if name in done:
+                continue
+            indexes = {index: TRANSLATE_INDEXES.get(index) or FULLTEXT_INDEXES[index] for index in index_names}
+            created += ensure_indexes(db.engine, table=table, indexes=indexes, dry_run=dry_run)
+            if not dry_run:
+                db.session.add(Migration(migration=name, batch=batch))
+                db.session.commit()
+        return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description='translate 表热点查询索引迁移')
+    parser.add_argument('--dry-run', action='store_true', help='只打印待执行的 DDL')
+    args = parser.parse_args()
+
+    from app import create_app
+    for name, ddl in run(create_app(), dry_run=args.dry_run):
+        print(f"{name}: {ddl}")
+    print('索引迁移完成' if not args.dry_run else '以上为待执行的 DDL')
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,78 @@
+"""
+重建翻译任务计数（task_counter）
+
+按 translate 与归档表 translate_archive 重新统计 用户+创建日期+状态 的任务数，与已有计数比较后按差值修正：
+- 先锁定全站合计行再统计：任务状态变更总是最先更新这些行，重建期间的变更会等待重建提交后再按增量计入
+- 首次启动时由 migrate_startup.py 执行一次以初始化计数（记录在 migrations 表），之后出现偏差时手动执行
+
+用法（在 backend 目录下）：
+    python -m app.script.rebuild_task_counters
+    python -m app.script.rebuild_task_counters --dry-run   # 只统计偏差，不修改
+"""
+import argparse
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_NAME = 'task_counter_init'
+
+
+def rebuild(dry_run=False):
+    """
+    重建计数（需在应用上下文中调用）
+    :return: {'rows': 计数行数, 'fixed': 修正的行数}
+    """
+    from app.extensions import db
+    from app.models.task_counter import TaskCounter
+    from app.models.translate import Translate, TranslateArchive
+
+    try:
+        TaskCounter.query.filter_by(customer_id=TaskCounter.TOTAL_ID, day=TaskCounter.ALL_DAYS) \
+            .with_for_update().all()
+        actual = TaskCounter.tally(Translate.query) + TaskCounter.tally(TranslateArchive.query)
+        recorded = Counter({(row.customer_id, row.day, row.status): int(row.task_count)
+                            for row in TaskCounter.query.all()})
+        changes = Counter({key: actual[key] - recorded[key] for key in set(actual) | set(recorded)
+                           if actual[key] != recorded[key]})
+        if changes and not dry_run:
+            TaskCounter.apply(db.session.connection(), changes)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    for (customer_id, day, status), delta in sorted(changes.items()):
+        logger.info(f"计数偏差 用户{customer_id} {day} {status}: {delta:+d}")
+    return {'rows': len(actual), 'fixed': len(changes)}
+
+
+def run(app):
+    """启动时初始化计数，已记录在 migrations 表中时跳过"""
+    from app.extensions import db
+    from app.models.migration import Migration
+
+    with app.app_context():
+        if Migration.query.filter_by(migration=MIGRATION_NAME).first():
+            return None
+        result = rebuild()
+        batch = (db.session.query(db.func.max(Migration.batch)).scalar() or 0) + 1
+        db.session.add(Migration(migration=MIGRATION_NAME, batch=batch))
+        db.session.commit()
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按 translate 表重建任务计数')
+    parser.add_argument('--dry-run', action='store_true', help='只统计偏差，不修改')
+    args = parser.parse_args()
+
+    from app import create_app
+    with create_app().app_context():
+        result = rebuild(dry_run=args.dry_run)
+    print(f"计数行 {result['rows']}，{'存在偏差' if args.dry_run else '已修正'} {result['fixed']} 行")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
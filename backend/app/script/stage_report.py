@@ -0,0 +1,84 @@
+"""
+翻译任务阶段耗时报告
+
+用法（在 backend 目录下，读取 .env 中的 PROD_DATABASE_URL）：
+    python -m app.script.stage_report                    # 总耗时最长的 20 个任务
+    python -m app.script.stage_report --stage translate  # 按某个阶段排序
+    python -m app.script.stage_report --days 7 --limit 50
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+
+from app.translate import db
+
+
+def load_rows(days):
+    since = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+    return db.get_all(
+        "SELECT s.translate_id, s.stages, s.total_seconds, s.profile_dir, t.origin_filename, t.server, t.model "
+        "FROM translate_stage s LEFT JOIN translate t ON t.id = s.translate_id "
+        "WHERE s.updated_at >= %s",
+        since
+    )
+
+
+def summarize(rows, stage=None, limit=20):
+    """按阶段（或总耗时）排序，返回最慢的任务和各阶段汇总"""
+    tasks = []
+    totals = {}
+    for row in rows:
+        stages = json.loads(row.get('stages') or '{}')
+        for name, seconds in stages.items():
+            totals.setdefault(name, []).append(seconds)
+        tasks.append({**row, 'stages': stages})
+
+    if stage:
+        tasks.sort(key=lambda t: t['stages'].get(stage, 0), reverse=True)
+    else:
+        tasks.sort(key=lambda t: t.get('total_seconds') or 0, reverse=True)
+
+    summary = {
+        name: {
+            'count': len(values),
+            'avg': round(sum(values) / len(values), 3),
+            'max': round(max(values), 3),
+            'sum': round(sum(values), 3),
+        }
+        for name, values in totals.items()
+    }
+    return tasks[:limit], summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='翻译任务阶段耗时报告')
+    parser.add_argument('--stage', help='按该阶段耗时排序（parse/extract/translate/apply/save/write...）')
+    parser.add_argument('--days', type=int, default=30, help='统计最近N天，默认30')
+    parser.add_argument('--limit', type=int, default=20, help='输出任务数，默认20')
+    parser.add_argument('--json', action='store_true', help='以JSON输出')
+    args = parser.parse_args()
+
+    tasks, summary = summarize(load_rows(args.days), args.stage, args.limit)
+
+    if args.json:
+        print(json.dumps({'tasks': tasks, 'summary': summary}, ensure_ascii=False, indent=2, default=str))
+        return
+
+    print(f"{'阶段':<14}{'次数':>8}{'平均(秒)':>12}{'最大(秒)':>12}{'合计(秒)':>12}")
+    for name, item in sorted(summary.items(), key=lambda kv: kv[1]['sum'], reverse=True):
+        print(f"{name:<14}{item['count']:>8}{item['avg']:>12}{item['max']:>12}{item['sum']:>12}")
+
+    print()
+    print(f"最慢的 {len(tasks)} 个任务（按{args.stage or '总耗时'}排序）：")
+    for task in tasks:
+        stages = ', '.join(f"{name}={seconds}s" for name, seconds in
+                           sorted(task['stages'].items(), key=lambda kv: kv[1], reverse=True))
+        print(f"[任务{task['translate_id']}] {task.get('origin_filename') or ''} "
+              f"{task.get('server') or ''}/{task.get('model') or ''} "
+              f"总耗时={task.get('total_seconds') or 0}s  {stages}")
+        if task.get('profile_dir'):
+            print(f"    性能分析: {task['profile_dir']}")
+
+
+if __name__ == '__main__':
+    main()
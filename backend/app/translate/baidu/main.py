@@ -1,29 +1,119 @@
 import json
+import os
+import threading
+import time
 
 import requests
 import random
 import hashlib
+from typing import List
+from requests.adapters import HTTPAdapter
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
+# 可通过环境变量指向本地模拟接口（benchmark.mock_llm）
+BAIDU_API_URL = os.getenv('BAIDU_API_URL', "https://fanyi-api.baidu.com/api/trans/vip/translate")
 
-def baidu_translate(
-        text: str,
-        appid: str,
-        app_key: str,
-        from_lang: str = 'auto',
-        to_lang: str = 'en',
-        use_term_base: bool = False,
-) -> str:
-    """
-    参数:
-        text: 要翻译的文本（多行文本用换行符分隔）
-        appid: 百度API的APP ID
-        key: 百度API的密钥
-        from_lang: 源语言代码（默认auto自动检测）
-        to_lang: 目标语言代码（默认en英语）
-        use_term_base: 是否启用术语库（通过needIntervene=1控制）
+# 单次请求 q 的最大字节数（百度建议不超过6000字节）
+MAX_BATCH_BYTES = 6000
+# 标准版账号默认QPS
+DEFAULT_QPS = 1
+# 跨进程限流的时间戳文件目录（gunicorn 各 worker 与 MCP 服务共用）
+QPS_STATE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), 'storage')
+
+_session = None
+_session_lock = threading.Lock()
 
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """获取进程内共享的HTTPS会话（复用TCP/TLS连接）"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+class _QpsLimiter:
+    """按最小请求间隔限流，保证同一 app_id 的请求不超过 qps"""
+
+    def __init__(self, qps: float):
+        self.qps = qps
+        self.interval = 1.0 / qps
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _acquire_qps_shared(appid: str, qps: float) -> bool:
+    """
+    跨进程获取请求配额：storage/.baidu_qps_<md5(app_id)> 中记录下一次允许请求的时间，
+    加文件锁读取并顺延一个间隔后等待到该时间。无法加锁（Windows、目录不可写）时返回 False
     """
+    if fcntl is None:
+        return False
+    path = os.path.join(QPS_STATE_DIR, f".baidu_qps_{hashlib.md5(appid.encode()).hexdigest()}")
+    try:
+        os.makedirs(QPS_STATE_DIR, exist_ok=True)
+        with open(path, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    next_time = float(f.read().strip() or 0)
+                except ValueError:
+                    next_time = 0.0
+                now = time.time()
+                wait = next_time - now
+                f.seek(0)
+                f.truncate()
+                f.write(str(max(now, next_time) + 1.0 / qps))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    except OSError:
+        return False
+    if wait > 0:
+        time.sleep(wait)
+    return True
+
+
+def _acquire_qps(appid: str, qps: float):
+    """获取指定 app_id 的请求配额（同一台机器的所有进程共享，无法跨进程时退回进程内限流）"""
+    if not qps or qps <= 0:
+        return
+    if _acquire_qps_shared(appid, qps):
+        return
+    with _limiters_lock:
+        limiter = _limiters.get(appid)
+        if limiter is None or limiter.qps != qps:
+            limiter = _QpsLimiter(qps)
+            _limiters[appid] = limiter
+    limiter.acquire()
+
+
+def _request(text: str, appid: str, app_key: str, from_lang: str, to_lang: str,
+             use_term_base: bool, timeout, qps: float) -> list:
+    """发送一次翻译请求，返回 trans_result 列表"""
     # 1. 生成签名参数
     salt = str(random.randint(32768, 65536))
     sign_str = appid + text + salt + app_key
@@ -41,22 +131,109 @@ def baidu_translate(
     if use_term_base:
         params['needIntervene'] = 1  # 启用术语库
 
-    # 3. 发送请求
+    # 3. 发送请求（POST 表单，避免长文本超出URL长度限制）
+    _acquire_qps(appid, qps)
     try:
-        response = requests.get(
-            "https://fanyi-api.baidu.com/api/trans/vip/translate",
-            params=params,
-            timeout=60
-        )
+        response = _get_session().post(BAIDU_API_URL, data=params, timeout=timeout)
         result = response.json()
 
         if 'error_code' in result:
             raise Exception(f"百度API错误 {result['error_code']}: {result['error_msg']}")
 
-        # 4. 拼接翻译结果（保留原文换行结构）
-        return '\n'.join(item['dst'] for item in result['trans_result'])
+        return result['trans_result']
 
     except requests.exceptions.RequestException as e:
         raise Exception(f"网络请求失败: {str(e)}")
     except json.JSONDecodeError:
-        raise Exception("百度API返回数据解析失败")
\ No newline at end of file
+        raise Exception("百度API返回数据解析失败")
+
+
+def baidu_translate(
+        text: str,
+        appid: str,
+        app_key: str,
+        from_lang: str = 'auto',
+        to_lang: str = 'en',
+        use_term_base: bool = False,
+        timeout=60,
+        qps: float = DEFAULT_QPS,
+) -> str:
+    """
+    参数:
+        text: 要翻译的文本（多行文本用换行符分隔）
+        appid: 百度API的APP ID
+        key: 百度API的密钥
+        from_lang: 源语言代码（默认auto自动检测）
+        to_lang: 目标语言代码（默认en英语）
+        use_term_base: 是否启用术语库（通过needIntervene=1控制）
+        timeout: 请求超时（秒），或 (连接超时, 读取超时) 元组
+        qps: 该 app_id 允许的每秒请求数
+
+    """
+    trans_result = _request(text, appid, app_key, from_lang, to_lang, use_term_base, timeout, qps)
+    # 拼接翻译结果（保留原文换行结构）
+    return '\n'.join(item['dst'] for item in trans_result)
+
+
+def pack_segments(segments: List[str], max_bytes: int = MAX_BATCH_BYTES) -> List[List[int]]:
+    """
+    将文本块按字节上限打包
+    :param segments: 文本块列表
+    :return: 每个包包含的文本块下标列表
+    """
+    packs = []
+    current = []
+    current_bytes = 0
+    for index, segment in enumerate(segments):
+        size = len(segment.encode('utf-8')) + 1  # 换行分隔符
+        if current and current_bytes + size > max_bytes:
+            packs.append(current)
+            current = []
+            current_bytes = 0
+        current.append(index)
+        current_bytes += size
+    if current:
+        packs.append(current)
+    return packs
+
+
+def baidu_translate_batch(
+        segments: List[str],
+        appid: str,
+        app_key: str,
+        from_lang: str = 'auto',
+        to_lang: str = 'en',
+        use_term_base: bool = False,
+        timeout=60,
+        qps: float = DEFAULT_QPS,
+) -> List[str]:
+    """
+    批量翻译：多个文本块按行合并为一次请求，再按行映射回各文本块
+    空行不参与请求，原样保留
+    :return: 与 segments 一一对应的译文列表
+    """
+    lines = []
+    layouts = []  # 每个文本块的行布局：int 为 lines 下标，str 为原样保留的空行
+    for segment in segments:
+        layout = []
+        for line in segment.split('\n'):
+            if line.strip():
+                layout.append(len(lines))
+                lines.append(line)
+            else:
+                layout.append(line)
+        layouts.append(layout)
+
+    if not lines:
+        return list(segments)
+
+    trans_result = _request('\n'.join(lines), appid, app_key, from_lang, to_lang,
+                            use_term_base, timeout, qps)
+    if len(trans_result) != len(lines):
+        raise Exception(f"百度API返回行数不匹配: 请求{len(lines)}行，返回{len(trans_result)}行")
+
+    dst_lines = [item['dst'] for item in trans_result]
+    return [
+        '\n'.join(dst_lines[part] if isinstance(part, int) else part for part in layout)
+        for layout in layouts
+    ]
@@ -8,6 +8,7 @@ from typing import List, Dict, Any, Tuple
 from threading import Event
 from . import to_translate
 from . import common
+from . import profiler
 
 # 分块配置
 MAX_CHUNK_SIZE = 1500
@@ -24,7 +25,8 @@ def start(trans: Dict[str, Any]) -> bool:
 
     # 读取CSV文件
     try:
-        content, encoding, dialect = _read_csv_file(trans['file_path'])
+        with profiler.stage(trans, 'parse'):
+            content, encoding, dialect = _read_csv_file(trans['file_path'])
     except Exception as e:
         logging.error(f"[任务{translate_id}] 读取CSV文件失败: {e}")
         to_translate.error(translate_id, f"读取CSV文件失败: {str(e)}")
@@ -40,47 +42,48 @@ def start(trans: Dict[str, Any]) -> bool:
     texts = []
     cell_map = []  # 记录单元格位置
 
-    for row_idx, row in enumerate(content):
-        for col_idx, cell in enumerate(row):
-            if _should_translate(cell):
-                # 检查是否需要分块
-                if len(cell) > MAX_CHUNK_SIZE:
-                    sub_cells = _split_cell(cell, MAX_CHUNK_SIZE)
-                    parent_uid = f"cell_{row_idx}_{col_idx}"
-                    for i, sub_cell in enumerate(sub_cells):
+    with profiler.stage(trans, 'extract'):
+        for row_idx, row in enumerate(content):
+            for col_idx, cell in enumerate(row):
+                if _should_translate(cell):
+                    # 检查是否需要分块
+                    if len(cell) > MAX_CHUNK_SIZE:
+                        sub_cells = _split_cell(cell, MAX_CHUNK_SIZE)
+                        parent_uid = f"cell_{row_idx}_{col_idx}"
+                        for i, sub_cell in enumerate(sub_cells):
+                            texts.append({
+                                'text': sub_cell,
+                                'original': sub_cell,
+                                'complete': False,
+                                'count': 0,
+                                '_uid': f"{parent_uid}_{i}",
+                                'is_sub': True,
+                                'sub_index': i,
+                                'sub_total': len(sub_cells)
+                            })
+                            cell_map.append({
+                                'row': row_idx,
+                                'col': col_idx,
+                                'text_index': len(texts) - 1,
+                                'is_sub': True,
+                                'parent_uid': parent_uid
+                            })
+                    else:
+                        uid = f"cell_{row_idx}_{col_idx}"
                         texts.append({
-                            'text': sub_cell,
-                            'original': sub_cell,
+                            'text': cell,
+                            'original': cell,
                             'complete': False,
                             'count': 0,
-                            '_uid': f"{parent_uid}_{i}",
-                            'is_sub': True,
-                            'sub_index': i,
-                            'sub_total': len(sub_cells)
+                            '_uid': uid,
+                            'is_sub': False
                         })
                         cell_map.append({
                             'row': row_idx,
                             'col': col_idx,
                             'text_index': len(texts) - 1,
-                            'is_sub': True,
-                            'parent_uid': parent_uid
+                            'is_sub': False
                         })
-                else:
-                    uid = f"cell_{row_idx}_{col_idx}"
-                    texts.append({
-                        'text': cell,
-                        'original': cell,
-                        'complete': False,
-                        'count': 0,
-                        '_uid': uid,
-                        'is_sub': False
-                    })
-                    cell_map.append({
-                        'row': row_idx,
-                        'col': col_idx,
-                        'text_index': len(texts) - 1,
-                        'is_sub': False
-                    })
 
     if not texts:
         logging.info(f"[任务{translate_id}] CSV中没有需要翻译的内容")
@@ -92,14 +95,17 @@ def start(trans: Dict[str, Any]) -> bool:
 
     # 批量翻译
     event = Event()
-    success = to_translate.translate_batch(trans, texts, event)
+    with profiler.stage(trans, 'translate'):
+        success = to_translate.translate_batch(trans, texts, event)
     if not success:
         return False
 
     # 重建CSV内容
     try:
-        text_count = _rebuild_csv(content, texts, cell_map, trans.get('type', ''))
-        _write_csv_file(trans['target_file'], content, encoding, dialect)
+        with profiler.stage(trans, 'apply'):
+            text_count = _rebuild_csv(content, texts, cell_map, trans.get('type', ''))
+        with profiler.stage(trans, 'save'):
+            _write_csv_file(trans['target_file'], content, encoding, dialect)
     except Exception as e:
         logging.error(f"[任务{translate_id}] 写入CSV文件失败: {e}")
         to_translate.error(translate_id, f"写入CSV文件失败: {str(e)}")
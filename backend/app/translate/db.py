@@ -9,6 +9,8 @@ import pymysql
 import os
 from dotenv import load_dotenv, find_dotenv
 
+from ..utils.metrics import observe_db
+
 _ = load_dotenv(find_dotenv())
 
 # 全局锁
@@ -72,7 +74,7 @@ def execute(sql: str, *params) -> bool:
     执行SQL语句（INSERT/UPDATE/DELETE）
     :return: 是否成功
     """
-    with _db_lock:
+    with observe_db('execute'), _db_lock:
         try:
             with get_connection() as conn:
                 cursor = conn.cursor()
@@ -85,12 +87,56 @@ def execute(sql: str, *params) -> bool:
             return False
 
 
+def update_status(translate_id, status: str, assignments: str = '', *params) -> bool:
+    """
+    更新任务状态，并在同一事务内同步 task_counter（与 app/models/task_counter.py 的 ORM 更新规则一致）
+    :param assignments: 额外的 SET 片段，如 "end_at=NOW(), failed_reason=%s"，参数依次放在 params 中
+    :return: 是否成功
+    """
+    with observe_db('update_status'), _db_lock:
+        try:
+            with get_connection() as conn:
+                if hasattr(conn, 'begin'):
+                    conn.begin()  # MySQL 连接为自动提交，这里显式开启事务
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT customer_id, status, deleted_flag, DATE(created_at) AS day "
+                    "FROM translate WHERE id=%s FOR UPDATE", (translate_id,)
+                )
+                row = cursor.fetchone()
+                sets = "status=%s" + (f", {assignments}" if assignments else "")
+                cursor.execute(f"UPDATE translate SET {sets} WHERE id=%s", (status, *params, translate_id))
+
+                # 已删除的任务计入 deleted，状态变化不影响计数
+                if row and row['status'] != status and row['deleted_flag'] != 'Y':
+                    customer_id = row['customer_id'] or 0
+                    changes = {}
+                    for bucket, delta in ((row['status'] or 'none', -1), (status, 1)):
+                        for customer in sorted({0, customer_id}):
+                            for day in ['1970-01-01'] + ([str(row['day'])] if row['day'] else []):
+                                changes[(customer, day, bucket)] = delta
+                    # 与 ORM 相同按 (用户, 日期, 状态) 顺序加锁
+                    for (customer, day, bucket), delta in sorted(changes.items()):
+                        cursor.execute(
+                            "INSERT INTO task_counter (customer_id, day, status, task_count, updated_at) "
+                            "VALUES (%s, %s, %s, %s, NOW()) "
+                            "ON DUPLICATE KEY UPDATE task_count=task_count+VALUES(task_count), updated_at=NOW()",
+                            (customer, day, bucket, delta)
+                        )
+                conn.commit()
+                cursor.close()
+                return True
+        except Exception as e:
+            logging.error(f"任务{translate_id}状态更新失败: {e}")
+            return False
+
+
 def get(sql: str, *params) -> dict:
     """
     查询单条记录
     :return: 字典或空字典
     """
-    with _db_lock:
+    with observe_db('get'), _db_lock:
         try:
             with get_connection() as conn:
                 cursor = conn.cursor()
@@ -118,7 +164,7 @@ def get_all(sql: str, *params) -> list:
     查询多条记录
     :return: 字典列表
     """
-    with _db_lock:
+    with observe_db('get_all'), _db_lock:
         try:
             with get_connection() as conn:
                 cursor = conn.cursor()
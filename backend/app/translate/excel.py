@@ -8,6 +8,7 @@ from openpyxl.worksheet.worksheet import Worksheet
 
 from . import to_translate
 from . import common
+from . import profiler
 
 
 def start(trans: Dict[str, Any]) -> bool:
@@ -21,7 +22,8 @@ def start(trans: Dict[str, Any]) -> bool:
 
     # 加载工作簿
     try:
-        wb = openpyxl.load_workbook(trans['file_path'])
+        with profiler.stage(trans, 'parse'):
+            wb = openpyxl.load_workbook(trans['file_path'])
     except Exception as e:
         logging.error(f"[任务{translate_id}] 无法打开Excel文件: {e}")
         to_translate.error(translate_id, f"无法打开Excel文件: {str(e)}")
@@ -32,9 +34,10 @@ def start(trans: Dict[str, Any]) -> bool:
     cell_map = []  # 记录单元格位置，用于回写
 
     try:
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            _extract_sheet_texts(ws, sheet_name, texts, cell_map)
+        with profiler.stage(trans, 'extract'):
+            for sheet_name in wb.sheetnames:
+                ws = wb[sheet_name]
+                _extract_sheet_texts(ws, sheet_name, texts, cell_map)
     except Exception as e:
         logging.error(f"[任务{translate_id}] 提取文本失败: {e}")
         to_translate.error(translate_id, f"提取文本失败: {str(e)}")
@@ -50,14 +53,17 @@ def start(trans: Dict[str, Any]) -> bool:
 
     # 【关键修改】使用线程池批量翻译
     event = Event()
-    success = to_translate.translate_batch(trans, texts, event)
+    with profiler.stage(trans, 'translate'):
+        success = to_translate.translate_batch(trans, texts, event)
     if not success:
         return False
 
     # 回写翻译结果
     try:
-        text_count = _apply_translation(wb, texts, cell_map, trans.get('type', ''))
-        wb.save(trans['target_file'])
+        with profiler.stage(trans, 'apply'):
+            text_count = _apply_translation(wb, texts, cell_map, trans.get('type', ''))
+        with profiler.stage(trans, 'save'):
+            wb.save(trans['target_file'])
     except Exception as e:
         logging.error(f"[任务{translate_id}] 保存文件失败: {e}")
         to_translate.error(translate_id, f"保存文件失败: {str(e)}")
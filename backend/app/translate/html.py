@@ -17,6 +17,7 @@ import threading
 from typing import List, Dict, Tuple
 from . import to_translate
 from . import common
+from . import profiler
 
 MAX_CHUNK_SIZE = 2000
 
@@ -56,7 +57,8 @@ def start(trans: Dict) -> bool:
     start_time = datetime.datetime.now()
 
     try:
-        content, encoding = _read_file(trans['file_path'])
+        with profiler.stage(trans, 'parse'):
+            content, encoding = _read_file(trans['file_path'])
     except Exception as e:
         logging.error(f"[任务{translate_id}] 读取文件失败: {e}")
         to_translate.error(translate_id, f"读取文件失败: {str(e)}")
@@ -76,7 +78,8 @@ def start(trans: Dict) -> bool:
         return False
 
     try:
-        soup = BeautifulSoup(content, 'html.parser')
+        with profiler.stage(trans, 'parse'):
+            soup = BeautifulSoup(content, 'html.parser')
     except Exception as e:
         logging.error(f"[任务{translate_id}] HTML解析失败: {e}")
         to_translate.error(translate_id, f"HTML解析失败: {str(e)}")
@@ -86,7 +89,8 @@ def start(trans: Dict) -> bool:
     extracted_texts = []
 
     try:
-        _extract_and_placeholder(soup, placeholder_map, extracted_texts)
+        with profiler.stage(trans, 'extract'):
+            _extract_and_placeholder(soup, placeholder_map, extracted_texts)
     except Exception as e:
         logging.error(f"[任务{translate_id}] 提取文本节点失败: {e}")
         to_translate.error(translate_id, f"提取文本节点失败: {str(e)}")
@@ -112,12 +116,14 @@ def start(trans: Dict) -> bool:
         f"其中 {to_translate_count} 个需要翻译")
 
     event = threading.Event()
-    success = to_translate.translate_batch(trans, texts, event)
+    with profiler.stage(trans, 'translate'):
+        success = to_translate.translate_batch(trans, texts, event)
     if not success:
         return False
 
     try:
-        text_count = _write_result(trans, texts, extracted_texts, placeholder_map, soup)
+        with profiler.stage(trans, 'write'):
+            text_count = _write_result(trans, texts, extracted_texts, placeholder_map, soup)
     except Exception as e:
         logging.error(f"[任务{translate_id}] 写入文件失败: {e}")
         to_translate.error(translate_id, f"写入文件失败: {str(e)}")
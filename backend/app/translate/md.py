@@ -17,6 +17,7 @@ from typing import List, Dict, Tuple
 from dataclasses import dataclass
 from . import to_translate
 from . import common
+from . import profiler
 
 # 分块配置
 MAX_CHUNK_SIZE = 2000
@@ -41,7 +42,7 @@ def start(trans: Dict) -> bool:
 
     # 读取文件
     try:
-        with open(trans['file_path'], 'r', encoding='utf-8') as f:
+        with profiler.stage(trans, 'parse'), open(trans['file_path'], 'r', encoding='utf-8') as f:
             content = f.read()
     except UnicodeDecodeError:
         try:
@@ -64,10 +65,11 @@ def start(trans: Dict) -> bool:
         return True
 
     # 预处理：保护特殊语法
-    processed_content, protected_blocks = _protect_special_syntax(content)
+    with profiler.stage(trans, 'extract'):
+        processed_content, protected_blocks = _protect_special_syntax(content)
 
-    # 智能分块
-    texts = _smart_chunk_markdown(processed_content)
+        # 智能分块
+        texts = _smart_chunk_markdown(processed_content)
 
     # 统计需要翻译的块数
     to_translate_count = sum(1 for t in texts if not t.get('skip', False))
@@ -84,13 +86,15 @@ def start(trans: Dict) -> bool:
 
     # 执行翻译
     event = Event()
-    success = to_translate.translate_batch(trans, texts, event)
+    with profiler.stage(trans, 'translate'):
+        success = to_translate.translate_batch(trans, texts, event)
     if not success:
         return False
 
     # 重建文档并写入结果
     try:
-        text_count = _write_result(trans, texts, protected_blocks)
+        with profiler.stage(trans, 'write'):
+            text_count = _write_result(trans, texts, protected_blocks)
     except Exception as e:
         logging.error(f"[任务{translate_id}] 写入文件失败: {e}")
         to_translate.error(translate_id, f"写入文件失败: {str(e)}")
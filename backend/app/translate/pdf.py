@@ -6,11 +6,9 @@ import datetime
 from pathlib import Path
 from babeldoc.format.pdf import high_level
 from babeldoc.translator.translator import OpenAITranslator
-from babeldoc.docvision.table_detection.rapidocr import RapidOCRModel
 from babeldoc.format.pdf.translation_config import TranslationConfig, WatermarkOutputMode
 
-from . import common, db, to_translate
-from babeldoc.docvision.doclayout import DocLayoutModel
+from . import common, db, to_translate, profiler, pdf_models
 
 logger = logging.getLogger(__name__)
 
@@ -56,27 +54,60 @@ def clean_output_filename(original_path: Path, output_dir: str) -> Path:
     return new_path if new_path.exists() else None
 
 
+def count_pdf_text(pdf_path):
+    """统计PDF原文字数（与其他格式的 count_text 口径一致）"""
+    try:
+        import fitz  # PyMuPDF
+        with fitz.open(str(pdf_path)) as doc:
+            return sum(to_translate.count_text(page.get_text()) for page in doc)
+    except Exception as e:
+        logger.warning(f"统计PDF字数失败: {e}")
+        return 0
+
+
+def _counter_value(translator, name):
+    """读取 babeldoc 翻译器的 token 计数器"""
+    counter = getattr(translator, name, None)
+    return int(getattr(counter, 'value', 0) or 0)
+
+
+def _record_translator_usage(trans, translator, spend_time):
+    """记录 babeldoc 翻译器的累计 token 用量"""
+    to_translate.record_usage(
+        trans,
+        trans.get('model', 'gpt-4o-mini'),
+        prompt_tokens=_counter_value(translator, 'prompt_token_count'),
+        completion_tokens=_counter_value(translator, 'completion_token_count'),
+        latency_ms=spend_time * 1000
+    )
+
+
 async def async_translate_pdf(trans):
     """异步PDF翻译核心函数"""
+    models = {}  # 从进程内模型池借出的实例，结束时归还
     try:
         start_time = datetime.datetime.now()
         original_path = Path(trans['file_path'])
 
         logger.info(f"开始翻译PDF: {original_path}")
 
-        # 初始化翻译库
-        high_level.init()
+        # 初始化翻译库（每个进程只初始化一次）
+        with profiler.stage(trans, 'init'):
+            pdf_models.init()
 
         # 转换语言代码
         target_lang = common.convert_language_name_to_code(trans['lang'])
         logger.info(f"目标语言: {target_lang}")
 
-        # 初始化文档布局模型
-        doc_layout_model = DocLayoutModel.load_onnx()
-        logger.info("文档布局模型加载完成")
+        # 借出文档布局模型（进程内复用，池中没有空闲实例时才加载）
+        with profiler.stage(trans, 'load_models'):
+            models['layout'] = doc_layout_model = pdf_models.acquire('layout')
+            logger.info("文档布局模型加载完成")
 
-        # 初始化表格模型（根据参数决定是否启用）
-        table_model = RapidOCRModel() if trans.get('translate_table', False) else None
+            # 表格模型（根据参数决定是否启用）
+            if trans.get('translate_table', False):
+                models['table'] = pdf_models.acquire('table')
+            table_model = models.get('table')
         if table_model:
             logger.info("表格识别模型已启用")
 
@@ -136,60 +167,64 @@ async def async_translate_pdf(trans):
 
         logger.info("开始执行PDF翻译...")
 
-        # 执行翻译 - 修复事件处理逻辑
-        async for event in high_level.async_translate(config):
-            logger.debug(f"收到事件: {event}")
-
-            if event["type"] == "progress_update":  # 修复事件类型
-                progress = event.get("overall_progress", 0)
-                db.execute(
-                    "UPDATE translate SET process=%s WHERE id=%s",
-                    int(progress),
-                    trans['id']
-                )
-                logger.info(f"翻译进度: {progress}%")
-
-            elif event["type"] == "finish":
-                logger.info("翻译完成")
-                # 处理输出文件名
-                final_path = clean_output_filename(original_path, trans['target_path_dir'])
-
-                # 更新数据库记录
-                if final_path and final_path.exists():
+        # 执行翻译 - 修复事件处理逻辑（整个事件循环计为 translate 阶段，含解析/排版/写出）
+        with profiler.stage(trans, 'translate'):
+            async for event in high_level.async_translate(config):
+                logger.debug(f"收到事件: {event}")
+
+                if event["type"] == "progress_update":  # 修复事件类型
+                    progress = event.get("overall_progress", 0)
                     db.execute(
-                        "UPDATE translate SET target_file=%s WHERE id=%s",
-                        str(final_path),
+                        "UPDATE translate SET process=%s WHERE id=%s",
+                        int(progress),
                         trans['id']
                     )
-                    logger.info(f"输出文件: {final_path}")
-
-                # 计算token使用量
-                spend_time = (datetime.datetime.now() - start_time).total_seconds()
-
-                # 触发完成回调
-                to_translate.complete(
-                    trans,
-                    text_count=1,  # PDF按文件计数
-                    spend_time=spend_time
-                )
-                return True
-
-            elif event["type"] == "error":
-                error_msg = event.get("error", "未知错误")
-                logger.error(f"翻译过程中出现错误: {error_msg}")
-                db.execute(
-                    "UPDATE translate SET status='failed', failed_reason=%s WHERE id=%s",
-                    str(error_msg), trans['id']
-                )
-                return False
+                    logger.info(f"翻译进度: {progress}%")
+
+                elif event["type"] == "finish":
+                    logger.info("翻译完成")
+                    # 处理输出文件名
+                    final_path = clean_output_filename(original_path, trans['target_path_dir'])
+
+                    # 更新数据库记录
+                    if final_path and final_path.exists():
+                        db.execute(
+                            "UPDATE translate SET target_file=%s WHERE id=%s",
+                            str(final_path),
+                            trans['id']
+                        )
+                        logger.info(f"输出文件: {final_path}")
+
+                    # 计算token使用量
+                    spend_time = (datetime.datetime.now() - start_time).total_seconds()
+                    _record_translator_usage(trans, translator, spend_time)
+
+                    if final_path and final_path.exists():
+                        trans['target_file'] = str(final_path)
+
+                    # 触发完成回调
+                    to_translate.complete(
+                        trans,
+                        text_count=count_pdf_text(original_path),
+                        spend_time=spend_time
+                    )
+                    return True
+
+                elif event["type"] == "error":
+                    error_msg = event.get("error", "未知错误")
+                    logger.error(f"翻译过程中出现错误: {error_msg}")
+                    db.update_status(trans['id'], 'failed', "failed_reason=%s", str(error_msg))
+                    _record_translator_usage(trans, translator, (datetime.datetime.now() - start_time).total_seconds())
+                    to_translate.flush_usage(trans['id'])
+                    return False
 
     except Exception as e:
         logger.error(f"PDF翻译失败: {str(e)}", exc_info=True)
-        db.execute(
-            "UPDATE translate SET status='failed', failed_reason=%s WHERE id=%s",
-            str(e), trans['id']
-        )
+        db.update_status(trans['id'], 'failed', "failed_reason=%s", str(e))
         return False
+    finally:
+        for name, model in models.items():
+            pdf_models.release(name, model)
 
 
 def translate_pdf(trans):
@@ -219,10 +254,7 @@ def start(trans):
             raise ValueError(f"文件不是PDF格式: {trans['file_path']}")
 
         # 初始化任务状态
-        db.execute(
-            "UPDATE translate SET status='process', process=0, start_at=NOW() WHERE id=%s",
-            trans['id']
-        )
+        db.update_status(trans['id'], 'process', "process=0, start_at=NOW()")
 
         # 确保输出目录存在
         os.makedirs(trans['target_path_dir'], exist_ok=True)
@@ -237,8 +269,5 @@ def start(trans):
 
     except Exception as e:
         logger.error(f"PDF任务初始化失败: {str(e)}")
-        db.execute(
-            "UPDATE translate SET status='failed', failed_reason=%s WHERE id=%s",
-            str(e), trans['id']
-        )
+        db.update_status(trans['id'], 'failed', "failed_reason=%s", str(e))
         return False
@@ -0,0 +1,95 @@
+# translate/pdf_models.py
+"""
+PDF 布局/表格识别模型进程内复用
+
+babeldoc 的 ONNX 模型每次加载需数秒、占用数百 MB，不再每个 PDF 任务重新加载：
+- 每个进程按模型维护一个小实例池，任务开始时借出（acquire）、结束时归还（release），
+  同一实例同一时间只被一个任务使用，不依赖模型本身是否线程安全
+- 池中没有空闲实例时新建一个，归还时空闲实例超过 PDF_MODEL_POOL_SIZE 的直接丢弃（0 为不复用）
+- high_level.init() 每个进程只执行一次
+- PDF_MODEL_WARMUP 开启时，每个 worker 启动后（app.start_background_jobs）在后台线程预先初始化并加载布局模型；
+  未预热的进程在第一个 PDF 任务时加载
+"""
+import logging
+import threading
+import time
+
+from babeldoc.format.pdf import high_level
+from babeldoc.docvision.doclayout import DocLayoutModel
+from babeldoc.docvision.table_detection.rapidocr import RapidOCRModel
+
+logger = logging.getLogger(__name__)
+
+LOADERS = {
+    'layout': DocLayoutModel.load_onnx,  # 文档布局模型
+    'table': RapidOCRModel,              # 表格识别模型
+}
+
+_pool_size = 2
+_idle = {name: [] for name in LOADERS}  # {模型名: [空闲实例]}
+_idle_lock = threading.Lock()
+_load_locks = {name: threading.Lock() for name in LOADERS}
+
+_init_lock = threading.Lock()
+_initialized = False
+_warmup_started = False
+
+
+def init():
+    """babeldoc 全局初始化（每个进程一次）"""
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if not _initialized:
+            high_level.init()
+            _initialized = True
+
+
+def _take(name):
+    with _idle_lock:
+        return _idle[name].pop() if _idle[name] else None
+
+
+def acquire(name):
+    """借出一个模型实例，用完后必须 release"""
+    model = _take(name)
+    if model is not None:
+        return model
+    # 同一模型同一时间只加载一个：等待期间预热完成或有实例归还时直接借出
+    with _load_locks[name]:
+        model = _take(name)
+        if model is None:
+            started = time.perf_counter()
+            model = LOADERS[name]()
+            logger.info(f"PDF模型 {name} 加载完成，耗时{time.perf_counter() - started:.1f}s")
+    return model
+
+
+def release(name, model):
+    """归还模型实例"""
+    with _idle_lock:
+        if len(_idle[name]) < _pool_size:
+            _idle[name].append(model)
+
+
+def warmup():
+    """初始化 babeldoc 并加载布局模型放入池中"""
+    try:
+        init()
+        release('layout', acquire('layout'))
+    except Exception as e:
+        logger.error(f"PDF模型预热失败: {e}")
+
+
+def start(app):
+    """按配置设置池大小，开启预热时启动后台预热线程（每个进程一次，测试环境不预热）"""
+    global _pool_size, _warmup_started
+    _pool_size = app.config.get('PDF_MODEL_POOL_SIZE', 2)
+    if not app.config.get('PDF_MODEL_WARMUP') or app.config.get('TESTING') or _pool_size <= 0:
+        return
+    with _init_lock:
+        if _warmup_started:
+            return
+        _warmup_started = True
+    threading.Thread(target=warmup, name='pdf_model_warmup', daemon=True).start()
@@ -37,6 +37,7 @@ from lxml import etree
 
 from . import to_translate
 from . import common
+from . import profiler
 
 # ==================== 配置 ====================
 
@@ -130,7 +131,8 @@ def start(trans: Dict[str, Any]) -> bool:
 
     # 打开文件
     try:
-        prs = Presentation(trans['file_path'])
+        with profiler.stage(trans, 'parse'):
+            prs = Presentation(trans['file_path'])
     except Exception as e:
         logging.error(f"[任务{translate_id}] 打开PPT失败: {e}")
         to_translate.error(translate_id, f"打开PPT失败: {str(e)}")
@@ -142,7 +144,8 @@ def start(trans: Dict[str, Any]) -> bool:
 
     # 提取文本块
     try:
-        all_blocks = _extract_all_blocks(prs)
+        with profiler.stage(trans, 'extract'):
+            all_blocks = _extract_all_blocks(prs)
     except Exception as e:
         logging.error(f"[任务{translate_id}] 提取文本失败: {e}")
         to_translate.error(translate_id, f"提取文本失败: {str(e)}")
@@ -161,7 +164,8 @@ def start(trans: Dict[str, Any]) -> bool:
     # 执行翻译
     texts = _blocks_to_api_format(to_translate_blocks)
     event = Event()
-    success = to_translate.translate_batch(trans, texts, event)
+    with profiler.stage(trans, 'translate'):
+        success = to_translate.translate_batch(trans, texts, event)
 
     if not success:
         return False
@@ -170,14 +174,16 @@ def start(trans: Dict[str, Any]) -> bool:
 
     # 应用翻译
     try:
-        if is_bilingual:
-            text_count = _apply_bilingual_mode(prs, all_blocks, target_lang,
-                                               slide_width, slide_height)
-        else:
-            text_count = _apply_translation_mode(prs, all_blocks, target_lang,
-                                                 slide_width, slide_height)
+        with profiler.stage(trans, 'apply'):
+            if is_bilingual:
+                text_count = _apply_bilingual_mode(prs, all_blocks, target_lang,
+                                                   slide_width, slide_height)
+            else:
+                text_count = _apply_translation_mode(prs, all_blocks, target_lang,
+                                                     slide_width, slide_height)
 
-        prs.save(trans['target_file'])
+        with profiler.stage(trans, 'save'):
+            prs.save(trans['target_file'])
     except Exception as e:
         logging.error(f"[任务{translate_id}] 保存失败: {e}")
         to_translate.error(translate_id, f"保存失败: {str(e)}")
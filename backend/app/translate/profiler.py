@@ -0,0 +1,223 @@
+# translate/profiler.py
+"""
+翻译任务阶段计时与性能分析
+
+处理器在 start() 中用 stage(trans, '阶段名') 包裹各阶段，耗时按任务累计，
+任务结束时由 flush() 写入 translate_stage 表。
+
+任务被管理员标记为性能分析（trans['profile']）时，额外在各阶段开启 cProfile，
+并在阶段边界保存 tracemalloc 快照，产物写在输出文件旁的 <文件名>.profile 目录。
+cProfile 只记录开启它的线程：translate_batch 线程池中的翻译请求由 worker(trans) 在各工作线程单独采样，
+结束时与主线程的结果合并（累计耗时为各线程之和，可能超过墙钟时间）。
+PDF（babeldoc）内部线程不在采样范围内，其翻译耗时只体现在 translate 阶段计时中。
+"""
+import io
+import json
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+import cProfile
+from contextlib import contextmanager
+from threading import Lock
+
+from . import db
+
+# cProfile 同一时间只能有一个在运行，性能分析任务之间互斥
+_profile_lock = Lock()
+
+_timers_lock = Lock()
+_task_timers = {}  # {task_id: TaskTimer}
+
+PROFILE_TOP_N = 40  # 文本报告中输出的函数/内存分配条数
+
+
+class TaskTimer:
+    """单个任务的阶段计时器"""
+
+    def __init__(self, translate_id, profile_dir=None):
+        self.translate_id = translate_id
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.profile_dir = None
+        self.profiler = None
+        self._worker_stats = None  # 线程池工作线程的采样结果（pstats.Stats，合并后写出）
+        self._worker_lock = Lock()
+        self._started_tracemalloc = False
+        self._snapshot_index = 0
+
+        if profile_dir and _profile_lock.acquire(blocking=False):
+            try:
+                os.makedirs(profile_dir, exist_ok=True)
+                self.profile_dir = profile_dir
+                self.profiler = cProfile.Profile()
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._started_tracemalloc = True
+            except Exception as e:
+                logging.warning(f"[任务{translate_id}] 无法开启性能分析: {e}")
+                self.profile_dir = None
+                self.profiler = None
+                _profile_lock.release()
+        elif profile_dir:
+            logging.warning(f"[任务{translate_id}] 已有任务在做性能分析，本任务仅记录阶段耗时")
+
+    @contextmanager
+    def stage(self, name):
+        """计时一个阶段（同名阶段累加）"""
+        started = time.perf_counter()
+        if self.profiler:
+            self.profiler.enable()
+        try:
+            yield
+        finally:
+            if self.profiler:
+                self.profiler.disable()
+            self.stages[name] = round(self.stages.get(name, 0) + time.perf_counter() - started, 3)
+            if self.profile_dir:
+                self._snapshot(name)
+
+    @contextmanager
+    def worker(self):
+        """在线程池工作线程中采样（仅性能分析任务），结束后合并到任务结果"""
+        if not self.profiler:
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # Python 3.12+ 同一时间只允许一个 profiler
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._worker_lock:
+                if self._worker_stats is None:
+                    self._worker_stats = pstats.Stats(profile)
+                else:
+                    self._worker_stats.add(profile)
+
+    def _snapshot(self, name):
+        """阶段结束时保存内存快照"""
+        try:
+            self._snapshot_index += 1
+            path = os.path.join(self.profile_dir, f"{self._snapshot_index:02d}_{name}.tracemalloc")
+            tracemalloc.take_snapshot().dump(path)
+        except Exception as e:
+            logging.warning(f"[任务{self.translate_id}] 保存内存快照失败: {e}")
+
+    def finish(self):
+        """结束计时，写出性能分析产物，返回总耗时（秒）"""
+        total = round(time.perf_counter() - self.started, 3)
+        if not self.profiler:
+            return total
+
+        try:
+            stats = pstats.Stats(self.profiler)
+            if self._worker_stats is not None:
+                stats.add(self._worker_stats)
+            stats.dump_stats(os.path.join(self.profile_dir, 'profile.prof'))
+            stream = io.StringIO()
+            stats.stream = stream
+            stats.sort_stats('cumulative').print_stats(PROFILE_TOP_N)
+            with open(os.path.join(self.profile_dir, 'profile.txt'), 'w', encoding='utf-8') as f:
+                f.write(stream.getvalue())
+
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics('lineno')[:PROFILE_TOP_N]
+            with open(os.path.join(self.profile_dir, 'memory.txt'), 'w', encoding='utf-8') as f:
+                f.write(f"current={current} peak={peak}\n")
+                f.write('\n'.join(str(stat) for stat in top))
+
+            with open(os.path.join(self.profile_dir, 'stages.json'), 'w', encoding='utf-8') as f:
+                json.dump({'stages': self.stages, 'total_seconds': total}, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logging.warning(f"[任务{self.translate_id}] 写出性能分析结果失败: {e}")
+        finally:
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            self.profiler = None
+            _profile_lock.release()
+        return total
+
+
+def profile_dir_for(trans):
+    """性能分析产物目录：输出文件旁的 <文件名>.profile"""
+    target_file = trans.get('target_file') or ''
+    if not target_file:
+        return None
+    return os.path.splitext(target_file)[0] + '.profile'
+
+
+def get_timer(trans):
+    """获取（或创建）任务计时器"""
+    translate_id = trans['id']
+    with _timers_lock:
+        timer = _task_timers.get(translate_id)
+        if timer is None:
+            profile_dir = profile_dir_for(trans) if trans.get('profile') else None
+            timer = _task_timers[translate_id] = TaskTimer(translate_id, profile_dir)
+        return timer
+
+
+@contextmanager
+def stage(trans, name):
+    """
+    计时一个处理阶段
+    用法: with profiler.stage(trans, 'extract'): ...
+    """
+    with get_timer(trans).stage(name):
+        yield
+
+
+@contextmanager
+def worker(trans):
+    """
+    线程池工作线程中执行一段任务代码，性能分析任务在本线程采样
+    用法: with profiler.worker(trans): ...
+    """
+    with _timers_lock:
+        timer = _task_timers.get(trans['id'])
+    if timer is None:
+        yield
+        return
+    with timer.worker():
+        yield
+
+
+def flush(translate_id):
+    """任务结束：写出性能分析产物并保存阶段耗时"""
+    with _timers_lock:
+        timer = _task_timers.pop(translate_id, None)
+    if timer is None:
+        return
+
+    total = timer.finish()
+    stages = json.dumps(timer.stages, ensure_ascii=False)
+    logging.info(f"[任务{translate_id}] 阶段耗时: {stages}，总耗时 {total}秒")
+
+    try:
+        if not db.get("SELECT id FROM translate_stage WHERE translate_id=%s", translate_id):
+            db.execute(
+                "INSERT INTO translate_stage (translate_id, profile, stages, total_seconds, profile_dir, "
+                "created_at, updated_at) VALUES (%s, 0, %s, %s, %s, NOW(), NOW())",
+                translate_id, stages, total, timer.profile_dir
+            )
+        elif timer.profile_dir:
+            # 性能分析为一次性开关，完成后复位
+            db.execute(
+                "UPDATE translate_stage SET stages=%s, total_seconds=%s, profile_dir=%s, profile=0, "
+                "updated_at=NOW() WHERE translate_id=%s",
+                stages, total, timer.profile_dir, translate_id
+            )
+        else:
+            db.execute(
+                "UPDATE translate_stage SET stages=%s, total_seconds=%s, updated_at=NOW() "
+                "WHERE translate_id=%s",
+                stages, total, translate_id
+            )
+    except Exception as e:
+        logging.error(f"[任务{translate_id}] 保存阶段耗时失败: {e}")
@@ -1,22 +1,36 @@
 # translate/to_translate.py
 import logging
+import os
 import re
 import time
+import httpx
 import openai
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import  Lock
 from . import common
 from . import db
+from . import profiler
+from ..utils import metrics
 
 # 重试配置
 MAX_RETRIES = 3
 RETRY_DELAY = 5  # 秒
 
+# 超时配置（秒），trans 中未提供时使用
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 120
+MIN_REQUEST_BUDGET = 3  # 任务剩余时限低于该值时不再发起新请求
+
 # 进度更新锁
 _progress_lock = Lock()
 
 _last_reported_progress = {}  # 存储每个任务的上次报告进度 {task_id: progress}
 
+# 用量统计锁
+_usage_lock = Lock()
+
+_task_usage = {}  # 每个任务按模型累计的用量 {task_id: {model: usage}}
+
 
 def update_progress(texts, translate_id, force_update=False):
     """
@@ -64,12 +78,13 @@ def complete(trans, text_count, spend_time):
     """标记任务完成"""
     try:
         translate_id = trans['id']
-        target_filesize = 1
+        target_file = trans.get('target_file')
+        target_filesize = os.path.getsize(target_file) if target_file and os.path.exists(target_file) else 0
 
-        db.execute(
-            "UPDATE translate SET status='done', end_at=NOW(), process=100, "
-            "target_filesize=%s, word_count=%s WHERE id=%s",
-            target_filesize, text_count, translate_id
+        db.update_status(
+            translate_id, 'done',
+            "end_at=NOW(), process=100, target_filesize=%s, word_count=%s",
+            target_filesize, text_count
         )
 
         # 清理进度缓存
@@ -79,6 +94,8 @@ def complete(trans, text_count, spend_time):
 
     except Exception as e:
         logging.error(f"更新完成状态失败: {e}")
+    finally:
+        flush_usage(trans['id'])
 
 
 def error(translate_id, message):
@@ -89,13 +106,75 @@ def error(translate_id, message):
         # 清理进度缓存
         _last_reported_progress.pop(translate_id, None)
 
-        db.execute(
-            "UPDATE translate SET failed_count=failed_count+1, status='failed', "
-            "end_at=NOW(), failed_reason=%s WHERE id=%s",
-            message, translate_id
+        db.update_status(
+            translate_id, 'failed',
+            "failed_count=failed_count+1, end_at=NOW(), failed_reason=%s",
+            message
         )
     except Exception as e:
         logging.error(f"更新失败状态失败: {e}")
+    finally:
+        flush_usage(translate_id)
+
+
+def record_usage(trans, model, prompt_tokens=0, completion_tokens=0, cached_tokens=0,
+                 latency_ms=0, failed=False):
+    """
+    累计单次请求的用量（内存中按任务/模型汇总，任务结束时写库）
+    :param failed: 请求是否失败
+    """
+    translate_id = trans['id']
+    server = trans.get('server', 'openai')
+    metrics.LLM_REQUEST_SECONDS.labels(server, model, 'error' if failed else 'ok').observe(
+        (latency_ms or 0) / 1000)
+    for token_type, value in (('prompt', prompt_tokens), ('completion', completion_tokens),
+                              ('cached', cached_tokens)):
+        if value:
+            metrics.LLM_TOKENS.labels(server, model, token_type).inc(value)
+
+    with _usage_lock:
+        models = _task_usage.setdefault(translate_id, {})
+        usage = models.get(model)
+        if usage is None:
+            usage = models[model] = {
+                'customer_id': trans.get('customer_id', 0),
+                'server': server,
+                'request_count': 0,
+                'failed_requests': 0,
+                'prompt_tokens': 0,
+                'completion_tokens': 0,
+                'cached_tokens': 0,
+                'latency_ms': 0,
+            }
+        if failed:
+            usage['failed_requests'] += 1
+        else:
+            usage['request_count'] += 1
+        usage['prompt_tokens'] += prompt_tokens or 0
+        usage['completion_tokens'] += completion_tokens or 0
+        usage['cached_tokens'] += cached_tokens or 0
+        usage['latency_ms'] += int(latency_ms or 0)
+
+
+def flush_usage(translate_id):
+    """将任务累计用量写入 translate_usage 表"""
+    with _usage_lock:
+        models = _task_usage.pop(translate_id, None)
+    if not models:
+        return
+
+    for model, usage in models.items():
+        try:
+            db.execute(
+                "INSERT INTO translate_usage (translate_id, customer_id, server, model, request_count, "
+                "failed_requests, prompt_tokens, completion_tokens, cached_tokens, latency_ms, created_at) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())",
+                translate_id, usage['customer_id'], usage['server'], model,
+                usage['request_count'], usage['failed_requests'], usage['prompt_tokens'],
+                usage['completion_tokens'], usage['cached_tokens'], usage['latency_ms']
+            )
+        except Exception as e:
+            logging.error(f"[任务{translate_id}] 写入用量失败: {e}")
 
 
 class TranslationError(Exception):
@@ -108,6 +187,56 @@ class FatalError(TranslationError):
     pass
 
 
+class DeadlineExceeded(TranslationError):
+    """任务时限已耗尽，保留原文"""
+    pass
+
+
+def _remaining_budget(trans):
+    """任务剩余时限（秒），未设置时限时返回None"""
+    deadline = trans.get('deadline')
+    if not deadline:
+        return None
+    return deadline - time.time()
+
+
+def _has_budget(trans):
+    """是否还有足够时限发起请求"""
+    remaining = _remaining_budget(trans)
+    return remaining is None or remaining > MIN_REQUEST_BUDGET
+
+
+def _is_budget_short(trans):
+    """剩余时限是否已不足以完成多轮重试"""
+    remaining = _remaining_budget(trans)
+    if remaining is None:
+        return False
+    return remaining < float(trans.get('read_timeout') or DEFAULT_READ_TIMEOUT) * 2
+
+
+def _request_timeout(trans):
+    """
+    计算单次请求的连接/读取超时，读取超时随任务剩余时限收缩
+    :return: (connect_timeout, read_timeout)
+    """
+    connect = float(trans.get('connect_timeout') or DEFAULT_CONNECT_TIMEOUT)
+    read = float(trans.get('read_timeout') or DEFAULT_READ_TIMEOUT)
+    remaining = _remaining_budget(trans)
+    if remaining is not None:
+        read = max(min(read, remaining), 1.0)
+        connect = min(connect, read)
+    return connect, read
+
+
+def _sleep_within_budget(trans, seconds):
+    """重试等待，不超出任务剩余时限"""
+    remaining = _remaining_budget(trans)
+    if remaining is not None:
+        seconds = min(seconds, max(remaining - MIN_REQUEST_BUDGET, 0))
+    if seconds > 0:
+        time.sleep(seconds)
+
+
 def translate_batch(trans, texts, event):
     """
     批量翻译文本块（线程池模式）
@@ -134,6 +263,7 @@ def translate_batch(trans, texts, event):
     has_fatal_error = False
     completed_count = 0
     total_count = len(to_translate_indices)
+    handler = metrics.handler_name(trans)
 
     def translate_single(index):
         """翻译单个文本块"""
@@ -149,6 +279,7 @@ def translate_batch(trans, texts, event):
             text_item['text'] = result['translated_text']
             text_item['count'] = result['count']
             text_item['complete'] = True
+            metrics.SEGMENTS.labels(handler, 'ok').inc()
 
             # 更新进度
             with _progress_lock:
@@ -169,31 +300,75 @@ def translate_batch(trans, texts, event):
             logging.error(f"[任务{translate_id}] 文本块{index}翻译失败，保留原文: {str(e)}")
             text_item['complete'] = True
             text_item['count'] = count_text(text_item.get('text', ''))
+            metrics.SEGMENTS.labels(handler, 'kept_original').inc()
 
             with _progress_lock:
                 completed_count += 1
+                trans['kept_original'] = trans.get('kept_original', 0) + 1
 
             return True  # 保留原文，继续处理其他块
 
-    # 使用线程池执行
-    with ThreadPoolExecutor(max_workers=max_threads) as executor:
-        # 提交所有任务
-        future_to_index = {
-            executor.submit(translate_single, idx): idx
-            for idx in to_translate_indices
-        }
-
-        # 等待完成
-        for future in as_completed(future_to_index):
-            if event.is_set() or has_fatal_error:
-                # 取消剩余任务
-                executor.shutdown(wait=False, cancel_futures=True)
-                return False
+    def translate_pack(indices):
+        """百度打包翻译：一次请求翻译多个文本块，失败时逐块回退"""
+        nonlocal completed_count
 
-            try:
-                future.result()
-            except Exception as e:
-                logging.error(f"[任务{translate_id}] 线程执行异常: {e}")
+        if event.is_set() or has_fatal_error:
+            return False
+
+        translated = _translate_baidu_pack(trans, [texts[i].get('text', '') for i in indices])
+        if translated is None:
+            return all([translate_single(idx) for idx in indices])
+
+        for idx, text in zip(indices, translated):
+            original_text = texts[idx].get('text', '')
+            texts[idx]['text'] = text
+            texts[idx]['count'] = count_text(original_text)
+            texts[idx]['complete'] = True
+        metrics.SEGMENTS.labels(handler, 'ok').inc(len(indices))
+
+        with _progress_lock:
+            completed_count += len(indices)
+            progress = round((completed_count / total_count) * 100, 1)
+            db.execute("UPDATE translate SET process=%s WHERE id=%s", progress, translate_id)
+        return True
+
+    # 百度翻译按请求字节上限打包，其他服务逐块翻译
+    if trans.get('server') == 'baidu' and trans.get('baidu_batch', True):
+        from .baidu.main import pack_segments
+        packs = pack_segments([texts[i].get('text', '') for i in to_translate_indices])
+        jobs = [(translate_pack, [to_translate_indices[p] for p in pack]) for pack in packs]
+        logging.info(f"[任务{translate_id}] 百度翻译打包为 {len(jobs)} 个请求")
+    else:
+        jobs = [(translate_single, idx) for idx in to_translate_indices]
+
+    def run_job(func, arg):
+        """执行单个任务并统计线程池占用"""
+        with metrics.POOL_BUSY.track_inprogress(), profiler.worker(trans):
+            return func(arg)
+
+    # 使用线程池执行
+    metrics.POOL_WORKERS.inc(max_threads)
+    try:
+        with ThreadPoolExecutor(max_workers=max_threads) as executor:
+            # 提交所有任务
+            future_to_index = {
+                executor.submit(run_job, func, arg): arg
+                for func, arg in jobs
+            }
+
+            # 等待完成
+            for future in as_completed(future_to_index):
+                if event.is_set() or has_fatal_error:
+                    # 取消剩余任务
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return False
+
+                try:
+                    future.result()
+                except Exception as e:
+                    logging.error(f"[任务{translate_id}] 线程执行异常: {e}")
+    finally:
+        metrics.POOL_WORKERS.dec(max_threads)
 
     return not has_fatal_error
 
@@ -234,6 +409,8 @@ def get(trans, event, texts, index):
         logging.error(f"[任务{translate_id}] 文本块{index}翻译失败，保留原文: {str(e)}")
         text_item['complete'] = True
         text_item['count'] = count_text(text_item.get('text', ''))
+        with _progress_lock:
+            trans['kept_original'] = trans.get('kept_original', 0) + 1
 
     finally:
         texts[index] = text_item
@@ -250,6 +427,10 @@ def _translate_text_block(trans, text_item):
     if not original_text or not original_text.strip():
         return {'translated_text': original_text, 'count': 0}
 
+    # 任务时限耗尽，直接保留原文
+    if not _has_budget(trans):
+        raise DeadlineExceeded("任务时限已耗尽，保留原文")
+
     server = trans.get('server', 'openai')
 
     # 百度翻译没有备用模型的概念
@@ -257,42 +438,56 @@ def _translate_text_block(trans, text_item):
         result = _try_translate_with_retries(trans, text_item, 'baidu')
         if result:
             return result
+        if not _has_budget(trans):
+            raise DeadlineExceeded("任务时限已耗尽，保留原文")
         raise FatalError("百度翻译失败")
     else:
         # OpenAI等API有备用模型
         model = trans.get('model')
         backup_model = trans.get('backup_model')
+        has_backup = bool(backup_model and backup_model.strip())
+
+        # 时限紧张时主模型只尝试一次，把剩余时间留给备用模型
+        max_attempts = 1 if has_backup and _is_budget_short(trans) else MAX_RETRIES
 
         # 尝试主模型
-        result = _try_translate_with_retries(trans, text_item, model)
+        result = _try_translate_with_retries(trans, text_item, model, max_attempts)
         if result:
             return result
 
         # 主模型失败，尝试备用模型
-        if backup_model and backup_model.strip():
+        if has_backup and _has_budget(trans):
             logging.info(f"[任务{trans['id']}] 主模型{model}失败，切换到备用模型{backup_model}")
-            time.sleep(RETRY_DELAY)
+            metrics.LLM_FALLBACKS.labels(server).inc()
+            _sleep_within_budget(trans, RETRY_DELAY)
             result = _try_translate_with_retries(trans, text_item, backup_model)
             if result:
                 return result
 
+        if not _has_budget(trans):
+            raise DeadlineExceeded("任务时限已耗尽，保留原文")
+
         # 全部失败
         raise FatalError(f"主模型和备用模型均失败，最后使用模型: {backup_model or model}")
 
 
-def _try_translate_with_retries(trans, text_item, model):
+def _try_translate_with_retries(trans, text_item, model, max_attempts=MAX_RETRIES):
     """
     使用指定模型重试翻译
+    :param max_attempts: 最大尝试次数
     :return: 成功返回结果dict，失败返回None
     """
     translate_id = trans['id']
     original_text = text_item.get('text', '')
+    server = trans.get('server', 'openai')
 
-    for attempt in range(1, MAX_RETRIES + 1):
+    for attempt in range(1, max_attempts + 1):
+        if not _has_budget(trans):
+            logging.warning(f"[任务{translate_id}] 任务时限不足，停止请求模型{model}")
+            break
         try:
 
             # 执行翻译
-            server = trans.get('server', 'openai')
             if server == 'baidu':
                 logging.info(f"[任务{translate_id}] 百度翻译 第{attempt}次请求")
                 translated = _translate_baidu(trans, original_text)
@@ -304,7 +499,8 @@ def _try_translate_with_retries(trans, text_item, model):
             if not _is_valid_translation(translated):
                 logging.warning(
                     f"类型: {trans.get('server', '')}——[任务{translate_id}] 翻译结果无效: {translated[:50] if translated else 'None'}...")
-                time.sleep(RETRY_DELAY)
+                metrics.LLM_RETRIES.labels(server, 'invalid').inc()
+                _sleep_within_budget(trans, RETRY_DELAY)
                 continue
 
             # 过滤deepseek思考标签
@@ -314,20 +510,28 @@ def _try_translate_with_retries(trans, text_item, model):
 
         except openai.RateLimitError as e:
             logging.warning(f"[任务{translate_id}] 速率限制，等待后重试: {e}")
-            time.sleep(RETRY_DELAY * attempt * 2)  # 递增等待，限速时等待更长
+            metrics.LLM_RETRIES.labels(server, 'rate_limit').inc()
+            _sleep_within_budget(trans, RETRY_DELAY * attempt * 2)  # 递增等待，限速时等待更长
             continue
 
         except openai.AuthenticationError as e:
             raise FatalError(f"API密钥无效: {e}")
 
+        except openai.APITimeoutError as e:
+            logging.warning(f"[任务{translate_id}] 请求超时: {e}")
+            metrics.LLM_RETRIES.labels(server, 'timeout').inc()
+            continue
+
         except openai.APIConnectionError as e:
             logging.warning(f"[任务{translate_id}] 连接错误: {e}")
-            time.sleep(RETRY_DELAY)
+            metrics.LLM_RETRIES.labels(server, 'connection').inc()
+            _sleep_within_budget(trans, RETRY_DELAY)
             continue
 
         except Exception as e:
             logging.warning(f"[任务{translate_id}] 翻译异常: {e}")
-            time.sleep(RETRY_DELAY)
+            metrics.LLM_RETRIES.labels(server, 'error').inc()
+            _sleep_within_budget(trans, RETRY_DELAY)
             continue
 
     return None  # 所有重试失败
@@ -359,29 +563,94 @@ def _translate_openai(trans, text, model):
     logging.getLogger("openai").setLevel(logging.WARNING)
     logging.getLogger("httpx").setLevel(logging.WARNING)
 
-    response = openai.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=0.7
-    )
+    connect_timeout, read_timeout = _request_timeout(trans)
+    started = time.perf_counter()
+    try:
+        with metrics.LLM_INFLIGHT.labels(trans.get('server', 'openai')).track_inprogress():
+            response = openai.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.7,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+            )
+    except Exception:
+        record_usage(trans, model, latency_ms=(time.perf_counter() - started) * 1000, failed=True)
+        raise
 
+    _record_response_usage(trans, model, response, (time.perf_counter() - started) * 1000)
     return response.choices[0].message.content
 
 
+def _record_response_usage(trans, model, response, latency_ms):
+    """从响应中提取 token 用量（部分兼容接口不返回 usage）"""
+    usage = getattr(response, 'usage', None)
+    details = getattr(usage, 'prompt_tokens_details', None)
+    record_usage(
+        trans, model,
+        prompt_tokens=getattr(usage, 'prompt_tokens', 0),
+        completion_tokens=getattr(usage, 'completion_tokens', 0),
+        cached_tokens=getattr(details, 'cached_tokens', 0),
+        latency_ms=latency_ms
+    )
+
+
 def _translate_baidu(trans, text):
     """调用百度翻译API"""
     from .baidu.main import baidu_translate
 
     use_term_base = trans.get('use_baidu_terms', False)
 
-    return baidu_translate(
-        text=text,
-        appid=trans.get('app_id'),
-        app_key=trans.get('app_key'),
-        from_lang='auto',
-        to_lang=trans.get('lang', 'en'),
-        use_term_base=use_term_base
-    )
+    started = time.perf_counter()
+    try:
+        with metrics.LLM_INFLIGHT.labels('baidu').track_inprogress():
+            result = baidu_translate(
+                text=text,
+                appid=trans.get('app_id'),
+                app_key=trans.get('app_key'),
+                from_lang='auto',
+                to_lang=trans.get('lang', 'en'),
+                use_term_base=use_term_base,
+                timeout=_request_timeout(trans),
+                qps=trans.get('baidu_qps', 1)
+            )
+    except Exception:
+        record_usage(trans, 'baidu', latency_ms=(time.perf_counter() - started) * 1000, failed=True)
+        raise
+    record_usage(trans, 'baidu', latency_ms=(time.perf_counter() - started) * 1000)
+    return result
+
+
+def _translate_baidu_pack(trans, segments):
+    """
+    百度打包翻译（带重试）
+    :return: 与 segments 对应的译文列表，失败返回None（由调用方逐块回退）
+    """
+    from .baidu.main import baidu_translate_batch
+
+    translate_id = trans['id']
+    for attempt in range(1, MAX_RETRIES + 1):
+        if not _has_budget(trans):
+            return None
+        started = time.perf_counter()
+        try:
+            logging.info(f"[任务{translate_id}] 百度打包翻译 {len(segments)} 个文本块，第{attempt}次请求")
+            result = baidu_translate_batch(
+                segments=segments,
+                appid=trans.get('app_id'),
+                app_key=trans.get('app_key'),
+                from_lang='auto',
+                to_lang=trans.get('lang', 'en'),
+                use_term_base=trans.get('use_baidu_terms', False),
+                timeout=_request_timeout(trans),
+                qps=trans.get('baidu_qps', 1)
+            )
+            record_usage(trans, 'baidu', latency_ms=(time.perf_counter() - started) * 1000)
+            return result
+        except Exception as e:
+            record_usage(trans, 'baidu', latency_ms=(time.perf_counter() - started) * 1000, failed=True)
+            logging.warning(f"[任务{translate_id}] 百度打包翻译异常: {e}")
+            _sleep_within_budget(trans, RETRY_DELAY)
+    return None
 
 
 def _inject_matched_terms(trans, text, base_prompt, target_lang):
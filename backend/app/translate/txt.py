@@ -15,6 +15,7 @@ from threading import Event
 from typing import List, Dict, Tuple
 from . import to_translate
 from . import common
+from . import profiler
 
 # 分块配置
 MAX_CHUNK_SIZE = 2000
@@ -31,7 +32,8 @@ def start(trans: Dict) -> bool:
 
     # 读取文件
     try:
-        content, encoding = _read_file(trans['file_path'])
+        with profiler.stage(trans, 'parse'):
+            content, encoding = _read_file(trans['file_path'])
     except Exception as e:
         logging.error(f"[任务{translate_id}] 读取文件失败: {e}")
         to_translate.error(translate_id, f"读取文件失败: {str(e)}")
@@ -44,7 +46,8 @@ def start(trans: Dict) -> bool:
         return True
 
     # 智能分块
-    texts = _smart_chunk(content)
+    with profiler.stage(trans, 'extract'):
+        texts = _smart_chunk(content)
 
     # 统计需要翻译的块数
     to_translate_count = sum(1 for t in texts if not t.get('skip', False))
@@ -60,13 +63,15 @@ def start(trans: Dict) -> bool:
 
     # 执行翻译
     event = Event()
-    success = to_translate.translate_batch(trans, texts, event)
+    with profiler.stage(trans, 'translate'):
+        success = to_translate.translate_batch(trans, texts, event)
     if not success:
         return False
 
     # 写入结果
     try:
-        text_count = _write_result(trans, texts)
+        with profiler.stage(trans, 'write'):
+            text_count = _write_result(trans, texts)
     except Exception as e:
         logging.error(f"[任务{translate_id}] 写入文件失败: {e}")
         to_translate.error(translate_id, f"写入文件失败: {str(e)}")
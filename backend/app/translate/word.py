@@ -22,6 +22,7 @@ from docx.text.run import Run
 from docx.table import Table, _Cell
 from . import to_translate
 from . import common
+from . import profiler
 
 # 分块配置
 MAX_CHUNK_SIZE = 2000
@@ -100,14 +101,16 @@ def start(trans: Dict[str, Any]) -> bool:
         f"[任务{translate_id}] 翻译模式: only={only_translation}, inherit={inherit_format}")
 
     try:
-        document = Document(trans['file_path'])
+        with profiler.stage(trans, 'parse'):
+            document = Document(trans['file_path'])
     except Exception as e:
         logging.error(f"[任务{translate_id}] 无法打开文档: {e}")
         to_translate.error(translate_id, f"无法打开文档: {str(e)}")
         return False
 
     try:
-        text_blocks = _extract_all_text_blocks(document)
+        with profiler.stage(trans, 'extract'):
+            text_blocks = _extract_all_text_blocks(document)
     except Exception as e:
         logging.error(f"[任务{translate_id}] 提取文本失败: {e}")
         to_translate.error(translate_id, f"提取文本失败: {str(e)}")
@@ -127,16 +130,19 @@ def start(trans: Dict[str, Any]) -> bool:
     texts = _blocks_to_texts(blocks_to_translate)
 
     event = Event()
-    success = to_translate.translate_batch(trans, texts, event)
+    with profiler.stage(trans, 'translate'):
+        success = to_translate.translate_batch(trans, texts, event)
     if not success:
         return False
 
     _sync_results(blocks_to_translate, texts)
 
     try:
-        text_count = _apply_translation(document, text_blocks, only_translation,
-                                        inherit_format, trans.get('lang', '英语'))
-        document.save(trans['target_file'])
+        with profiler.stage(trans, 'apply'):
+            text_count = _apply_translation(document, text_blocks, only_translation,
+                                            inherit_format, trans.get('lang', '英语'))
+        with profiler.stage(trans, 'save'):
+            document.save(trans['target_file'])
     except Exception as e:
         logging.error(f"[任务{translate_id}] 保存文档失败: {e}")
         to_translate.error(translate_id, f"保存文档失败: {str(e)}")
@@ -5,7 +5,8 @@ import os
 import hashlib
 from pathlib import Path
 from datetime import datetime
-from flask import current_app
+from urllib.parse import quote
+from flask import current_app, send_file
 
 
 class FileManager:
@@ -67,6 +68,75 @@ class FileManager:
                 hash_md5.update(chunk)
         return hash_md5.hexdigest()
 
+    @staticmethod
+    def save_stream(stream, save_path, max_size=None, chunk_size=1024 * 1024):
+        """
+        流式保存文件：一次读取同时计算 MD5 和字节数，先写入同目录临时文件再原子重命名
+        :param stream: 可读的文件流
+        :param save_path: 目标文件绝对路径
+        :param max_size: 最大字节数，超出时删除临时文件并抛出 ValueError
+        :return: (文件大小, MD5)
+        """
+        hash_md5 = hashlib.md5()
+        size = 0
+        tmp_path = os.path.join(os.path.dirname(save_path),
+                                f".{os.path.basename(save_path)}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in iter(lambda: stream.read(chunk_size), b""):
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise ValueError(f"文件大小超过{max_size // (1024 * 1024)}MB")
+                    hash_md5.update(chunk)
+                    f.write(chunk)
+            os.replace(tmp_path, save_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return size, hash_md5.hexdigest()
+
+    @staticmethod
+    def send_download(file_path, download_name=None):
+        """
+        下载文件响应
+        - 带 ETag（文件大小+修改时间）和 Last-Modified，浏览器可用 If-None-Match 协商缓存
+        - 支持 Range 断点续传
+        - 配置 DOWNLOAD_ACCEL_REDIRECT 时只返回 X-Accel-Redirect 头，由 nginx 发送文件，不占用 worker
+        :param file_path: 文件绝对路径（需位于 UPLOAD_BASE_DIR 下才能交给 nginx）
+        :param download_name: 下载文件名，默认为原文件名
+        """
+        download_name = download_name or os.path.basename(file_path)
+        accel_prefix = current_app.config.get('DOWNLOAD_ACCEL_REDIRECT')
+        if accel_prefix:
+            try:
+                relative = Path(file_path).resolve().relative_to(
+                    Path(current_app.config['UPLOAD_BASE_DIR']).resolve())
+            except ValueError:
+                relative = None
+            if relative is not None:
+                response = current_app.response_class(mimetype='application/octet-stream')
+                response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(relative.as_posix())
+                response.headers['Content-Disposition'] = \
+                    f"attachment; filename*=UTF-8''{quote(download_name)}"
+                response.headers['Cache-Control'] = 'private, no-cache'
+                return response
+
+        # conditional=True：处理 If-None-Match/If-Modified-Since（304）和 Range（206）
+        response = send_file(
+            file_path,
+            as_attachment=True,
+            download_name=download_name,
+            conditional=True,
+            etag=True,
+            last_modified=os.path.getmtime(file_path),
+            max_age=0
+        )
+        response.headers['Accept-Ranges'] = 'bytes'
+        # 每次使用前向服务器验证，文件未变化时返回 304
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
     @staticmethod
     def allowed_file(filename):
         """
@@ -0,0 +1,151 @@
+# utils/metrics.py
+"""
+Prometheus 指标定义
+
+多个 gunicorn worker 时需设置环境变量 PROMETHEUS_MULTIPROC_DIR（须在导入 prometheus_client 之前），
+各进程把指标写入该目录，/metrics 汇总后输出；worker 退出由 gunicorn.conf.py 的 child_exit 清理。
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client import multiprocess
+
+PREFIX = 'doctranslator'
+
+# 请求耗时分桶（秒），覆盖毫秒级机翻到数分钟的大模型长文本
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+DB_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+MCP_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# ---------- 翻译接口 ----------
+LLM_REQUEST_SECONDS = Histogram(
+    f'{PREFIX}_llm_request_seconds', '翻译接口请求耗时',
+    ['server', 'model', 'status'], buckets=LLM_BUCKETS
+)
+LLM_INFLIGHT = Gauge(
+    f'{PREFIX}_llm_inflight_requests', '正在进行的翻译接口请求数',
+    ['server'], multiprocess_mode='livesum'
+)
+LLM_TOKENS = Counter(
+    f'{PREFIX}_llm_tokens_total', '翻译接口 token 用量（type: prompt/completion/cached）',
+    ['server', 'model', 'type']
+)
+LLM_RETRIES = Counter(
+    f'{PREFIX}_llm_retries_total', '翻译请求重试次数',
+    ['server', 'reason']
+)
+LLM_FALLBACKS = Counter(
+    f'{PREFIX}_llm_fallbacks_total', '切换备用模型次数',
+    ['server']
+)
+
+# ---------- 翻译任务 ----------
+SEGMENTS = Counter(
+    f'{PREFIX}_segments_total', '已翻译文本块数（按文件类型）',
+    ['handler', 'status']
+)
+POOL_WORKERS = Gauge(
+    f'{PREFIX}_pool_workers', '翻译线程池容量',
+    multiprocess_mode='livesum'
+)
+POOL_BUSY = Gauge(
+    f'{PREFIX}_pool_busy_workers', '翻译线程池中正在执行的线程数',
+    multiprocess_mode='livesum'
+)
+TASKS_RUNNING = Gauge(
+    f'{PREFIX}_tasks_running', '正在执行的翻译任务数',
+    multiprocess_mode='livesum'
+)
+
+# ---------- 数据库与缓存 ----------
+DB_CALL_SECONDS = Histogram(
+    f'{PREFIX}_db_call_seconds', '翻译线程数据库调用耗时（含等待全局锁）',
+    ['op'], buckets=DB_BUCKETS
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    f'{PREFIX}_db_pool_checked_out', 'SQLAlchemy 连接池中已借出的连接数',
+    multiprocess_mode='livesum'
+)
+DB_POOL_CONNECTIONS = Counter(
+    f'{PREFIX}_db_pool_connects_total', 'SQLAlchemy 连接池新建的数据库连接数'
+)
+CACHE_LOOKUPS = Counter(
+    f'{PREFIX}_cache_lookups_total', '缓存查询次数',
+    ['cache', 'result']
+)
+
+# ---------- MCP 工具 ----------
+MCP_TOOL_SECONDS = Histogram(
+    f'{PREFIX}_mcp_tool_seconds', 'MCP 工具调用耗时（含排队）',
+    ['tool', 'pool'], buckets=MCP_BUCKETS
+)
+MCP_TOOL_PENDING = Gauge(
+    f'{PREFIX}_mcp_tool_pending', 'MCP 执行池中排队与执行中的调用数',
+    ['pool'], multiprocess_mode='livesum'
+)
+MCP_TOOL_REJECTED = Counter(
+    f'{PREFIX}_mcp_tool_rejected_total', 'MCP 执行池已满被拒绝的调用数',
+    ['tool', 'pool']
+)
+
+
+@contextmanager
+def observe_db(op):
+    """统计数据库调用耗时"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        DB_CALL_SECONDS.labels(op).observe(time.perf_counter() - started)
+
+
+def instrument_engine(engine):
+    """统计 SQLAlchemy 连接池借出/新建连接（压测时用于确定 pool_size/max_overflow）"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTIONS.inc()
+
+    @event.listens_for(engine, 'checkout')
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, 'checkin')
+    def _on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+
+def cache_lookup(cache, hit):
+    """记录一次缓存查询结果"""
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def handler_name(trans):
+    """文件处理器标签（扩展名，不含点）"""
+    return (trans.get('extension') or '').lstrip('.').lower() or 'unknown'
+
+
+def render(extra_collectors=()):
+    """
+    生成 /metrics 输出
+    :param extra_collectors: 仅在当前进程采集的收集器（如数据库中的任务队列）
+    :return: (body, content_type)
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        from prometheus_client import REGISTRY as registry
+    body = generate_latest(registry)
+
+    if extra_collectors:
+        extra = CollectorRegistry()
+        for collector in extra_collectors:
+            extra.register(collector)
+        body += generate_latest(extra)
+    return body, CONTENT_TYPE_LATEST
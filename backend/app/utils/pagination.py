@@ -0,0 +1,151 @@
+# utils/pagination.py
+"""
+列表分页
+
+- 偏移分页：page/limit + 精确总数，兼容原有接口
+- 游标分页：按 (created_at, id) 倒序，用 keyset 条件定位下一页，不使用 OFFSET，
+  深翻页耗时与页码无关；总数为短时缓存的 COUNT（LIST_TOTAL_CACHE_TTL 秒），不必每翻一页统计一次
+
+两种方式排序相同，任一页返回的 next_cursor 都可以用来以游标方式取下一页。
+传入归档表查询时合并任务表与归档表分页（见 app/utils/translate_archive.py）。
+"""
+import base64
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+
+from app.extensions import db
+from app.utils.metrics import cache_lookup
+
+MAX_CACHED_TOTALS = 10000
+
+_total_cache = {}  # {键: (过期时间, 总数)}
+_total_lock = threading.Lock()
+
+
+def encode_cursor(created_at, record_id):
+    raw = f"{created_at.isoformat() if created_at else ''}|{record_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    :return: (created_at, id)
+    :raises ValueError: 游标格式错误
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, record_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at) if created_at else None, int(record_id)
+    except Exception:
+        raise ValueError('无效的分页游标')
+
+
+def cached_count(key, *queries):
+    """带短时缓存的 COUNT（多个查询时为合计），TTL 为 0 时每次都统计"""
+    ttl = current_app.config.get('LIST_TOTAL_CACHE_TTL', 30)
+    now = time.monotonic()
+    with _total_lock:
+        entry = _total_cache.get(key)
+    hit = entry is not None and entry[0] > now
+    cache_lookup('list_total', hit)
+    if hit:
+        return entry[1]
+
+    total = sum(query.order_by(None).count() for query in queries)
+    if ttl > 0:
+        with _total_lock:
+            if len(_total_cache) >= MAX_CACHED_TOTALS:
+                for k in [k for k, (expires, _) in _total_cache.items() if expires <= now] or list(_total_cache):
+                    del _total_cache[k]
+            _total_cache[key] = (now + ttl, total)
+    return total
+
+
+def _after_cursor(query, model, cursor):
+    """游标之后的记录"""
+    created_at, last_id = decode_cursor(cursor)
+    if created_at is None:
+        return query.filter(model.created_at.is_(None), model.id < last_id)
+    # created_at <= c 可走索引范围扫描，同一时间的记录再按 id 区分
+    return query.filter(model.created_at <= created_at,
+                        db.or_(model.created_at < created_at, model.id < last_id))
+
+
+def _record(item, model):
+    return item if isinstance(item, model) else item[0]
+
+
+def _paginate_merged(queries, page, limit, cursor, total_key):
+    """
+    合并多个表（任务表与归档表）分页：各表按相同顺序只取 (created_at, id)，合并排序后截取当前页，
+    再按表批量取出整行。各表取数不超过 偏移量+limit+1 行，与单表 OFFSET 的扫描量相当
+    """
+    offset = 0 if cursor else (page - 1) * limit
+    keys = []
+    for source, query in enumerate(queries):
+        model = query.column_descriptions[0]['entity']
+        if cursor:
+            query = _after_cursor(query, model, cursor)
+        rows = query.with_entities(model.created_at, model.id) \
+            .order_by(model.created_at.desc(), model.id.desc()).limit(offset + limit + 1).all()
+        keys.extend((created_at, record_id, source) for created_at, record_id in rows)
+    keys.sort(key=lambda key: (key[0] or datetime.min, key[1]), reverse=True)
+    window = keys[offset:offset + limit + 1]
+    has_more = len(window) > limit
+    window = window[:limit]
+
+    loaded = {}
+    for source, query in enumerate(queries):
+        ids = [record_id for _, record_id, key_source in window if key_source == source]
+        if ids:
+            model = query.column_descriptions[0]['entity']
+            for item in query.filter(model.id.in_(ids)).all():
+                loaded[(source, _record(item, model).id)] = item
+    items = [loaded[(source, record_id)] for _, record_id, source in window if (source, record_id) in loaded]
+
+    if cursor:
+        total = cached_count(total_key, *queries) if total_key else None
+    else:
+        total = sum(query.order_by(None).count() for query in queries)
+    return items, total, has_more
+
+
+def paginate(query, model, page=1, limit=20, cursor=None, total_key=None, archive_query=None):
+    """
+    分页查询（按 created_at、id 倒序）
+    :param query: 已加好过滤条件的查询；可通过 add_columns 附带关联字段，此时每项为 (记录, 字段...) 的元组
+    :param cursor: 上一页返回的 next_cursor；非空时使用游标分页，忽略 page
+    :param total_key: 游标分页时总数的缓存键（需包含全部过滤条件），为空时不返回总数
+    :param archive_query: 归档表上相同条件的查询，非空时合并两表分页（结果中含归档表的记录）
+    :return: {'items', 'total', 'page', 'next_cursor', 'has_more'}
+    :raises ValueError: 游标格式错误
+    """
+    limit = max(int(limit or 20), 1)
+    page = max(int(page or 1), 1)
+
+    if archive_query is not None:
+        items, total, has_more = _paginate_merged([query, archive_query], page, limit, cursor, total_key)
+    elif cursor:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+        items = _after_cursor(query, model, cursor).limit(limit + 1).all()
+        has_more = len(items) > limit
+        items = items[:limit]
+        total = cached_count(total_key, query) if total_key else None
+    else:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+        pagination = query.paginate(page=page, per_page=limit, error_out=False)
+        items, total, has_more = pagination.items, pagination.total, pagination.has_next
+
+    last = items[-1] if items else None
+    if last is not None and not hasattr(last, 'created_at'):
+        last = last[0]
+    return {
+        'items': items,
+        'total': total,
+        'page': None if cursor else page,
+        'next_cursor': encode_cursor(last.created_at, last.id) if has_more and last else None,
+        'has_more': has_more,
+    }
@@ -0,0 +1,77 @@
+# utils/periodic.py
+"""
+多进程定时任务
+
+gunicorn 每个 worker（fork 后由 gunicorn.conf.py 的 post_fork 启动）与 MCP 服务各自启动后台线程，
+通过存储目录下的标记文件（修改时间为上次执行时间）和文件锁协调，每个周期只有一个进程执行一次。
+--preload 时 master 不启动线程（见 app.start_background_jobs）。
+"""
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+CHECK_INTERVAL = 600  # 检查是否到期的间隔（秒）
+_started = set()
+_start_lock = threading.Lock()
+
+
+def _marker_file(app, name):
+    return os.path.join(os.path.dirname(app.root_path), 'storage', f'.{name}')
+
+
+def run_if_due(app, name, interval, func):
+    """
+    到期时在应用上下文中执行一次 func()
+    :param interval: 执行间隔（秒）
+    :return: func 的返回值；其他进程正在执行或本周期已执行时返回 None
+    """
+    marker = _marker_file(app, name)
+    os.makedirs(os.path.dirname(marker), exist_ok=True)
+    with open(marker + '.lock', 'w') as lock:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return None
+        try:
+            if time.time() - os.path.getmtime(marker) < interval:
+                return None
+        except OSError:
+            pass
+        with app.app_context():
+            try:
+                return func()
+            finally:
+                db.session.remove()
+                with open(marker, 'w') as f:
+                    f.write(str(time.time()))
+
+
+def _loop(app, name, interval, func):
+    while True:
+        try:
+            run_if_due(app, name, interval, func)
+        except Exception as e:
+            logger.error(f"定时任务 {name} 异常: {e}")
+        time.sleep(CHECK_INTERVAL)
+
+
+def start(app, name, interval, func):
+    """启动后台线程（每个进程每个任务一个，interval 为 0 或测试环境时不启动）"""
+    if not interval or app.config.get('TESTING'):
+        return
+    with _start_lock:
+        if name in _started:
+            return
+        _started.add(name)
+    threading.Thread(target=_loop, args=(app, name, interval, func), name=name, daemon=True).start()
@@ -0,0 +1,67 @@
+# utils/search.py
+"""
+翻译记录关键词搜索（管理后台）
+
+`LIKE '%kw%'` 无法使用 B-Tree 索引，数据量大时每次搜索都是全表扫描。MySQL 上为 origin_filename
+建立 ngram 全文索引（ft_translate_filename / ft_translate_archive_filename，由 app/script/migrate_indexes.py 创建），
+先用 MATCH ... AGAINST 短语检索缩小范围，再用 LIKE 复核，结果与原来的模糊匹配一致。
+关键词过短或含标点、非 MySQL（开发环境 SQLite）、索引尚未建立时退回 LIKE（建立后几分钟内自动改用全文索引）。
+
+用户邮箱匹配改为先在 customer 表中查出用户ID，再按 customer_id 过滤，不再对每条记录关联判断。
+"""
+import time
+
+from sqlalchemy import inspect, select
+from sqlalchemy.dialects.mysql import match
+
+from app.extensions import db
+from app.models.customer import Customer
+from app.models.translate import Translate
+
+FULLTEXT_INDEXES = {
+    'translate': 'ft_translate_filename',
+    'translate_archive': 'ft_translate_archive_filename',
+}
+NGRAM_TOKEN_SIZE = 2  # MySQL ngram_token_size 默认值
+FULLTEXT_RECHECK_INTERVAL = 300  # 索引尚未建立时重新检查的间隔（秒）
+
+_fulltext_ready = {}  # {(数据库地址, 表名): (是否已有全文索引, 检查时间)}
+
+
+def _has_fulltext(table):
+    """
+    表上是否已有全文索引：已建立的结果一直缓存；尚未建立的（启动迁移可能与服务同时进行）
+    每 FULLTEXT_RECHECK_INTERVAL 秒重新检查一次
+    """
+    engine = db.engine
+    if engine.dialect.name != 'mysql':
+        return False
+    key = (str(engine.url), table)
+    now = time.monotonic()
+    ready, checked = _fulltext_ready.get(key, (False, None))
+    if not ready and (checked is None or now - checked >= FULLTEXT_RECHECK_INTERVAL):
+        ready = FULLTEXT_INDEXES.get(table) in {index['name'] for index in inspect(engine).get_indexes(table)}
+        _fulltext_ready[key] = (ready, now)
+    return ready
+
+
+def filename_condition(keyword, model=Translate):
+    """文件名包含关键词的过滤条件（model 为 Translate 或 TranslateArchive）"""
+    like = model.origin_filename.ilike(f"%{keyword}%")
+    # ngram 分词不含空白与标点，这类关键词无法保证短语检索不漏，直接用 LIKE
+    if len(keyword) < NGRAM_TOKEN_SIZE or not keyword.isalnum() or not _has_fulltext(model.__tablename__):
+        return like
+    # 全文检索放在子查询中，与其他条件 OR 组合时仍能使用全文索引
+    return model.id.in_(
+        select(model.id).where(
+            match(model.origin_filename, against=f'"{keyword}"').in_boolean_mode(),
+            like,
+        ).correlate(None)
+    )
+
+
+def customer_email_condition(keyword, model=Translate):
+    """所属用户邮箱包含关键词的过滤条件"""
+    return model.customer_id.in_(
+        select(Customer.id).where(Customer.email.ilike(f"%{keyword}%")).correlate(None)
+    )
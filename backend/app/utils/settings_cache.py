@@ -0,0 +1,106 @@
+# utils/settings_cache.py
+"""
+系统配置（setting 表）进程内缓存
+
+首次读取时加载全部未删除的配置（serialized 的值按 JSON 解码），之后读取配置只读内存，不再查库。
+后台修改配置后调用 invalidate_settings_cache()：清空本进程缓存，并更新 storage/.settings_version，
+其他进程（gunicorn worker、MCP 服务）每次读取时 stat 该文件，修改时间变化即重新加载。
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import current_app
+
+from app.utils.metrics import cache_lookup
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_cache = None  # (版本, {别名: 值}, {分组: {别名: 值}})
+
+
+def _version_file(app):
+    return os.path.join(os.path.dirname(app.root_path), 'storage', '.settings_version')
+
+
+def _current_version(app):
+    try:
+        return os.stat(_version_file(app)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _decode(setting):
+    if not setting.serialized or setting.value is None:
+        return setting.value
+    try:
+        return json.loads(setting.value)
+    except ValueError:
+        return setting.value
+
+
+def _load(version):
+    from app.models.setting import Setting
+
+    values, groups = {}, {}
+    for setting in Setting.query.filter_by(deleted_flag='N').order_by(Setting.id):
+        value = _decode(setting)
+        values[setting.alias] = value
+        groups.setdefault(setting.group, {})[setting.alias] = value
+    return version, values, groups
+
+
+def _snapshot():
+    """当前版本的配置，版本变化或尚未加载时从数据库重新加载"""
+    global _cache
+    # 先取版本再加载：加载期间配置被修改时，下次读取会因版本不同再次加载
+    version = _current_version(current_app)
+    cache = _cache
+    hit = cache is not None and cache[0] == version
+    cache_lookup('settings', hit)
+    if hit:
+        return cache
+    cache = _load(version)
+    with _lock:
+        _cache = cache
+    return cache
+
+
+def get(alias, default=None):
+    """按别名读取配置值"""
+    return _snapshot()[1].get(alias, default)
+
+
+def get_int(alias, default=0):
+    """按别名读取整数配置，缺失或格式错误时返回 default"""
+    try:
+        return int(get(alias, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def group(name):
+    """读取一个分组的配置 {别名: 值}"""
+    return dict(_snapshot()[2].get(name, {}))
+
+
+def grouped():
+    """全部配置 {分组: {别名: 值}}，未分组的配置分组为 None"""
+    return {name: dict(values) for name, values in _snapshot()[2].items()}
+
+
+def invalidate_settings_cache():
+    """修改配置并提交后调用：清空本进程缓存，并更新失效标记文件通知其他进程"""
+    global _cache
+    with _lock:
+        _cache = None
+    try:
+        path = _version_file(current_app)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(str(time.time()))
+    except OSError as e:
+        logger.warning(f"配置缓存失效标记写入失败: {e}")
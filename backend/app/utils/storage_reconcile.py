@@ -0,0 +1,143 @@
+# utils/storage_reconcile.py
+"""
+存储占用对账
+
+以 translate 与归档表 translate_archive 未删除记录的 origin_filesize/target_filesize 为准，修正 storage_usage 与 customer.storage。
+先用一次分组查询找出有偏差的用户，再逐个锁定 customer 行复核并按差值修正，
+上传/删除的增量更新同样先更新 customer 行，两者串行执行，不会互相覆盖。
+
+后台线程按 STORAGE_RECONCILE_INTERVAL 定时执行，多进程间每个周期只执行一次（见 app/utils/periodic.py）。
+"""
+import logging
+import time
+
+from app.extensions import db
+from app.models.customer import Customer
+from app.models.storage_usage import StorageUsage
+from app.models.translate import Translate, TranslateArchive
+from app.utils import periodic
+
+logger = logging.getLogger(__name__)
+
+
+def _empty():
+    return {category: (0, 0) for category in StorageUsage.CATEGORIES}
+
+
+def _actual_usage(customer_id=None):
+    """按 translate 与归档表汇总：{customer_id: {分类: (字节, 文件数)}}"""
+    result = {}
+    for model in (Translate, TranslateArchive):
+        query = db.session.query(
+            model.customer_id,
+            db.func.coalesce(db.func.sum(model.origin_filesize), 0),
+            db.func.count(model.id),
+            db.func.coalesce(db.func.sum(model.target_filesize), 0),
+            db.func.sum(db.case((model.target_filesize > 0, 1), else_=0)),
+        ).filter(model.deleted_flag == 'N', model.customer_id > 0)
+        if customer_id is not None:
+            query = query.filter(model.customer_id == customer_id)
+
+        for cid, origin_bytes, origin_files, target_bytes, target_files in query.group_by(model.customer_id):
+            usage = result.setdefault(cid, _empty())
+            for category, size, files in ((StorageUsage.UPLOADS, origin_bytes, origin_files),
+                                          (StorageUsage.TRANSLATE, target_bytes, target_files)):
+                recorded_size, recorded_files = usage[category]
+                usage[category] = (recorded_size + int(size), recorded_files + int(files or 0))
+    return result
+
+
+def _recorded_usage(customer_id=None):
+    """已记录的分类占用：{customer_id: {分类: (字节, 文件数)}}"""
+    query = StorageUsage.query.filter(StorageUsage.customer_id != StorageUsage.TOTAL_ID)
+    if customer_id is not None:
+        query = query.filter(StorageUsage.customer_id == customer_id)
+
+    result = {}
+    for row in query:
+        result.setdefault(row.customer_id, _empty())[row.category] = (int(row.bytes), int(row.file_count))
+    return result
+
+
+def _fix_customer(customer_id):
+    """锁定用户行后复核并修正，返回是否有修改"""
+    customer = Customer.query.filter_by(id=customer_id).with_for_update().first()
+    actual = _actual_usage(customer_id).get(customer_id, _empty())
+    recorded = _recorded_usage(customer_id).get(customer_id, _empty())
+
+    changed = False
+    for category in StorageUsage.CATEGORIES:
+        (actual_bytes, actual_files), (recorded_bytes, recorded_files) = actual[category], recorded[category]
+        if (actual_bytes, actual_files) != (recorded_bytes, recorded_files):
+            StorageUsage.adjust(customer_id, category, actual_bytes - recorded_bytes,
+                                actual_files - recorded_files, update_customer=False)
+            changed = True
+
+    total = sum(size for size, _ in actual.values())
+    if customer and (customer.storage or 0) != total:
+        customer.storage = total
+        changed = True
+    db.session.commit()
+    return changed
+
+
+def _fix_totals():
+    """全站汇总行与各用户之和不一致时修正（先锁定汇总行，保证读到的用户行与之一致）"""
+    totals = StorageUsage.query.filter_by(customer_id=StorageUsage.TOTAL_ID).with_for_update().all()
+    recorded = {row.category: (int(row.bytes), int(row.file_count)) for row in totals}
+    rows = db.session.query(
+        StorageUsage.category,
+        db.func.coalesce(db.func.sum(StorageUsage.bytes), 0),
+        db.func.coalesce(db.func.sum(StorageUsage.file_count), 0),
+    ).filter(StorageUsage.customer_id != StorageUsage.TOTAL_ID).group_by(StorageUsage.category)
+
+    changed = False
+    for category, size, files in rows:
+        recorded_bytes, recorded_files = recorded.get(category, (0, 0))
+        if (int(size), int(files)) != (recorded_bytes, recorded_files):
+            StorageUsage.adjust_total(category, int(size) - recorded_bytes, int(files) - recorded_files)
+            changed = True
+    db.session.commit()
+    return changed
+
+
+def reconcile():
+    """
+    执行一次对账（需在应用上下文中调用）
+    :return: {'checked': 检查的用户数, 'fixed': 修正的用户数, 'totals_fixed': 是否修正了全站汇总}
+    """
+    started = time.perf_counter()
+    actual = _actual_usage()
+    recorded = _recorded_usage()
+    storage = dict(db.session.query(Customer.id, Customer.storage).filter(Customer.storage != 0).all())
+    db.session.commit()  # 结束只读事务，后续逐个用户加锁复核
+
+    customer_ids = set(actual) | set(recorded) | set(storage)
+    fixed = 0
+    for customer_id in sorted(customer_ids):
+        usage = actual.get(customer_id, _empty())
+        if usage == recorded.get(customer_id, _empty()) and \
+                sum(size for size, _ in usage.values()) == (storage.get(customer_id) or 0):
+            continue
+        try:
+            if _fix_customer(customer_id):
+                fixed += 1
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"用户{customer_id}存储占用对账失败: {e}")
+
+    try:
+        totals_fixed = _fix_totals()
+    except Exception as e:
+        db.session.rollback()
+        totals_fixed = False
+        logger.error(f"全站存储占用对账失败: {e}")
+
+    logger.info(f"存储占用对账完成：检查{len(customer_ids)}个用户，修正{fixed}个，"
+                f"耗时{time.perf_counter() - started:.1f}s")
+    return {'checked': len(customer_ids), 'fixed': fixed, 'totals_fixed': totals_fixed}
+
+
+def start(app):
+    """启动后台对账线程（STORAGE_RECONCILE_INTERVAL 为 0 时不启动）"""
+    periodic.start(app, 'storage_reconciled', app.config.get('STORAGE_RECONCILE_INTERVAL', 24) * 3600, reconcile)
@@ -0,0 +1,105 @@
+# utils/translate_archive.py
+"""
+翻译任务归档
+
+已完成、失败或已删除，且创建超过 TRANSLATE_ARCHIVE_DAYS 天的任务按批（TRANSLATE_ARCHIVE_BATCH 条）
+从 translate 移到 translate_archive：同一事务内 INSERT ... SELECT 后删除，保留原任务ID。
+任务表只保留近期和进行中的任务，索引与缓冲池保持在热数据上。
+
+- 读取：任务列表合并两表分页（app/utils/pagination.py），按 ID/uuid 查找时任务表中没有再查归档表（find_translate）
+- 重新翻译已归档的任务前先移回任务表（restore）
+- 任务计数与存储占用按两表合计，归档不改变它们
+
+后台线程每天执行一次，多进程间每个周期只执行一次（见 app/utils/periodic.py）。
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.extensions import db
+from app.models.translate import Translate, TranslateArchive
+from app.utils import periodic
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_INTERVAL = 24 * 3600
+
+
+def _move(source, target, ids, extra=None):
+    """把 ids 对应的行从 source 表移到 target 表（由调用方提交事务）"""
+    columns = [column.name for column in source.__table__.columns if column.name in target.__table__.columns]
+    selected = [source.__table__.c[name] for name in columns]
+    extra = extra or {}
+    db.session.execute(
+        target.__table__.insert().from_select(
+            columns + list(extra),
+            db.select(*selected, *[db.literal(value) for value in extra.values()]).where(source.id.in_(ids))
+        )
+    )
+    db.session.execute(source.__table__.delete().where(source.id.in_(ids)))
+
+
+def archivable(cutoff):
+    """可归档的任务：已完成、失败或已删除，且创建早于 cutoff"""
+    return Translate.query.filter(
+        Translate.created_at < cutoff,
+        db.or_(Translate.status.in_(('done', 'failed')), Translate.deleted_flag == 'Y')
+    )
+
+
+def archive(days=None, batch_size=None, dry_run=False):
+    """
+    归档历史任务（需在应用上下文中调用）
+    :param days: 归档创建超过多少天的任务，默认 TRANSLATE_ARCHIVE_DAYS，必须大于 0
+    :return: {'archived': 归档的任务数, 'cutoff': 截止时间}
+    """
+    days = current_app.config.get('TRANSLATE_ARCHIVE_DAYS', 0) if days is None else days
+    if days <= 0:
+        raise ValueError('归档天数必须大于 0（TRANSLATE_ARCHIVE_DAYS 未开启时用 --days 指定）')
+    batch_size = batch_size or current_app.config.get('TRANSLATE_ARCHIVE_BATCH', 1000)
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    if dry_run:
+        return {'archived': archivable(cutoff).order_by(None).count(), 'cutoff': cutoff}
+
+    started = time.perf_counter()
+    archived = 0
+    while True:
+        ids = [row.id for row in archivable(cutoff).with_entities(Translate.id)
+               .order_by(Translate.id).limit(batch_size)]
+        if not ids:
+            break
+        try:
+            _move(Translate, TranslateArchive, ids, {'archived_at': datetime.utcnow()})
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        archived += len(ids)
+
+    if archived:
+        logger.info(f"归档{archived}个创建早于{cutoff:%Y-%m-%d}的任务，耗时{time.perf_counter() - started:.1f}s")
+    return {'archived': archived, 'cutoff': cutoff}
+
+
+def restore(task_id):
+    """
+    把已归档的任务移回任务表（由调用方提交事务）
+    :return: 任务表中的记录，任务不存在时返回 None
+    """
+    record = Translate.query.get(task_id)
+    if record is None:
+        archived = TranslateArchive.query.get(task_id)
+        if archived is None:
+            return None
+        db.session.expunge(archived)
+        _move(TranslateArchive, Translate, [task_id])
+        record = Translate.query.get(task_id)
+    return record
+
+
+def start(app):
+    """启动后台归档线程（TRANSLATE_ARCHIVE_DAYS 为 0 时不启动）"""
+    if app.config.get('TRANSLATE_ARCHIVE_DAYS'):
+        periodic.start(app, 'translate_archived', ARCHIVE_INTERVAL, archive)
@@ -0,0 +1,115 @@
+# utils/zip_stream.py
+"""
+流式 ZIP 打包
+
+边读文件边输出压缩包数据，配合分块响应使用，内存占用与压缩包大小无关。
+基于标准库 zipfile 的非 seekable 写入模式（条目后写数据描述符），
+Office/PDF 等本身已压缩的格式直接存储，不再二次压缩。
+"""
+import os
+import time
+import zipfile
+from collections import deque
+from urllib.parse import quote
+
+from flask import Response, stream_with_context
+
+# 已压缩格式，直接存储
+STORED_EXTENSIONS = {
+    '.docx', '.xlsx', '.pptx', '.pdf', '.zip', '.gz', '.7z', '.rar',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.mp3', '.mp4',
+}
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class _Sink:
+    """只写缓冲：zipfile 写入的数据暂存于此，由生成器取走后发送"""
+
+    def __init__(self):
+        self.chunks = deque()
+
+    def write(self, data):
+        if data:
+            self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        while self.chunks:
+            yield self.chunks.popleft()
+
+
+def _compress_type(name):
+    if os.path.splitext(name)[1].lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+class ZipStream:
+    """
+    用法：
+        zs = ZipStream()
+        zs.add_file('/path/a.docx')            # 默认使用文件名，重名自动追加序号
+        zs.add_bytes('b.xlsx', lambda: data)   # 内容在打包到该条目时才生成
+        return zs.response('result.zip')
+    """
+
+    def __init__(self):
+        self.entries = []  # [(条目名, 文件路径 或 None, 内容生成函数 或 None)]
+        self._names = set()
+
+    def _unique_name(self, name):
+        """重名时追加序号：a.docx、a (1).docx、a (2).docx ..."""
+        base, ext = os.path.splitext(name)
+        candidate, n = name, 1
+        while candidate.lower() in self._names:
+            candidate = f"{base} ({n}){ext}"
+            n += 1
+        self._names.add(candidate.lower())
+        return candidate
+
+    def add_file(self, path, arcname=None):
+        self.entries.append((self._unique_name(arcname or os.path.basename(path)), path, None))
+
+    def add_bytes(self, arcname, producer):
+        """producer 为无参函数，返回条目内容（bytes）"""
+        self.entries.append((self._unique_name(arcname), None, producer))
+
+    def __iter__(self):
+        sink = _Sink()
+        with zipfile.ZipFile(sink, 'w') as zf:
+            for arcname, path, producer in self.entries:
+                if path is not None:
+                    if not os.path.exists(path):
+                        continue
+                    info = zipfile.ZipInfo(arcname, time.localtime(os.path.getmtime(path))[:6])
+                    info.file_size = os.path.getsize(path)  # 用于判断是否需要 ZIP64
+                else:
+                    info = zipfile.ZipInfo(arcname, time.localtime()[:6])
+                info.compress_type = _compress_type(arcname)
+                info.external_attr = 0o644 << 16
+
+                with zf.open(info, 'w') as dest:
+                    if path is not None:
+                        with open(path, 'rb') as src:
+                            for chunk in iter(lambda: src.read(READ_CHUNK_SIZE), b""):
+                                dest.write(chunk)
+                                yield from sink.drain()
+                    else:
+                        dest.write(producer())
+                yield from sink.drain()
+        # 中央目录
+        yield from sink.drain()
+
+    def response(self, download_name):
+        """分块传输的下载响应"""
+        response = Response(stream_with_context(iter(self)), mimetype='application/zip')
+        response.headers['Content-Disposition'] = \
+            f"attachment; filename*=UTF-8''{quote(download_name)}"
+        # 关闭 nginx 代理缓冲，数据生成即发送
+        response.headers['X-Accel-Buffering'] = 'no'
+        response.headers['Cache-Control'] = 'no-store'
+        return response
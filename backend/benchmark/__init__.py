@@ -0,0 +1,2 @@
+# benchmark
+# 离线基准测试：生成合成文档，用桩翻译器运行各文件处理器的 start(trans)
@@ -0,0 +1,246 @@
+# benchmark/explain.py
+"""
+translate 表热点查询的执行计划与耗时对比
+
+在独立的基准表（默认 translate_bench，不影响业务数据）中写入数百万行模拟任务，
+分别在 无索引 / 建立 app/script/migrate_indexes.py 中的索引 后，对各热点查询执行 EXPLAIN 并计时，
+结果保存为 JSON 以便跨提交对比。基准表列类型与 init.sql 一致（uuid/status/deleted_flag/md5 为 TEXT）。
+
+用法（在 backend 目录下）：
+    python -m benchmark.explain                                  # 使用 .env 中的 PROD_DATABASE_URL
+    python -m benchmark.explain --db-url sqlite:////tmp/bench.db --rows 1000000
+    python -m benchmark.explain --rows 3000000 --customers 20000 --keep   # 保留基准表，下次可加 --reuse 跳过写入
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from dotenv import find_dotenv, load_dotenv
+from sqlalchemy import create_engine, inspect, text
+
+from app.script.migrate_indexes import TRANSLATE_INDEXES, ensure_indexes
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# 状态分布：与线上大致相当，已完成占绝大多数
+STATUSES = (('done', 85), ('failed', 8), ('none', 5), ('process', 2))
+
+# 名称 -> (说明, SQL)；参数在写入数据时从表中抽样
+HOT_QUERIES = {
+    'process_poll': ('进度轮询 TranslateProcessResource',
+                     "SELECT * FROM {table} WHERE uuid = :uuid AND customer_id = :customer_id LIMIT 1"),
+    'start_by_uuid': ('启动翻译 TranslateStartResource',
+                      "SELECT * FROM {table} WHERE uuid = :uuid LIMIT 1"),
+    'list_page': ('任务列表 TranslateListResource',
+                  "SELECT * FROM {table} WHERE customer_id = :customer_id AND deleted_flag = 'N' "
+                  "ORDER BY created_at DESC LIMIT 10 OFFSET 0"),
+    'list_deep_offset': ('任务列表深翻页（偏移分页）',
+                         "SELECT * FROM {table} WHERE customer_id = :customer_id AND deleted_flag = 'N' "
+                         "ORDER BY created_at DESC, id DESC LIMIT 20 OFFSET :deep_offset"),
+    'list_keyset': ('任务列表深翻页（游标分页）',
+                    "SELECT * FROM {table} WHERE customer_id = :customer_id AND deleted_flag = 'N' "
+                    "AND created_at <= :cursor_at AND (created_at < :cursor_at OR id < :cursor_id) "
+                    "ORDER BY created_at DESC, id DESC LIMIT 21"),
+    'admin_keyset': ('管理后台列表（游标分页）',
+                     "SELECT * FROM {table} WHERE created_at <= :cursor_at "
+                     "AND (created_at < :cursor_at OR id < :cursor_id) ORDER BY created_at DESC, id DESC LIMIT 21"),
+    'list_count': ('任务列表总数（分页）',
+                   "SELECT COUNT(*) FROM {table} WHERE customer_id = :customer_id AND deleted_flag = 'N'"),
+    'status_count': ('状态统计 get_statistics',
+                     "SELECT COUNT(*) FROM {table} WHERE status = 'done' AND deleted_flag = 'N'"),
+    'md5_lookup': ('按 md5 查找',
+                   "SELECT * FROM {table} WHERE md5 = :md5 AND deleted_flag = 'N' LIMIT 5"),
+}
+
+
+def create_table(engine, table):
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        conn.execute(text(f"""
+            CREATE TABLE {table} (
+                id INTEGER NOT NULL PRIMARY KEY,
+                translate_no TEXT,
+                uuid TEXT,
+                customer_id INTEGER,
+                origin_filename TEXT NOT NULL,
+                origin_filepath TEXT NOT NULL,
+                target_filepath TEXT NOT NULL,
+                status TEXT,
+                deleted_flag TEXT,
+                created_at DATETIME,
+                origin_filesize BIGINT,
+                lang TEXT,
+                model TEXT,
+                md5 TEXT,
+                process FLOAT
+            )
+        """))
+
+
+def seed(engine, table, rows, customers, batch_size, rng):
+    """批量写入模拟任务，返回耗时（秒）"""
+    statuses = [s for s, weight in STATUSES for _ in range(weight)]
+    start = datetime.now() - timedelta(days=730)
+    step = timedelta(days=730) / rows
+    sql = text(
+        f"INSERT INTO {table} (id, translate_no, uuid, customer_id, origin_filename, origin_filepath, "
+        f"target_filepath, status, deleted_flag, created_at, origin_filesize, lang, model, md5, process) VALUES "
+        f"(:id, :translate_no, :uuid, :customer_id, :name, :origin, :target, :status, :deleted_flag, "
+        f":created_at, :size, :lang, :model, :md5, :process)"
+    )
+    started = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        batch = []
+        for i in range(offset + 1, min(offset + batch_size, rows) + 1):
+            created = start + step * i
+            name = f"report_{i}.docx"
+            batch.append({
+                'id': i,
+                'translate_no': f"TRANS{created.strftime('%Y%m%d%H%M%S')}",
+                'uuid': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                # 对数均匀分布：少数活跃用户贡献较多任务
+                'customer_id': int(customers ** rng.random()),
+                'name': name,
+                'origin': f"/app/storage/uploads/{created:%Y-%m-%d}/{name}",
+                'target': f"/app/storage/translate/{created:%Y-%m-%d}/{name}",
+                'status': rng.choice(statuses),
+                'deleted_flag': 'Y' if rng.random() < 0.1 else 'N',
+                'created_at': created.replace(microsecond=0),
+                'size': rng.randint(10_000, 20_000_000),
+                'lang': '英语',
+                'model': 'gpt-4o-mini',
+                'md5': f"{rng.getrandbits(128):032x}",
+                'process': 100.0,
+            })
+        with engine.begin() as conn:
+            conn.execute(sql, batch)
+        if (offset // batch_size) % 50 == 0:
+            print(f"已写入 {min(offset + batch_size, rows)}/{rows}")
+    return time.perf_counter() - started
+
+
+def sample_params(engine, table, rows, rng):
+    """抽样一条存在的记录作为查询参数；customer_id 取任务最多的用户（最差情况），深翻页取其一半位置"""
+    with engine.connect() as conn:
+        row = conn.execute(text(f"SELECT uuid, md5 FROM {table} WHERE id = :id"),
+                           {'id': rng.randint(1, rows)}).one()
+        customer_id, count = conn.execute(text(
+            f"SELECT customer_id, COUNT(*) FROM {table} WHERE deleted_flag = 'N' "
+            f"GROUP BY customer_id ORDER BY COUNT(*) DESC LIMIT 1"
+        )).one()
+        deep_offset = count // 2
+        cursor_at, cursor_id = conn.execute(text(
+            f"SELECT created_at, id FROM {table} WHERE customer_id = :customer_id AND deleted_flag = 'N' "
+            f"ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET :offset"
+        ), {'customer_id': customer_id, 'offset': deep_offset}).one()
+    return {'uuid': row[0], 'md5': row[1], 'customer_id': customer_id,
+            'deep_offset': deep_offset, 'cursor_at': cursor_at, 'cursor_id': cursor_id}
+
+
+def explain(conn, dialect, sql, params):
+    """返回执行计划摘要"""
+    if dialect == 'sqlite':
+        plan = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+        return {'plan': [row[-1] for row in plan]}
+    plan = conn.execute(text(f"EXPLAIN {sql}"), params).mappings().fetchall()
+    return {'plan': [{key: row.get(key) for key in ('type', 'key', 'key_len', 'rows', 'Extra')}
+                     for row in plan]}
+
+
+def measure(engine, table, params, runs):
+    results = {}
+    with engine.connect() as conn:
+        for name, (description, template) in HOT_QUERIES.items():
+            sql = template.format(table=table)
+            query_params = {k: v for k, v in params.items() if f":{k}" in sql}
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                conn.execute(text(sql), query_params).fetchall()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = {
+                'description': description,
+                'median_ms': round(statistics.median(timings), 2),
+                'max_ms': round(max(timings), 2),
+                **explain(conn, engine.dialect.name, sql, query_params),
+            }
+    return results
+
+
+def _plan_text(plan):
+    if plan and isinstance(plan[0], dict):
+        return '; '.join(f"type={p['type']} key={p['key']} rows={p['rows']}" for p in plan)
+    return '; '.join(plan)
+
+
+def main():
+    load_dotenv(find_dotenv())
+    parser = argparse.ArgumentParser(description='translate 表热点查询 EXPLAIN 基准')
+    parser.add_argument('--db-url', default=os.getenv('PROD_DATABASE_URL'), help='数据库地址，默认 PROD_DATABASE_URL')
+    parser.add_argument('--table', default='translate_bench', help='基准表名（会被删除重建）')
+    parser.add_argument('--rows', type=int, default=3_000_000)
+    parser.add_argument('--customers', type=int, default=10_000)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--runs', type=int, default=5, help='每个查询执行次数，取中位数')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--reuse', action='store_true', help='复用已有基准表（需先删除索引），跳过写入')
+    parser.add_argument('--keep', action='store_true', help='结束后保留基准表')
+    parser.add_argument('--output', help='结果 JSON 路径，默认 benchmark/results/explain-<时间>.json')
+    args = parser.parse_args()
+    if not args.db_url:
+        parser.error('需要 --db-url 或环境变量 PROD_DATABASE_URL')
+    if args.table == 'translate':
+        parser.error('不能使用业务表 translate')
+
+    rng = random.Random(args.seed)
+    engine = create_engine(args.db_url)
+    seed_seconds = 0
+    if not args.reuse:
+        create_table(engine, args.table)
+        seed_seconds = seed(engine, args.table, args.rows, args.customers, args.batch_size, rng)
+        print(f"写入 {args.rows} 行，耗时 {seed_seconds:.1f}s")
+    elif {i['name'] for i in inspect(engine).get_indexes(args.table)} & set(TRANSLATE_INDEXES):
+        parser.error(f"{args.table} 上已有索引，--reuse 前请先删除")
+
+    params = sample_params(engine, args.table, args.rows, rng)
+    before = measure(engine, args.table, params, args.runs)
+
+    started = time.perf_counter()
+    ensure_indexes(engine, table=args.table)
+    index_seconds = time.perf_counter() - started
+    print(f"建立索引耗时 {index_seconds:.1f}s")
+    after = measure(engine, args.table, params, args.runs)
+
+    print(f"{'查询':<16}{'无索引(ms)':>14}{'有索引(ms)':>14}  执行计划（有索引）")
+    for name in HOT_QUERIES:
+        print(f"{name:<16}{before[name]['median_ms']:>14}{after[name]['median_ms']:>14}  "
+              f"{_plan_text(after[name]['plan'])}")
+
+    if not args.keep:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE {args.table}"))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"explain-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'dialect': engine.dialect.name,
+            'rows': args.rows,
+            'customers': args.customers,
+            'seed_seconds': round(seed_seconds, 1),
+            'index_seconds': round(index_seconds, 1),
+            'params': params,
+            'before': before,
+            'after': after,
+        }, f, ensure_ascii=False, indent=2, default=str)
+    print(f"结果已保存: {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+# benchmark/generators.py
+"""
+合成文档生成器
+
+每个生成器接收输出路径和规模参数，返回写出的文件路径。
+文本为中英混排的伪随机句子（固定随机种子，保证跨提交可比）。
+"""
+import csv
+import random
+
+WORDS = [
+    'translation', 'document', 'performance', 'paragraph', 'table', 'server', 'model',
+    'throughput', 'latency', 'segment', 'format', 'style', 'header', 'footer', 'slide',
+    '翻译', '文档', '性能', '段落', '表格', '模型', '吞吐', '延迟', '格式', '样式',
+]
+
+
+def _sentence(rng, min_words=6, max_words=18):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return ' '.join(words).capitalize() + '.'
+
+
+def _paragraph(rng, sentences=3):
+    return ' '.join(_sentence(rng) for _ in range(sentences))
+
+
+def make_docx(path, paragraphs=200, tables=5, rows=5, cols=4, seed=0):
+    """Word：N 个段落（含标题与加粗 run）+ 若干表格"""
+    from docx import Document
+
+    rng = random.Random(seed)
+    document = Document()
+    section = document.sections[0]
+    section.header.paragraphs[0].text = _sentence(rng)
+    section.footer.paragraphs[0].text = _sentence(rng)
+
+    table_every = max(paragraphs // (tables + 1), 1) if tables else 0
+    made_tables = 0
+    for i in range(paragraphs):
+        if i % 20 == 0:
+            document.add_heading(_sentence(rng, 3, 6), level=1 + (i // 20) % 3)
+        p = document.add_paragraph(_paragraph(rng))
+        p.add_run(' ' + _sentence(rng)).bold = True
+        if table_every and i % table_every == table_every - 1 and made_tables < tables:
+            table = document.add_table(rows=rows, cols=cols)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = _sentence(rng, 2, 6)
+            made_tables += 1
+
+    document.save(path)
+    return path
+
+
+def make_xlsx(path, rows=200, cols=10, sheets=2, merge_every=10, seed=0):
+    """Excel：N×M 单元格（混入数字），每隔若干行合并一段单元格"""
+    import openpyxl
+
+    rng = random.Random(seed)
+    wb = openpyxl.Workbook()
+    for s in range(sheets):
+        ws = wb.active if s == 0 else wb.create_sheet()
+        ws.title = f"Sheet{s + 1}"
+        for r in range(1, rows + 1):
+            for c in range(1, cols + 1):
+                ws.cell(row=r, column=c, value=rng.randint(0, 10000) if c == 1 else _sentence(rng, 2, 8))
+            if merge_every and r % merge_every == 0 and cols >= 3:
+                ws.merge_cells(start_row=r, start_column=2, end_row=r, end_column=3)
+    wb.save(path)
+    return path
+
+
+def make_pptx(path, slides=30, boxes=3, groups=1, seed=0):
+    """PowerPoint：N 张幻灯片，每张含标题、文本框、组合形状和一个表格"""
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    rng = random.Random(seed)
+    prs = Presentation()
+    layout = prs.slide_layouts[5]  # 仅标题
+    for _ in range(slides):
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.title.text = _sentence(rng, 3, 6)
+        for b in range(boxes):
+            box = slide.shapes.add_textbox(Inches(0.5), Inches(1.5 + b * 1.2), Inches(4), Inches(1))
+            box.text_frame.text = _paragraph(rng, 2)
+        for _ in range(groups):
+            group = slide.shapes.add_group_shape()
+            for k in range(2):
+                inner = group.shapes.add_textbox(Inches(5), Inches(1.5 + k), Inches(4), Inches(0.8))
+                inner.text_frame.text = _sentence(rng)
+        table = slide.shapes.add_table(3, 3, Inches(5), Inches(4.5), Inches(4), Inches(1.5)).table
+        for row in table.rows:
+            for cell in row.cells:
+                cell.text = _sentence(rng, 2, 5)
+    prs.save(path)
+    return path
+
+
+def make_md(path, size_kb=64, seed=0):
+    """Markdown：标题/段落/列表/代码块/表格循环，直到达到目标大小"""
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    i = 0
+    while size < size_kb * 1024:
+        block = [
+            f"{'#' * (1 + i % 3)} {_sentence(rng, 3, 6)}",
+            _paragraph(rng),
+            '\n'.join(f"- {_sentence(rng)}" for _ in range(3)),
+            "```python\nprint('keep me')\n```",
+            "| A | B |\n| --- | --- |\n" + '\n'.join(
+                f"| {_sentence(rng, 2, 4)} | {_sentence(rng, 2, 4)} |" for _ in range(3)),
+        ]
+        text = '\n\n'.join(block) + '\n\n'
+        parts.append(text)
+        size += len(text.encode('utf-8'))
+        i += 1
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(''.join(parts))
+    return path
+
+
+def make_html(path, size_kb=64, seed=0):
+    """HTML：段落、列表、表格和 script/style（不应被翻译）"""
+    rng = random.Random(seed)
+    body = []
+    size = 0
+    while size < size_kb * 1024:
+        chunk = (
+            f"<h2>{_sentence(rng, 3, 6)}</h2>\n"
+            f"<p>{_paragraph(rng)} <b>{_sentence(rng)}</b></p>\n"
+            f"<ul><li>{_sentence(rng)}</li><li>{_sentence(rng)}</li></ul>\n"
+            f"<table><tr><td>{_sentence(rng, 2, 4)}</td><td>{_sentence(rng, 2, 4)}</td></tr></table>\n"
+        )
+        body.append(chunk)
+        size += len(chunk.encode('utf-8'))
+    html = (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Benchmark</title>"
+        "<style>p { color: #333; }</style><script>var keep = 1;</script></head>\n<body>\n"
+        + ''.join(body) + "</body></html>\n"
+    )
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    return path
+
+
+def make_csv(path, rows=500, cols=6, seed=0):
+    """CSV：首列为数字，其余为文本"""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([f"col{c}" for c in range(cols)])
+        for r in range(rows):
+            writer.writerow([r] + [_sentence(rng, 2, 8) for _ in range(cols - 1)])
+    return path
+
+
+def make_txt(path, size_kb=64, seed=0):
+    """TXT：空行分隔的段落"""
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    while size < size_kb * 1024:
+        text = _paragraph(rng, rng.randint(2, 5)) + '\n\n'
+        parts.append(text)
+        size += len(text.encode('utf-8'))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(''.join(parts))
+    return path
+
+
+# 格式 -> (扩展名, 生成器, 各规模档位参数)
+GENERATORS = {
+    'docx': ('.docx', make_docx, {
+        'small': {'paragraphs': 50, 'tables': 2},
+        'medium': {'paragraphs': 500, 'tables': 10},
+        'large': {'paragraphs': 3000, 'tables': 40},
+    }),
+    'xlsx': ('.xlsx', make_xlsx, {
+        'small': {'rows': 50, 'cols': 5},
+        'medium': {'rows': 500, 'cols': 10},
+        'large': {'rows': 3000, 'cols': 20},
+    }),
+    'pptx': ('.pptx', make_pptx, {
+        'small': {'slides': 5},
+        'medium': {'slides': 50},
+        'large': {'slides': 200},
+    }),
+    'md': ('.md', make_md, {
+        'small': {'size_kb': 16},
+        'medium': {'size_kb': 256},
+        'large': {'size_kb': 2048},
+    }),
+    'html': ('.html', make_html, {
+        'small': {'size_kb': 16},
+        'medium': {'size_kb': 256},
+        'large': {'size_kb': 2048},
+    }),
+    'csv': ('.csv', make_csv, {
+        'small': {'rows': 100},
+        'medium': {'rows': 2000},
+        'large': {'rows': 20000},
+    }),
+    'txt': ('.txt', make_txt, {
+        'small': {'size_kb': 16},
+        'medium': {'size_kb': 256},
+        'large': {'size_kb': 2048},
+    }),
+}
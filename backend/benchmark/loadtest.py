@@ -0,0 +1,314 @@
+# benchmark/loadtest.py
+"""
+接口压测：登录 → 上传 → 启动翻译 → 轮询进度 → 下载
+
+每个虚拟用户一个线程、一个 HTTP 会话，按 --jobs 连续提交翻译任务。
+翻译接口指向模拟接口（benchmark.mock_llm），不产生费用。
+压测期间定时抓取后端 /metrics，记录 SQLAlchemy 连接池借出数与运行中任务数的峰值，
+用于确定 gunicorn worker 数和 pool_size/max_overflow（DB_POOL_SIZE/DB_MAX_OVERFLOW）。
+
+用法（在 backend 目录下）：
+    python -m benchmark.mock_llm --port 8000 &
+    python -m benchmark.loadtest --base-url http://127.0.0.1:5000 \\
+        --user test@qq.com:123456 --concurrency 20 --jobs 5 \\
+        --api-url http://127.0.0.1:8000/v1 --format docx --size small
+
+多个账号可重复 --user，或用 --users-file（每行 email:password），虚拟用户轮流使用。
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import requests
+
+from .generators import GENERATORS
+
+DONE_STATUSES = ('done', 'failed')
+
+
+class Recorder:
+    """线程安全的耗时/错误记录"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}  # {接口: [秒]}
+        self.errors = {}  # {接口: 次数}
+        self.jobs = []  # [{'status', 'seconds'}]
+
+    def record(self, endpoint, seconds, ok=True):
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def job(self, status, seconds):
+        with self.lock:
+            self.jobs.append({'status': status, 'seconds': seconds})
+
+
+def percentile(values, pct):
+    """最近秩百分位"""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def summarize(values):
+    return {
+        'count': len(values),
+        'p50': round(percentile(values, 50), 3),
+        'p95': round(percentile(values, 95), 3),
+        'p99': round(percentile(values, 99), 3),
+        'max': round(max(values), 3) if values else 0,
+    }
+
+
+class VirtualUser:
+    def __init__(self, args, account, source, recorder, stop):
+        self.args = args
+        self.email, self.password = account
+        self.source = source
+        self.recorder = recorder
+        self.stop = stop
+        self.session = requests.Session()
+
+    def _call(self, endpoint, method, path, **kwargs):
+        """发送请求并记录耗时；业务 code 非 200 视为失败"""
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = self.session.request(method, self.args.base_url + path,
+                                            timeout=self.args.request_timeout, **kwargs)
+            ok = response.status_code == 200
+            if ok and response.headers.get('Content-Type', '').startswith('application/json'):
+                ok = response.json().get('code', 200) == 200
+            return response if ok else None
+        except requests.RequestException:
+            return None
+        finally:
+            self.recorder.record(endpoint, time.perf_counter() - started, ok)
+
+    def login(self):
+        response = self._call('login', 'POST', '/api/login',
+                              data={'email': self.email, 'password': self.password})
+        if response is None:
+            return False
+        token = response.json()['data']['token']
+        # 与前端一致：令牌放在 token 请求头（JWT_HEADER_NAME='token'，无前缀）
+        self.session.headers['token'] = token
+        return True
+
+    def run_job(self):
+        name, ext = os.path.splitext(os.path.basename(self.source))
+        file_name = f"{name}-{uuid.uuid4().hex[:8]}{ext}"
+        with open(self.source, 'rb') as f:
+            response = self._call('upload', 'POST', '/api/upload', files={'file': (file_name, f)})
+        if response is None:
+            return
+        upload = response.json()['data']
+
+        response = self._call('start', 'POST', '/api/translate', data={
+            'server': 'openai',
+            'model': self.args.model,
+            'backup_model': '',
+            'lang': self.args.lang,
+            'uuid': upload['uuid'],
+            'prompt': '请将以下内容翻译为{target_lang}',
+            'threads': self.args.threads,
+            'file_name': file_name,
+            'api_url': self.args.api_url,
+            'api_key': 'mock-key',
+            'type[2]': 'trans_all_only_inherit',
+            'size': os.path.getsize(self.source),
+        })
+        if response is None:
+            return
+        task_id = response.json()['data']['task_id']
+
+        started = time.perf_counter()
+        status = 'timeout'
+        while not self.stop.is_set() and time.perf_counter() - started < self.args.job_timeout:
+            time.sleep(self.args.poll_interval)
+            response = self._call('process', 'POST', '/api/process', data={'uuid': upload['uuid']})
+            if response is not None and response.json()['data']['status'] in DONE_STATUSES:
+                status = response.json()['data']['status']
+                break
+        self.recorder.job(status, time.perf_counter() - started)
+
+        if status == 'done':
+            self._call('download', 'GET', f"/api/translate/download/{task_id}")
+
+    def run(self):
+        if not self.login():
+            return
+        for _ in range(self.args.jobs):
+            if self.stop.is_set():
+                break
+            self.run_job()
+
+
+class MetricsSampler(threading.Thread):
+    """定时抓取 /metrics，记录指标峰值"""
+
+    WATCHED = (
+        'doctranslator_db_pool_checked_out',
+        'doctranslator_tasks_running',
+        'doctranslator_pool_busy_workers',
+        'doctranslator_llm_inflight_requests',
+    )
+
+    def __init__(self, url, interval, token=None):
+        super().__init__(daemon=True)
+        self.url = url
+        self.interval = interval
+        self.headers = {'Authorization': f"Bearer {token}"} if token else {}
+        self.peaks = {name: 0 for name in self.WATCHED}
+        self.samples = 0
+        self.failures = 0
+        self.last_error = None
+        self.stop = threading.Event()
+
+    def sample(self):
+        values = {name: 0.0 for name in self.WATCHED}
+        response = requests.get(self.url, headers=self.headers, timeout=5)
+        response.raise_for_status()
+        text = response.text
+        for line in text.splitlines():
+            if line.startswith('#'):
+                continue
+            name = line.split('{', 1)[0].split(' ', 1)[0]
+            if name in values:
+                values[name] += float(line.rsplit(' ', 1)[1])
+        for name, value in values.items():
+            self.peaks[name] = max(self.peaks[name], value)
+        self.samples += 1
+
+    def run(self):
+        while not self.stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+
+
+def load_accounts(args):
+    accounts = [tuple(u.split(':', 1)) for u in args.user or []]
+    if args.users_file:
+        with open(args.users_file, encoding='utf-8') as f:
+            accounts += [tuple(line.strip().split(':', 1)) for line in f if ':' in line]
+    return accounts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DocTranslator 接口压测')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000', help='后端地址')
+    parser.add_argument('--user', action='append', help='email:password，可重复')
+    parser.add_argument('--users-file', help='账号文件，每行 email:password')
+    parser.add_argument('--concurrency', type=int, default=10, help='虚拟用户数')
+    parser.add_argument('--jobs', type=int, default=3, help='每个虚拟用户提交的任务数')
+    parser.add_argument('--api-url', default='http://127.0.0.1:8000/v1', help='任务使用的翻译接口（模拟接口）')
+    parser.add_argument('--model', default='mock-model')
+    parser.add_argument('--lang', default='英语')
+    parser.add_argument('--threads', type=int, default=10, help='每个任务的翻译线程数')
+    parser.add_argument('--format', default='docx', choices=sorted(GENERATORS))
+    parser.add_argument('--size', default='small', choices=('small', 'medium', 'large'))
+    parser.add_argument('--poll-interval', type=float, default=1.0, help='进度轮询间隔（秒）')
+    parser.add_argument('--job-timeout', type=float, default=600, help='单个任务最长等待（秒）')
+    parser.add_argument('--request-timeout', type=float, default=60, help='单个HTTP请求超时（秒）')
+    parser.add_argument('--metrics-url', help='指标地址，默认 <base-url>/metrics；填 none 关闭')
+    parser.add_argument('--metrics-interval', type=float, default=1.0)
+    parser.add_argument('--metrics-token', help='后端配置了 METRICS_TOKEN 时填写，以 Authorization: Bearer 发送')
+    parser.add_argument('--output', help='结果 JSON 路径')
+    args = parser.parse_args()
+
+    accounts = load_accounts(args)
+    if not accounts:
+        parser.error('至少需要一个账号（--user 或 --users-file）')
+
+    extension, generator, presets = GENERATORS[args.format]
+    workdir = tempfile.mkdtemp(prefix='doctranslator-load-')
+    source = generator(os.path.join(workdir, f"loadtest{extension}"), **presets[args.size])
+
+    recorder = Recorder()
+    stop = threading.Event()
+    sampler = None
+    metrics_url = args.metrics_url or args.base_url + '/metrics'
+    if metrics_url != 'none':
+        sampler = MetricsSampler(metrics_url, args.metrics_interval, args.metrics_token)
+        sampler.start()
+
+    users = [VirtualUser(args, accounts[i % len(accounts)], source, recorder, stop)
+             for i in range(args.concurrency)]
+    threads = [threading.Thread(target=user.run, daemon=True) for user in users]
+
+    started = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        stop.set()
+        print('已中断，等待进行中的请求结束...')
+        for thread in threads:
+            thread.join(timeout=args.request_timeout)
+    elapsed = time.perf_counter() - started
+    if sampler:
+        sampler.stop.set()
+
+    endpoints = {name: summarize(values) for name, values in recorder.latencies.items()}
+    for name, summary in endpoints.items():
+        summary['errors'] = recorder.errors.get(name, 0)
+    jobs = recorder.jobs
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'base_url': args.base_url,
+        'concurrency': args.concurrency,
+        'jobs_per_user': args.jobs,
+        'format': args.format,
+        'size': args.size,
+        'elapsed_seconds': round(elapsed, 1),
+        'endpoints': endpoints,
+        'jobs': {
+            **summarize([j['seconds'] for j in jobs if j['status'] == 'done']),
+            'done': sum(1 for j in jobs if j['status'] == 'done'),
+            'failed': sum(1 for j in jobs if j['status'] == 'failed'),
+            'timeout': sum(1 for j in jobs if j['status'] == 'timeout'),
+            'per_minute': round(len(jobs) / elapsed * 60, 1) if elapsed else 0,
+        },
+        'metrics_peaks': sampler.peaks if sampler else {},
+        'metrics_samples': sampler.samples if sampler else 0,
+        'metrics_failures': sampler.failures if sampler else 0,
+    }
+
+    print(f"{'接口':<10}{'次数':>8}{'错误':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, s in endpoints.items():
+        print(f"{name:<10}{s['count']:>8}{s['errors']:>8}{s['p50']:>10}{s['p95']:>10}{s['p99']:>10}{s['max']:>10}")
+    j = report['jobs']
+    print(f"任务完成耗时: p50={j['p50']}s p95={j['p95']}s p99={j['p99']}s "
+          f"完成={j['done']} 失败={j['failed']} 超时={j['timeout']} 吞吐={j['per_minute']}/分钟")
+    if sampler:
+        print(f"指标峰值（{sampler.samples} 次采样）: " +
+              ', '.join(f"{name}={value:g}" for name, value in sampler.peaks.items()))
+        if sampler.failures:
+            print(f"指标抓取失败 {sampler.failures} 次，峰值可能偏低（最后一次错误: {sampler.last_error}）")
+
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'results',
+        f"loadtest-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {output}")
+
+
+if __name__ == '__main__':
+    main()
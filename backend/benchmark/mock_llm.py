@@ -0,0 +1,328 @@
+# benchmark/mock_llm.py
+"""
+本地模拟翻译接口（压测与故障注入用，不产生任何费用）
+
+提供：
+- OpenAI 兼容接口  POST /v1/chat/completions、GET /v1/models
+  任务的 api_url 填 http://<host>:8000/v1 即可（init_openai 会补全 /v1/）
+- 百度翻译接口    POST /api/trans/vip/translate
+  后端设置环境变量 BAIDU_API_URL=http://<host>:8000/api/trans/vip/translate
+- 统计信息        GET /stats（POST /stats/reset 清零）
+
+译文为 "[mock] " + 原文，保留换行、Markdown/HTML 占位符。
+响应中的 usage 按约 4 字符/token 估算；同一系统提示词第二次出现时计为 cached_tokens。
+
+用法：
+    python -m benchmark.mock_llm --port 8000 --latency lognormal:300,0.5 \\
+        --max-rps 20 --rate-limit-rate 0.05 --error-rate 0.02 --refusal-rate 0.01
+
+所有参数也可用环境变量设置：MOCK_LLM_<参数名大写>，如 MOCK_LLM_LATENCY=uniform:100,800
+"""
+import argparse
+import math
+import os
+import random
+import threading
+import time
+import uuid
+
+from flask import Flask, jsonify, request
+
+REFUSAL_PREFIX = "Sorry, I cannot"
+MOCK_PREFIX = "[mock] "
+
+app = Flask(__name__)
+config = argparse.Namespace()
+_stats_lock = threading.Lock()
+_stats = {}
+_seen_prompts = set()
+
+
+# ==================== 延迟与限流 ====================
+
+def parse_latency(spec):
+    """
+    解析延迟分布（毫秒）
+    fixed:200 | uniform:100,500 | normal:300,50 | lognormal:300,0.5（中位数, sigma）
+    :return: 无参函数，返回本次延迟（秒）
+    """
+    kind, _, args = (spec or 'fixed:0').partition(':')
+    values = [float(v) for v in args.split(',') if v.strip()] or [0]
+    if kind == 'fixed':
+        return lambda: values[0] / 1000
+    if kind == 'uniform':
+        return lambda: random.uniform(values[0], values[1]) / 1000
+    if kind == 'normal':
+        return lambda: max(random.gauss(values[0], values[1]), 0) / 1000
+    if kind == 'lognormal':
+        mu = math.log(max(values[0], 1))
+        return lambda: random.lognormvariate(mu, values[1]) / 1000
+    raise ValueError(f"不支持的延迟分布: {spec}")
+
+
+class TokenBucket:
+    """每秒请求数上限，超出时返回 429"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        if not self.rate:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+def _count(key, n=1):
+    with _stats_lock:
+        _stats[key] = _stats.get(key, 0) + n
+
+
+def _estimate_tokens(text):
+    return max(len(text or '') // 4, 1)
+
+
+def _admit():
+    """
+    限流与随机故障判定
+    :return: None 表示正常处理，否则为 (类型, HTTP状态码)
+    """
+    if not config.bucket.try_acquire():
+        return 'throttled', 429
+    if random.random() < config.rate_limit_rate:
+        return 'rate_limited', 429
+    if random.random() < config.error_rate:
+        return 'server_error', random.choice((500, 502, 503))
+    return None
+
+
+def _acquire_slot():
+    """并发上限，超出时返回 False"""
+    if config.slots is None:
+        return True
+    return config.slots.acquire(blocking=False)
+
+
+def _release_slot():
+    if config.slots is not None:
+        config.slots.release()
+
+
+def _sleep(output_tokens):
+    delay = config.latency() + output_tokens * config.per_token_ms / 1000
+    if random.random() < config.hang_rate:
+        delay += config.hang_seconds
+    time.sleep(delay)
+
+
+def _mock_output(text):
+    """
+    生成译文，按概率注入截断/拒答
+    :return: (译文, finish_reason)
+    """
+    output = MOCK_PREFIX + text
+    if random.random() < config.truncate_rate:
+        _count('truncated')
+        return output[:max(len(output) // 2, 1)], 'length'
+    if random.random() < config.refusal_rate:
+        _count('refused')
+        return f"{REFUSAL_PREFIX} translate this content.", 'stop'
+    return output, 'stop'
+
+
+# ==================== OpenAI 兼容接口 ====================
+
+def _openai_error(kind, status):
+    _count(kind)
+    response = jsonify({'error': {'message': f"mock {kind}", 'type': kind, 'code': status}})
+    response.status_code = status
+    if status == 429:
+        response.headers['Retry-After'] = str(config.retry_after)
+    return response
+
+
+@app.route('/v1/models', methods=['GET'])
+def list_models():
+    return jsonify({'object': 'list', 'data': [
+        {'id': name, 'object': 'model', 'owned_by': 'mock'} for name in config.models
+    ]})
+
+
+@app.route('/v1/chat/completions', methods=['POST'])
+def chat_completions():
+    _count('requests')
+    rejected = _admit()
+    if rejected:
+        return _openai_error(*rejected)
+    if not _acquire_slot():
+        return _openai_error('concurrency_limited', 429)
+
+    try:
+        body = request.get_json(force=True, silent=True) or {}
+        messages = body.get('messages') or []
+        system = ''.join(m.get('content', '') for m in messages if m.get('role') == 'system')
+        user = ''.join(m.get('content', '') for m in messages if m.get('role') == 'user')
+
+        output, finish_reason = _mock_output(user)
+        prompt_tokens = _estimate_tokens(system) + _estimate_tokens(user)
+        completion_tokens = _estimate_tokens(output)
+        with _stats_lock:
+            cached_tokens = _estimate_tokens(system) if system in _seen_prompts else 0
+            _seen_prompts.add(system)
+
+        _sleep(completion_tokens)
+        _count('ok')
+        _count('prompt_tokens', prompt_tokens)
+        _count('completion_tokens', completion_tokens)
+
+        return jsonify({
+            'id': f"chatcmpl-mock-{uuid.uuid4().hex[:12]}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'mock'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': output},
+                'finish_reason': finish_reason,
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+                'prompt_tokens_details': {'cached_tokens': cached_tokens},
+            },
+        })
+    finally:
+        _release_slot()
+
+
+# ==================== 百度翻译接口 ====================
+
+# 百度接口出错时仍返回 HTTP 200，错误码放在 body 中
+BAIDU_ERRORS = {
+    'throttled': ('54003', 'Invalid Access Limit'),
+    'rate_limited': ('54003', 'Invalid Access Limit'),
+    'concurrency_limited': ('54003', 'Invalid Access Limit'),
+    'server_error': ('52002', 'SYSTEM ERROR'),
+}
+
+
+@app.route('/api/trans/vip/translate', methods=['GET', 'POST'])
+def baidu_translate():
+    _count('baidu_requests')
+    rejected = _admit()
+    if rejected is None and not _acquire_slot():
+        rejected = ('concurrency_limited', 429)
+    if rejected:
+        _count(rejected[0])
+        code, message = BAIDU_ERRORS[rejected[0]]
+        return jsonify({'error_code': code, 'error_msg': message})
+
+    try:
+        params = request.form if request.method == 'POST' else request.args
+        text = params.get('q', '')
+        lines = text.split('\n')
+        _sleep(_estimate_tokens(text))
+        _count('ok')
+        return jsonify({
+            'from': params.get('from', 'auto'),
+            'to': params.get('to', 'en'),
+            # 与真实接口一致：按换行拆分、不返回空行
+            'trans_result': [{'src': line, 'dst': _mock_output(line)[0]} for line in lines if line.strip()],
+        })
+    finally:
+        _release_slot()
+
+
+# ==================== 统计 ====================
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    with _stats_lock:
+        return jsonify(dict(_stats))
+
+
+@app.route('/stats/reset', methods=['POST'])
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+        _seen_prompts.clear()
+    return jsonify({'ok': True})
+
+
+def build_parser():
+    env = lambda name, default: os.getenv(f"MOCK_LLM_{name.upper()}", default)
+    parser = argparse.ArgumentParser(description='模拟 OpenAI/百度翻译接口')
+    parser.add_argument('--host', default=env('host', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(env('port', 8000)))
+    parser.add_argument('--latency', default=env('latency', 'fixed:200'),
+                        help='延迟分布（毫秒）：fixed:200 | uniform:100,500 | normal:300,50 | lognormal:300,0.5')
+    parser.add_argument('--per-token-ms', type=float, default=float(env('per_token_ms', 0)),
+                        help='每个输出 token 额外延迟（毫秒），模拟生成速度')
+    parser.add_argument('--max-rps', type=float, default=float(env('max_rps', 0)),
+                        help='每秒请求上限，超出返回 429，0 表示不限')
+    parser.add_argument('--max-concurrency', type=int, default=int(env('max_concurrency', 0)),
+                        help='并发请求上限，超出返回 429，0 表示不限')
+    parser.add_argument('--rate-limit-rate', type=float, default=float(env('rate_limit_rate', 0)),
+                        help='随机返回 429 的概率')
+    parser.add_argument('--retry-after', type=int, default=int(env('retry_after', 1)),
+                        help='429 响应的 Retry-After（秒）')
+    parser.add_argument('--error-rate', type=float, default=float(env('error_rate', 0)),
+                        help='随机返回 5xx 的概率')
+    parser.add_argument('--truncate-rate', type=float, default=float(env('truncate_rate', 0)),
+                        help='译文被截断的概率')
+    parser.add_argument('--refusal-rate', type=float, default=float(env('refusal_rate', 0)),
+                        help=f'返回拒答前缀（{REFUSAL_PREFIX}）的概率')
+    parser.add_argument('--hang-rate', type=float, default=float(env('hang_rate', 0)),
+                        help='请求挂起的概率（用于触发客户端超时）')
+    parser.add_argument('--hang-seconds', type=float, default=float(env('hang_seconds', 300)))
+    parser.add_argument('--models', default=env('models', 'mock-model,gpt-4o-mini,gpt-3.5-turbo'),
+                        help='/v1/models 返回的模型列表')
+    parser.add_argument('--seed', type=int, default=env('seed', None))
+    return parser
+
+
+def configure(args):
+    """应用配置（基准测试在进程内启动时也调用此函数）"""
+    config.__dict__.update(vars(args))
+    config.latency = parse_latency(args.latency)
+    config.bucket = TokenBucket(args.max_rps)
+    config.slots = threading.BoundedSemaphore(args.max_concurrency) if args.max_concurrency else None
+    config.models = [m.strip() for m in args.models.split(',') if m.strip()]
+    if args.seed is not None:
+        random.seed(int(args.seed))
+
+
+def serve_in_thread(port=0, **options):
+    """
+    在后台线程启动（供基准测试使用）
+    :return: (服务地址, server 对象)，调用 server.shutdown() 停止
+    """
+    from werkzeug.serving import make_server
+
+    args = build_parser().parse_args([])
+    for key, value in options.items():
+        setattr(args, key, value)
+    configure(args)
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def main():
+    args = build_parser().parse_args()
+    configure(args)
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
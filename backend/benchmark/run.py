@@ -0,0 +1,260 @@
+# benchmark/run.py
+"""
+离线基准测试
+
+对每种格式生成合成文档，用桩翻译器（不访问网络、不连数据库）运行处理器的 start(trans)，
+记录 提取/翻译/写出 三段耗时、峰值 RSS 和每秒翻译文本块数，结果保存为 JSON 以便跨提交对比。
+
+用法（在 backend 目录下）：
+    python -m benchmark.run                                  # 全部格式，medium 档
+    python -m benchmark.run --formats docx,xlsx --sizes small,large
+    python -m benchmark.run --latency-ms 50 --threads 10     # 模拟接口延迟
+    python -m benchmark.run --mock lognormal:300,0.5         # 走真实 OpenAI 客户端，请求本地模拟接口
+    python -m benchmark.run --api-url http://127.0.0.1:8000/v1  # 使用已启动的模拟接口（benchmark.mock_llm）
+    python -m benchmark.run --compare old.json new.json      # 对比两次结果
+
+每个用例在独立子进程中运行，峰值 RSS 互不影响。
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+from .generators import GENERATORS
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# 阶段归类：处理器各阶段名 -> 报告中的三段
+STAGE_GROUPS = {
+    'extract': ('parse', 'extract', 'init', 'load_models'),
+    'translate': ('translate',),
+    'write': ('apply', 'save', 'write'),
+}
+
+HANDLER_MODULES = {
+    'docx': 'word',
+    'xlsx': 'excel',
+    'pptx': 'powerpoint',
+    'md': 'md',
+    'html': 'html',
+    'csv': 'csv_handle',
+    'txt': 'txt',
+}
+
+
+def _install_stubs(latency_ms, counter, api_url=None):
+    """
+    替换数据库访问，使处理器可离线运行
+    未指定 api_url 时同时替换翻译接口；指定时走真实 OpenAI 客户端请求该地址（如模拟接口）
+    """
+    from app.translate import db, to_translate
+
+    translate_openai = to_translate._translate_openai
+
+    def stub_translate(trans, text, model):
+        counter['requests'] += 1
+        if api_url:
+            return translate_openai(trans, text, model)
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        return f"[{trans.get('lang', 'EN')}] {text}"
+
+    if api_url:
+        to_translate.init_openai(api_url, 'mock-key')
+    to_translate._translate_openai = stub_translate
+    db.execute = lambda *args, **kwargs: True
+    db.get = lambda *args, **kwargs: {}
+    db.get_all = lambda *args, **kwargs: []
+    db.update_status = lambda *args, **kwargs: True
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_case(fmt, size, params, threads, latency_ms, workdir, api_url=None):
+    """子进程中运行单个用例"""
+    import importlib
+    from app.translate import profiler
+
+    extension, generator, _ = GENERATORS[fmt]
+    source = os.path.join(workdir, f"{fmt}_{size}{extension}")
+    target = os.path.join(workdir, f"{fmt}_{size}_translated{extension}")
+
+    started = time.perf_counter()
+    generator(source, **params)
+    generate_seconds = time.perf_counter() - started
+
+    counter = {'requests': 0}
+    _install_stubs(latency_ms, counter, api_url)
+    handler = importlib.import_module(f"app.translate.{HANDLER_MODULES[fmt]}")
+
+    trans = {
+        'id': 1,
+        'file_path': source,
+        'target_file': target,
+        'target_path_dir': workdir,
+        'extension': extension,
+        'server': 'openai',
+        'model': 'benchmark',
+        'backup_model': '',
+        'type': 'trans_only_inherit',
+        'lang': 'EN',
+        'prompt': '',
+        'threads': threads,
+    }
+
+    started = time.perf_counter()
+    ok = handler.start(trans)
+    total = time.perf_counter() - started
+
+    timer = profiler._task_timers.pop(trans['id'], None)
+    stages = timer.stages if timer else {}
+    grouped = {
+        group: round(sum(stages.get(name, 0) for name in names), 3)
+        for group, names in STAGE_GROUPS.items()
+    }
+
+    return {
+        'format': fmt,
+        'size': size,
+        'params': params,
+        'ok': bool(ok),
+        'input_bytes': os.path.getsize(source),
+        'output_bytes': os.path.getsize(target) if os.path.exists(target) else 0,
+        'generate_seconds': round(generate_seconds, 3),
+        'extract_seconds': grouped['extract'],
+        'translate_seconds': grouped['translate'],
+        'write_seconds': grouped['write'],
+        'total_seconds': round(total, 3),
+        'stages': stages,
+        'segments': counter['requests'],
+        'segments_per_second': round(counter['requests'] / grouped['translate'], 1)
+        if grouped['translate'] else 0,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+def run(formats, sizes, threads, latency_ms, api_url=None):
+    results = []
+    ctx = get_context('spawn')
+    with tempfile.TemporaryDirectory(prefix='doctranslator-bench-') as workdir:
+        for fmt in formats:
+            for size in sizes:
+                params = GENERATORS[fmt][2][size]
+                # 每个用例一个新进程，避免 RSS 和模块状态相互影响
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                    try:
+                        result = pool.submit(run_case, fmt, size, params, threads, latency_ms, workdir,
+                                             api_url).result()
+                    except Exception as e:
+                        result = {'format': fmt, 'size': size, 'params': params, 'ok': False, 'error': str(e)}
+                results.append(result)
+                _print_result(result)
+    return results
+
+
+def _print_result(r):
+    if 'error' in r:
+        print(f"{r['format']:<6}{r['size']:<8} 失败: {r['error']}")
+        return
+    print(f"{r['format']:<6}{r['size']:<8}"
+          f"extract={r['extract_seconds']:>8}s translate={r['translate_seconds']:>8}s "
+          f"write={r['write_seconds']:>8}s segments={r['segments']:>6} "
+          f"({r['segments_per_second']}/s) rss={r['peak_rss_mb']}MB")
+
+
+def compare(old_path, new_path):
+    """对比两次基准结果（按 格式+档位 匹配）"""
+    with open(old_path, encoding='utf-8') as f:
+        old = {(r['format'], r['size']): r for r in json.load(f)['results']}
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)['results']
+
+    keys = ('extract_seconds', 'translate_seconds', 'write_seconds', 'peak_rss_mb')
+    print(f"{'用例':<16}" + ''.join(f"{k:>22}" for k in keys))
+    for r in new:
+        base = old.get((r['format'], r['size']))
+        if not base or 'error' in r or 'error' in base:
+            continue
+        cells = []
+        for k in keys:
+            delta = (r[k] - base[k]) / base[k] * 100 if base[k] else 0
+            cells.append(f"{base[k]}→{r[k]} ({delta:+.0f}%)")
+        print(f"{r['format'] + '/' + r['size']:<16}" + ''.join(f"{c:>22}" for c in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文件处理器离线基准测试')
+    parser.add_argument('--formats', default=','.join(GENERATORS), help='逗号分隔的格式，默认全部')
+    parser.add_argument('--sizes', default='medium', help='逗号分隔的档位：small/medium/large')
+    parser.add_argument('--threads', type=int, default=10, help='翻译线程数，默认10')
+    parser.add_argument('--latency-ms', type=float, default=0, help='桩翻译器每次请求的模拟延迟（毫秒）')
+    parser.add_argument('--api-url', help='OpenAI 兼容接口地址（如 benchmark.mock_llm），不填则使用桩翻译器')
+    parser.add_argument('--mock', metavar='LATENCY',
+                        help='在本进程启动模拟接口并使用它，参数为延迟分布，如 lognormal:300,0.5')
+    parser.add_argument('--output', help='结果 JSON 路径，默认 benchmark/results/<时间>-<提交>.json')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='对比两份结果 JSON')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    formats = [f.strip() for f in args.formats.split(',') if f.strip()]
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    for fmt in formats:
+        if fmt not in GENERATORS:
+            parser.error(f"不支持的格式: {fmt}")
+
+    commit = _git_commit()
+    api_url = args.api_url
+    mock_server = None
+    if args.mock:
+        from .mock_llm import serve_in_thread
+        api_url, mock_server = serve_in_thread(latency=args.mock)
+        print(f"模拟接口已启动: {api_url}")
+    try:
+        results = run(formats, sizes, args.threads, args.latency_ms, api_url)
+    finally:
+        if mock_server:
+            mock_server.shutdown()
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'commit': commit,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'threads': args.threads,
+            'latency_ms': args.latency_ms,
+            'api_url': api_url,
+            'mock': args.mock,
+            'results': results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {output}")
+
+
+if __name__ == '__main__':
+    main()
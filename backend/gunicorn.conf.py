@@ -0,0 +1,24 @@
+# gunicorn.conf.py
+# gunicorn 启动时自动加载当前目录下的该文件，命令行参数仍然生效
+import os
+
+
+def child_exit(server, worker):
+    """worker 退出时清理其 Prometheus 多进程指标文件"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    """
+    worker fork 后：丢弃 --preload 时从 master 继承的数据库连接（由 master 建立，不能跨进程共用），
+    再启动本 worker 的后台线程
+    """
+    from app import start_background_jobs
+    from app.extensions import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
+    start_background_jobs(app)
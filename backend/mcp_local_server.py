@@ -42,7 +42,7 @@ import subprocess
 import sys
 
 def _ensure_deps():
-    deps = ["fastmcp>=2.0.0", "requests>=2.28.0"]
+    deps = ["fastmcp>=2.10.0", "requests>=2.28.0"]
     missing = []
     for dep in deps:
         pkg = dep.split(">=")[0].split("==")[0].split("[")[0]
@@ -58,18 +58,23 @@ _ensure_deps()
 
 import os
 import json
+import asyncio
 import base64
+import hashlib
 import logging
 from typing import Optional
 
 from fastmcp import FastMCP, Client
 from fastmcp.client.transports import StreamableHttpTransport
+from fastmcp.exceptions import ToolError
 
 logging.basicConfig(level=logging.INFO, stream=sys.stderr)
 logger = logging.getLogger(__name__)
 
 REMOTE_URL = os.environ.get("DOCTRANSLATOR_URL", "").rstrip("/")
 API_KEY = os.environ.get("DOCTRANSLATOR_API_KEY", "")
+# 不超过此大小的文件随请求以 Base64 发送，更大的文件分片上传
+INLINE_MAX_SIZE = int(os.environ.get("INLINE_MAX_SIZE_MB", "1")) * 1024 * 1024
 
 ENV_CONFIG = {
     "api_url": os.environ.get("API_URL", ""),
@@ -100,15 +105,57 @@ mcp = FastMCP(
 )
 
 
-async def _call_remote_tool(tool_name: str, arguments: dict) -> dict:
-    transport = StreamableHttpTransport(
-        url=f"{REMOTE_URL}/mcp/user",
-        headers={"Authorization": f"Bearer {API_KEY}"},
-    )
-    client = Client(transport)
+# 长连接会话：首次调用时建立，之后所有工具调用复用，断线后自动重连
+_client: Optional[Client] = None
+_client_lock = asyncio.Lock()
+# 同时发往远程服务的调用数上限
+_call_limit = asyncio.Semaphore(int(os.environ.get("REMOTE_MAX_CONCURRENCY", "4")))
+# 非幂等的工具：连接出错时不自动重试，避免重复提交
+_NO_RETRY_TOOLS = {"translate_file", "upload_init", "delete_translate", "restart_translate"}
+
+
+async def _get_client() -> Client:
+    global _client
+    async with _client_lock:
+        if _client is None or not _client.is_connected():
+            transport = StreamableHttpTransport(
+                url=f"{REMOTE_URL}/mcp/user",
+                headers={"Authorization": f"Bearer {API_KEY}"},
+            )
+            client = Client(transport)
+            await client.__aenter__()
+            _client = client
+            logger.info("已建立远程 MCP 会话")
+        return _client
+
+
+async def _reset_client(client: Client):
+    """丢弃出错的会话，下次调用时重新建立"""
+    global _client
+    async with _client_lock:
+        if _client is client:
+            _client = None
+    try:
+        await client.__aexit__(None, None, None)
+    except Exception:
+        pass
+
 
-    async with client:
-        result = await client.call_tool(tool_name, arguments)
+async def _call_remote_tool(tool_name: str, arguments: dict) -> dict:
+    async with _call_limit:
+        client = await _get_client()
+        try:
+            result = await client.call_tool(tool_name, arguments)
+        except ToolError:
+            raise
+        except Exception as e:
+            # 连接类错误：重建会话，幂等的工具重试一次
+            await _reset_client(client)
+            if tool_name in _NO_RETRY_TOOLS:
+                raise
+            logger.warning(f"远程会话异常，重连后重试 {tool_name}: {e}")
+            client = await _get_client()
+            result = await client.call_tool(tool_name, arguments)
 
     if hasattr(result, 'data') and result.data:
         return result.data
@@ -130,6 +177,79 @@ async def _call_remote_tool(tool_name: str, arguments: dict) -> dict:
     return {"result": str(result)}
 
 
+async def _call_with_retry(tool_name: str, arguments: dict, retries: int = 3) -> dict:
+    """分片调用失败时重试，单个分片出错不必从头开始"""
+    for attempt in range(retries):
+        try:
+            return await _call_remote_tool(tool_name, arguments)
+        except Exception as e:
+            if attempt == retries - 1:
+                raise
+            logger.warning(f"{tool_name} 失败，重试({attempt + 1}/{retries}): {e}")
+
+
+async def _upload_file(file_path: str) -> dict:
+    """
+    分片上传本地文件：逐块读取、边读边算 MD5，内存中只保留一个分片
+    :return: upload_finalize 的结果（含 upload_id）
+    """
+    file_size = os.path.getsize(file_path)
+    init = await _call_remote_tool("upload_init", {
+        "file_name": os.path.basename(file_path),
+        "file_size": file_size,
+    })
+    if "error" in init:
+        return init
+
+    upload_id = init["upload_id"]
+    chunk_size = init["chunk_size"]
+    md5 = hashlib.md5()
+    offset = 0
+    with open(file_path, "rb") as f:
+        for data in iter(lambda: f.read(chunk_size), b""):
+            md5.update(data)
+            result = await _call_with_retry("upload_chunk", {
+                "upload_id": upload_id,
+                "offset": offset,
+                "content": base64.b64encode(data).decode(),
+            })
+            if "error" in result:
+                return result
+            offset += len(data)
+
+    return await _call_with_retry("upload_finalize", {"upload_id": upload_id, "md5": md5.hexdigest()})
+
+
+async def _download_file(task_id: int, save_path: str) -> dict:
+    """分片下载翻译结果到本地文件，完成后按 MD5 校验"""
+    info = await _call_remote_tool("download_init", {"task_id": task_id})
+    if "error" in info:
+        return info
+
+    if os.path.isdir(save_path):
+        save_path = os.path.join(save_path, info["file_name"])
+    tmp_path = save_path + ".part"
+    md5 = hashlib.md5()
+    offset = 0
+    with open(tmp_path, "wb") as f:
+        while offset < info["file_size"]:
+            chunk = await _call_with_retry("download_chunk", {"task_id": task_id, "offset": offset})
+            if "error" in chunk:
+                return chunk
+            data = base64.b64decode(chunk["content_base64"])
+            if not data:
+                break
+            md5.update(data)
+            f.write(data)
+            offset += len(data)
+
+    if md5.hexdigest() != info["md5"]:
+        os.remove(tmp_path)
+        return {"error": "文件校验失败，请重新下载"}
+    os.replace(tmp_path, save_path)
+    return {"task_id": task_id, "file_path": save_path, "file_size": info["file_size"], "md5": info["md5"]}
+
+
 @mcp.tool
 async def translate_file(
     file_path: str,
@@ -151,15 +271,22 @@ async def translate_file(
     if not os.path.exists(file_path):
         return {"error": f"文件不存在: {file_path}"}
 
-    with open(file_path, "rb") as f:
-        file_content = base64.b64encode(f.read()).decode()
-
     file_name = os.path.basename(file_path)
+    args = {"file_name": file_name}
 
-    args = {
-        "file_name": file_name,
-        "file_content": file_content,
-    }
+    # 小文件随请求直接发送，大文件分片上传
+    try:
+        if os.path.getsize(file_path) <= INLINE_MAX_SIZE:
+            with open(file_path, "rb") as f:
+                args["file_content"] = base64.b64encode(f.read()).decode()
+        else:
+            uploaded = await _upload_file(file_path)
+            if "error" in uploaded:
+                return uploaded
+            args["upload_id"] = uploaded["upload_id"]
+    except Exception as e:
+        logger.error(f"文件上传失败: {e}")
+        return {"error": f"文件上传失败: {str(e)}"}
     if target_lang:
         args["target_lang"] = target_lang
     if origin_lang:
@@ -258,14 +385,18 @@ async def list_translates(
 
 
 @mcp.tool
-async def download_translate(task_id: int) -> dict:
+async def download_translate(task_id: int, save_path: str = "") -> dict:
     """
     下载翻译结果文件，返回Base64编码内容。
+    提供 save_path 时分片下载并保存到本地（推荐，适合大文件），返回保存路径。
 
     Args:
         task_id: 翻译任务ID
+        save_path: 本地保存路径（文件或目录），不填则返回Base64内容
     """
     try:
+        if save_path:
+            return await _download_file(task_id, save_path)
         return await _call_remote_tool("download_translate", {"task_id": task_id})
     except Exception as e:
         return {"error": f"下载失败: {str(e)}"}
@@ -1,9 +1,11 @@
 import os
 import logging
-import asyncio
+import functools
 from contextlib import asynccontextmanager, contextmanager
 from typing import AsyncGenerator
 
+from flask import has_app_context
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -30,11 +32,16 @@ def flask_app_context():
     app = get_flask_app()
     if app is None:
         raise RuntimeError("Flask app 不可用")
+    # 执行池的工作线程已推入应用上下文，直接复用
+    if has_app_context():
+        yield app
+        return
     with app.app_context():
         yield app
 
 
 def _run_sync(func):
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
         with flask_app_context() as app:
             import inspect
@@ -46,8 +53,9 @@ def _run_sync(func):
 
 
 async def _run_in_thread(func, *args, **kwargs):
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+    """按工具名分配到 fast/heavy 执行池（见 app/mcp/executor.py）"""
+    from app.mcp.executor import run_tool
+    return await run_tool(get_flask_app(), func.__name__, func, *args, **kwargs)
 
 
 from fastmcp import FastMCP
@@ -85,8 +93,9 @@ async def translate_file(
     origin_lang: str = "",
     translate_type: str = "",
     comparison_id: int = 0,
+    upload_id: str = "",
 ) -> dict:
-    """翻译文档文件。提供文件名和文件内容（Base64编码）或文件下载链接即可启动翻译任务。
+    """翻译文档文件。提供文件名和文件内容（Base64编码）、文件下载链接或分片上传ID即可启动翻译任务。
 
     Args:
         file_name: 文件名（含扩展名），如 report.docx。使用 file_content 时必填。
@@ -96,6 +105,7 @@ async def translate_file(
         origin_lang: 源语言。不填则自动检测。
         translate_type: 翻译类型。可选值：trans_all_only_inherit（全译继承格式）、trans_all_only（全译不继承）、trans_partial_only_inherit（部分翻译继承）、trans_partial_only（部分翻译不继承）。不填则使用密钥配置中的默认类型。
         comparison_id: 术语库ID。不填则使用密钥配置中的默认术语库。
+        upload_id: 分片上传ID（大文件先用 upload_init/upload_chunk/upload_finalize 上传）。
     """
     from app.mcp.tools import translate_file as _translate_file
     token = get_access_token()
@@ -114,7 +124,55 @@ async def translate_file(
                                  file_content=file_content, file_url=file_url,
                                  file_name=file_name, target_lang=target_lang,
                                  origin_lang=origin_lang, translate_type=translate_type,
-                                 comparison_id=comparison_id)
+                                 comparison_id=comparison_id, upload_id=upload_id or None)
+
+
+@user_mcp.tool()
+async def upload_init(file_name: str, file_size: int) -> dict:
+    """开始分片上传大文件。返回 upload_id 和 chunk_size，之后按 offset 调用 upload_chunk 上传各分片，
+    再调用 upload_finalize 校验，最后用 translate_file(upload_id=...) 开始翻译。
+
+    Args:
+        file_name: 文件名（含扩展名）
+        file_size: 文件字节数
+    """
+    from app.mcp.tools import upload_init as _init
+    token = get_access_token()
+    customer_id = int(token.claims.get('customer_id', 0))
+    func = _run_sync(_init)
+    return await _run_in_thread(func, customer_id=customer_id, file_name=file_name, file_size=file_size)
+
+
+@user_mcp.tool()
+async def upload_chunk(upload_id: str, offset: int, content: str) -> dict:
+    """上传一个分片。分片可乱序、可重传（同一 offset 重复写入会覆盖）。
+
+    Args:
+        upload_id: upload_init 返回的上传ID
+        offset: 分片在文件中的起始字节位置
+        content: 分片内容的 Base64 编码（解码后不超过 chunk_size）
+    """
+    from app.mcp.tools import upload_chunk as _chunk
+    token = get_access_token()
+    customer_id = int(token.claims.get('customer_id', 0))
+    func = _run_sync(_chunk)
+    return await _run_in_thread(func, customer_id=customer_id, upload_id=upload_id,
+                                 offset=offset, content=content)
+
+
+@user_mcp.tool()
+async def upload_finalize(upload_id: str, md5: str) -> dict:
+    """完成分片上传，按整个文件的 MD5 校验。
+
+    Args:
+        upload_id: 上传ID
+        md5: 整个文件的 MD5（十六进制）
+    """
+    from app.mcp.tools import upload_finalize as _finalize
+    token = get_access_token()
+    customer_id = int(token.claims.get('customer_id', 0))
+    func = _run_sync(_finalize)
+    return await _run_in_thread(func, customer_id=customer_id, upload_id=upload_id, md5=md5)
 
 
 @user_mcp.tool()
@@ -132,7 +190,8 @@ async def query_translate_status(task_id: int) -> dict:
 
 
 @user_mcp.tool()
-async def list_translates(page: int = 1, limit: int = 20, status: str = "", keyword: str = "") -> dict:
+async def list_translates(page: int = 1, limit: int = 20, status: str = "", keyword: str = "",
+                          cursor: str = "") -> dict:
     """列出当前用户的翻译历史记录。返回任务列表，包含任务ID、文件名、状态、进度等。
 
     Args:
@@ -140,12 +199,14 @@ async def list_translates(page: int = 1, limit: int = 20, status: str = "", keyw
         limit: 每页数量。默认20条。
         status: 按状态过滤。可选值：none（未开始）、process（进行中）、done（已完成）、failed（失败）。不填则返回所有状态。
         keyword: 按文件名关键词搜索。不填则不筛选。
+        cursor: 上一次返回的 next_cursor，填写后按游标翻页（忽略 page，翻页更快，total 为缓存的近似值）。has_more 为 false 表示没有更多。
     """
     from app.mcp.tools import list_translates as _list
     token = get_access_token()
     customer_id = int(token.claims.get('customer_id', 0))
     func = _run_sync(_list)
-    return await _run_in_thread(func, customer_id=customer_id, page=page, limit=limit, status=status, keyword=keyword)
+    return await _run_in_thread(func, customer_id=customer_id, page=page, limit=limit, status=status, keyword=keyword,
+                                cursor=cursor)
 
 
 @user_mcp.tool()
@@ -162,6 +223,37 @@ async def download_translate(task_id: int) -> dict:
     return await _run_in_thread(func, customer_id=customer_id, task_id=task_id)
 
 
+@user_mcp.tool()
+async def download_init(task_id: int) -> dict:
+    """开始分片下载翻译结果。返回文件名、大小、MD5 和 chunk_size。
+
+    Args:
+        task_id: 翻译任务ID
+    """
+    from app.mcp.tools import download_init as _init
+    token = get_access_token()
+    customer_id = int(token.claims.get('customer_id', 0))
+    func = _run_sync(_init)
+    return await _run_in_thread(func, customer_id=customer_id, task_id=task_id)
+
+
+@user_mcp.tool()
+async def download_chunk(task_id: int, offset: int, length: int = 0) -> dict:
+    """下载一个分片，返回 Base64 编码内容，eof 为 true 表示已到文件末尾。
+
+    Args:
+        task_id: 翻译任务ID
+        offset: 起始字节位置
+        length: 读取字节数，默认且最大为 chunk_size
+    """
+    from app.mcp.tools import download_chunk as _chunk
+    token = get_access_token()
+    customer_id = int(token.claims.get('customer_id', 0))
+    func = _run_sync(_chunk)
+    return await _run_in_thread(func, customer_id=customer_id, task_id=task_id,
+                                 offset=offset, length=length)
+
+
 @user_mcp.tool()
 async def delete_translate(task_id: int) -> dict:
     """删除一条翻译记录。删除后释放该文件占用的存储空间。
@@ -269,7 +361,8 @@ async def update_customer(customer_id: int, level: str = "", add_storage_mb: int
 
 
 @admin_mcp.tool()
-async def admin_list_translates(page: int = 1, limit: int = 20, status: str = "", keyword: str = "") -> dict:
+async def admin_list_translates(page: int = 1, limit: int = 20, status: str = "", keyword: str = "",
+                                cursor: str = "") -> dict:
     """管理员查看所有用户的翻译记录。返回翻译编号、客户ID、文件名、状态、进度等。
 
     Args:
@@ -277,10 +370,11 @@ async def admin_list_translates(page: int = 1, limit: int = 20, status: str = ""
         limit: 每页数量。默认20条。
         status: 按状态过滤。可选值：none（未开始）、process（进行中）、done（已完成）、failed（失败）。不填则返回所有状态。
         keyword: 按文件名或翻译编号关键词搜索。不填则不筛选。
+        cursor: 上一次返回的 next_cursor，填写后按游标翻页（忽略 page，翻页更快，total 为缓存的近似值）。has_more 为 false 表示没有更多。
     """
     from app.mcp.tools import admin_list_translates as _list
     func = _run_sync(_list)
-    return await _run_in_thread(func, page=page, limit=limit, status=status, keyword=keyword)
+    return await _run_in_thread(func, page=page, limit=limit, status=status, keyword=keyword, cursor=cursor)
 
 
 @admin_mcp.tool()
@@ -374,12 +468,13 @@ def create_mcp_starlette():
 
 
 if __name__ == "__main__":
-    from app import create_app
+    from app import create_app, start_background_jobs
     from app.mcp.auth import set_flask_app_for_auth
 
     flask_app = create_app()
     set_flask_app(flask_app)
     set_flask_app_for_auth(flask_app)
+    start_background_jobs(flask_app)
 
     import uvicorn
     port = int(os.environ.get("MCP_PORT", 5001))
@@ -39,6 +39,14 @@ def run_startup():
             logger.info("执行增量迁移...")
             upgrade()
 
+    # translate 表热点查询索引（已建或已记录时跳过）
+    from app.script.migrate_indexes import run as migrate_indexes
+    migrate_indexes(app)
+
+    # 任务计数首次初始化（已记录时跳过）
+    from app.script.rebuild_task_counters import run as init_task_counters
+    init_task_counters(app)
+
     logger.info("数据库迁移完成")
     return app
 
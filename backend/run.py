@@ -1,6 +1,8 @@
+import os
+
 from flask_cors import CORS
 
-from app import create_app
+from app import create_app, start_background_jobs
 
 app = create_app()
 
@@ -15,4 +17,7 @@ CORS(app, resources={
 # 开发模式启动：python app.py
 # 生产模式启动：gunicorn -b 0.0.0.0:5000 -w 4 -k gevent --timeout 120 app:app
 if __name__ == '__main__':
+    # debug 重载时只在实际处理请求的子进程中启动后台线程
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_jobs(app)
     app.run(host='0.0.0.0', port=5000, debug=True)